@@ -9,8 +9,13 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'applicationstationapi.settings')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+# Serves the read endpoints from their own bounded thread pool, see handlers.py
+from applicationstationapi.handlers import ReadPoolASGIHandler
+
+application = ReadPoolASGIHandler()
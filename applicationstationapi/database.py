@@ -0,0 +1,138 @@
+"""Database connections and routing for applicationstationapi
+
+The database profile is chosen with environment variables in settings.py.
+This module holds the pieces of it that run with the connections:
+
+- apply_sqlite_pragmas tunes each new SQLite connection with SQLITE_PRAGMAS
+  (write ahead logging, so reads don't wait on writes, and a busy timeout,
+  so writes wait on each other instead of failing).
+- ReplicaRouter and ReplicaReadMiddleware send the queries of list and
+  retrieve requests to the 'replica' database, when one is configured.
+  Everything else, writes included, uses 'default', and so do reads made
+  inside a transaction, which must see that transaction's own writes.
+  A client reads its own writes: once a request writes, the rest of its
+  reads use 'default', and so do the client's reads for
+  DB_REPLICA_PIN_SECONDS after a POST, PUT, PATCH or DELETE, while the
+  replica may still be catching up. Responses that are cached for other
+  requests are always built from 'default' (primary_reads).
+"""
+import contextlib
+import contextvars
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+REPLICA = 'replica'
+
+# Cookie holding the time until which a client's reads use 'default'
+PIN_COOKIE = 'db_primary_until'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+# True while a list or retrieve request is being handled
+read_from_replica = contextvars.ContextVar('read_from_replica', default=False)
+
+# True once the request being handled has written to 'default'
+wrote_to_default = contextvars.ContextVar('wrote_to_default', default=False)
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """Sends the reads made inside the block to 'default'
+
+    Used to build anything that outlives the request, such as a cached
+    response, so that a lagging replica's rows are never cached.
+    """
+
+    token = read_from_replica.set(False)
+    try:
+        yield
+    finally:
+        read_from_replica.reset(token)
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Receiver of connection_created that sets SQLITE_PRAGMAS on SQLite connections"""
+
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
+
+
+class ReplicaRouter:
+    """Routes the reads of list and retrieve requests to the replica"""
+
+    def db_for_read(self, model, **hints):
+        if (
+            read_from_replica.get()
+            and not wrote_to_default.get()
+            and REPLICA in settings.DATABASES
+            and not connections['default'].in_atomic_block
+        ):
+            return REPLICA
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        wrote_to_default.set(True)
+        return 'default'
+
+    # the replica holds the same rows as default
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    # the replica is migrated by replication, not by migrate
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def pinned_to_default(request):
+    """Returns True if the client wrote less than DB_REPLICA_PIN_SECONDS ago"""
+
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReplicaReadMiddleware:
+    """Marks GET requests to list and retrieve actions as reads from the replica
+
+    Unless the client wrote recently: the responses to writes set a cookie
+    that keeps the client's reads on 'default' for DB_REPLICA_PIN_SECONDS.
+    """
+
+    def __init__(self, get_response):
+        if REPLICA not in settings.DATABASES:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, 'DB_REPLICA_PIN_SECONDS', 5)
+
+    def __call__(self, request):
+        tokens = read_from_replica.set(False), wrote_to_default.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_from_replica.reset(tokens[0])
+            wrote_to_default.reset(tokens[1])
+
+        if request.method not in SAFE_METHODS and self.pin_seconds > 0:
+            response.set_cookie(
+                PIN_COOKIE, str(time.time() + self.pin_seconds),
+                max_age=self.pin_seconds, httponly=True, samesite='Lax'
+            )
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # ViewSet.as_view maps each http method to the action it calls
+        actions = getattr(view_func, 'actions', None) or {}
+        if (
+            request.method in ('GET', 'HEAD')
+            and actions.get('get') in ('list', 'retrieve')
+            and not pinned_to_default(request)
+        ):
+            read_from_replica.set(True)
@@ -0,0 +1,145 @@
+"""ASGI handler for applicationstationapi
+
+Django 3.0 has no async views, so under ASGI every request runs the
+synchronous views in asyncio's default thread pool. ReadPoolASGIHandler runs
+the read endpoints (GET and HEAD on the API's lists and details) in a
+dedicated pool of ASGI_READ_THREADS threads instead:
+
+- Reads wait for a thread as coroutines, not as blocked threads.
+- A burst of reads can't take every thread from the writes.
+- Once ASGI_READ_BACKLOG reads are waiting or running, further reads get an
+  immediate 503 with a Retry-After header instead of queueing.
+
+Django closes expired and broken database connections on request_started
+and request_finished, but sends them from the thread of sync_to_async,
+not from the read pool's threads. Each read pool thread keeps its own
+connection, so the reads close theirs themselves, before and after each
+request.
+
+Django 3.0 iterates a streaming response inside the event loop, where the
+database can't be used, so a generator that queries as it streams (the
+jobs export) fails. ReadPoolASGIHandler iterates streaming responses on a
+thread of their own instead, one part at a time, so they still stream.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections, connections
+from django.http import HttpResponse
+
+# First path segment of the endpoints served from the read pool
+READ_ENDPOINTS = {
+    'jobs', 'events', 'questions', 'companies', 'statuses', 'dashboard', 'search',
+    'analytics'
+}
+
+
+def with_fresh_connections(get_response, request):
+    """Calls get_response, closing the thread's expired or broken connections around it
+
+    Honours CONN_MAX_AGE and drops connections that became unusable, such
+    as after a database restart, the way request_started and
+    request_finished do for the other threads.
+    """
+
+    close_old_connections()
+    try:
+        return get_response(request)
+    finally:
+        close_old_connections()
+
+
+def next_part(parts):
+    """Returns the next part of a streaming response, or None after the last one"""
+
+    return next(parts, None)
+
+
+def finish_stream(response):
+    """Closes a streaming response and the database connections of its thread"""
+
+    try:
+        response.close()
+    finally:
+        connections.close_all()
+
+
+class ReadPoolASGIHandler(ASGIHandler):
+    """ASGIHandler that serves read requests from a bounded thread pool"""
+
+    def __init__(self):
+        super().__init__()
+        self.read_executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'ASGI_READ_THREADS', 8),
+            thread_name_prefix='asgi-read'
+        )
+        self.read_backlog = getattr(settings, 'ASGI_READ_BACKLOG', 512)
+        self.pending_reads = 0
+
+    def is_read(self, request):
+        return (
+            request.method in ('GET', 'HEAD')
+            and request.path_info.split('/')[1] in READ_ENDPOINTS
+        )
+
+    # ASGIHandler awaits get_response directly when it is a coroutine
+    async def get_response(self, request):
+        get_response = super().get_response
+
+        if not self.is_read(request):
+            return await sync_to_async(get_response)(request)
+
+        if self.pending_reads >= self.read_backlog:
+            response = HttpResponse(status=503)
+            response['Retry-After'] = '1'
+            return response
+
+        self.pending_reads += 1
+        try:
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(
+                self.read_executor, context.run, with_fresh_connections, get_response, request
+            )
+        finally:
+            self.pending_reads -= 1
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        # every part is built on the same thread, which a server side
+        # cursor the generator reads from is tied to
+        stream_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='asgi-stream')
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+
+        # the headers, as ASGIHandler.send_response sends them
+        response_headers = [
+            (header.encode('ascii'), value.encode('latin1')) for header, value in response.items()
+        ]
+        for cookie in response.cookies.values():
+            response_headers.append((b'Set-Cookie', cookie.output(header='').encode('ascii').strip()))
+
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': response.status_code,
+                'headers': response_headers,
+            })
+
+            # Access __iter__ and not streaming_content, like Django does
+            parts = iter(response)
+            while True:
+                part = await loop.run_in_executor(stream_executor, context.run, next_part, parts)
+                if part is None:
+                    break
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+            await send({'type': 'http.response.body'})
+        finally:
+            await loop.run_in_executor(stream_executor, finish_stream, response)
+            stream_executor.shutdown(wait=False)
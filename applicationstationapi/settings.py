@@ -46,16 +46,55 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'appstationapp.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         # 'rest_framework.permissions.AllowAny',
         'rest_framework.permissions.IsAuthenticatedOrReadOnly'
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    # JSON is rendered and parsed with orjson when it is installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'appstationapp.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'appstationapp.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'appstationapp.pagination.ModelCursorPagination',
     'PAGE_SIZE': 10
 }
 
+# Authenticated tokens are cached in each process for TIMEOUT seconds. A
+# revoked token stops working in every process at once, through a version
+# kept in the shared cache (CACHES)
+TOKEN_CACHE = {
+    'MAX_SIZE': 10000,
+    'TIMEOUT': 300
+}
+
+# Passwords are hashed in a pool of WORKERS threads. Logins and registrations
+# beyond MAX_PENDING waiting or hashing, or waiting longer than TIMEOUT
+# seconds, get a 503. MODE 'inline' hashes on the request thread instead.
+# See appstationapp/hashing.py
+AUTH_HASHING = {
+    'MODE': 'pool',
+    'WORKERS': 4,
+    'MAX_PENDING': 16,
+    'TIMEOUT': 10
+}
+
+# Each request is timed and its SQL, serializer and render times are sent
+# in a Server-Timing header and collected at /metrics, which only answers
+# staff users from ALLOWED_IPS. On unless the METRICS_ENABLED environment
+# variable is 0. See appstationapp/metrics.py
+METRICS = {
+    'ENABLED': os.environ.get('METRICS_ENABLED', '1') != '0',
+    'SERVER_TIMING': True,
+    'ALLOWED_IPS': ['127.0.0.1', '::1']
+}
+
 DJRICHTEXTFIELD_CONFIG = {
     'js': ['//tinymce.cachefly.net/4.1/tinymce.min.js'],
     'init_template': 'djrichtextfield/init/tinymce.js',
@@ -68,6 +107,7 @@ DJRICHTEXTFIELD_CONFIG = {
 }
 
 MIDDLEWARE = [
+    'appstationapp.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -76,6 +116,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'applicationstationapi.database.ReplicaReadMiddleware',
 ]
 
 CORS_ORIGIN_WHITELIST = (
@@ -103,17 +144,96 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'applicationstationapi.wsgi.application'
 
+# Under ASGI, reads run in a pool of ASGI_READ_THREADS threads. Reads beyond
+# ASGI_READ_BACKLOG waiting or running get a 503. See handlers.py
+ASGI_READ_THREADS = 8
+
+ASGI_READ_BACKLOG = 512
+
 
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
-DATABASES = {
+# The database is chosen with environment variables:
+#   DB_ENGINE        sqlite (the default) or postgres
+#   DB_NAME          file name for sqlite, database name for postgres
+#   DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+#   DB_REPLICA_HOST  read replica that serves list and retrieve requests
+#   DB_CONN_MAX_AGE  seconds a connection is kept open and reused, 0 closes
+#                    it after each request
+#   DB_POOLER        pgbouncer when DB_HOST is a pgbouncer in transaction
+#                    pooling mode
+#   DB_REPLICA_PIN_SECONDS  seconds a client's reads stay on DB_HOST after
+#                    it writes, while the replica catches up (5 by default)
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+DB_REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', 5))
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'applicationstation'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            # server side cursors (QuerySet.iterator) don't survive
+            # transaction pooling
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_POOLER') == 'pgbouncer',
+        }
+    }
+
+    if os.environ.get('DB_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST': os.environ['DB_REPLICA_HOST'],
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(BASE_DIR, os.environ.get('DB_NAME', 'db.sqlite3')),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        }
+    }
+
+# Set on each new SQLite connection. With write ahead logging reads don't
+# wait for writes, and writes wait up to busy_timeout ms for each other
+# instead of failing with "database is locked"
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'temp_store': 'memory',
+}
+
+DATABASE_ROUTERS = ['applicationstationapi.database.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+# Each process has its own local memory cache. Deployments with more than
+# one process should share a cache (memcached, redis) so that changes made
+# in one process invalidate the cached responses of the others.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Seconds a cached response (companies, statuses, dashboards) is kept
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Alias in CACHES of the cache that holds candidates' dashboards
+DASHBOARD_CACHE = 'default'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -27,12 +27,17 @@ router.register(r'companies', Companies, 'company')
 router.register(r'statuses', Statuses, 'status')
 router.register(r'jobs', Jobs, 'job')
 router.register(r'events', Events, 'event')
+router.register(r'dashboard', Dashboard, 'dashboard')
+router.register(r'search', Search, 'search')
+router.register(r'analytics', Analytics, 'analytics')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include(router.urls)),
     path('register', register_user),
     path('login', login_user),
+    path('logout', logout_user),
+    path('metrics', metrics_view),
     path('api-token-auth/', obtain_auth_token),
     # path('djrichtextfield/', include('djrichtextfield.urls')),
 ]
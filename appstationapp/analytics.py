@@ -0,0 +1,263 @@
+"""Pipeline analytics for Application Station
+
+    A candidate's analytics are read from PipelineCount, a summary table of
+    running totals, instead of being counted from the jobs, events and
+    questions on every request. The receivers in signals.py move the totals
+    by the difference each save or delete makes: a job that moves from
+    Applied to Interviewing takes one from Applied and adds one to
+    Interviewing. The values of the row in the database, read again with
+    the row locked in the transaction of the save (LoadedValuesModel and
+    lock_loaded_values), tell what a save changed, even if the saved
+    instance was stale or another request saved the row at the same time.
+
+    rebuild() recounts candidates' totals from the raw tables with SQL
+    aggregation. It is used for saves whose previous values are unknown,
+    after queryset.update() calls that skip the receivers, and by the
+    rebuildanalytics command.
+"""
+from collections import Counter
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+from appstationapp.models import Event, Job, PipelineCount, Question
+
+
+def week_of(value):
+    """Returns the Monday, in UTC, of the week a datetime falls in
+
+    value may also be a string, as Event.start_time is before it is loaded
+    back from the database.
+    """
+
+    value = Event._meta.get_field('start_time').to_python(value)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+
+    day = value.astimezone(timezone.utc).date()
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def is_answered(answer):
+    return bool(answer and answer.strip())
+
+
+def job_counts(candidate_id, status_id, company_id):
+    return {
+        (candidate_id, PipelineCount.STATUS, str(status_id)): 1,
+        (candidate_id, PipelineCount.COMPANY, str(company_id)): 1,
+    }
+
+
+def event_counts(candidate_id, start_time):
+    return {(candidate_id, PipelineCount.WEEK, week_of(start_time)): 1}
+
+
+def question_counts(candidate_id, answer):
+    counts = {(candidate_id, PipelineCount.QUESTIONS, 'total'): 1}
+    if is_answered(answer):
+        counts[(candidate_id, PipelineCount.QUESTIONS, 'answered')] = 1
+    return counts
+
+
+def counts_of(instance, candidate_id, values=None):
+    """Returns what a Job, Event or Question adds to the totals
+
+    Arguments:
+        values -- the instance's loaded values, instead of its current ones
+    """
+
+    def value(field):
+        return values[field] if values is not None else getattr(instance, field)
+
+    if isinstance(instance, Job):
+        return job_counts(candidate_id, value('status_id'), value('company_id'))
+
+    if isinstance(instance, Event):
+        return event_counts(candidate_id, value('start_time'))
+
+    return question_counts(candidate_id, value('answer'))
+
+
+def tracked_fields(instance):
+    """Returns the fields whose values the totals depend on"""
+
+    if isinstance(instance, Job):
+        return {'candidate_id', 'status_id', 'company_id'}
+    if isinstance(instance, Event):
+        return {'start_time'}
+    return {'candidate_id', 'answer'}
+
+
+def saved_values(instance):
+    """Returns the values a deleted instance had in the database
+
+    Those are its loaded values, which delete() reads again, falling back
+    to the instance's own for fields that weren't loaded.
+    """
+
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    return {
+        field.attname: loaded.get(field.attname, getattr(instance, field.attname))
+        for field in instance._meta.concrete_fields
+    }
+
+
+def candidates_of(instances, values=None):
+    """Returns a dict of each instance's candidate id, keyed by id()
+
+    Events belong to a candidate through their job, so the candidates of
+    events are read in one query.
+
+    Arguments:
+        values -- function returning the values of an instance to use,
+            instead of its current ones
+    """
+
+    values = values or (lambda instance: instance.__dict__)
+
+    events = [instance for instance in instances if isinstance(instance, Event)]
+    job_candidates = {}
+    if events:
+        job_candidates = dict(
+            Job.objects.filter(pk__in={values(event)['job_id'] for event in events})
+            .values_list('id', 'candidate_id')
+        )
+
+    return {
+        id(instance): (
+            job_candidates.get(values(instance)['job_id']) if isinstance(instance, Event)
+            else values(instance)['candidate_id']
+        )
+        for instance in instances
+    }
+
+
+def adjust(changes):
+    """Adds each delta of changes to its total
+
+    Arguments:
+        changes -- dict of (candidate_id, dimension, key) to delta
+    """
+
+    for (candidate_id, dimension, key), delta in changes.items():
+        if delta == 0:
+            continue
+
+        totals = PipelineCount.objects.filter(candidate_id=candidate_id, dimension=dimension, key=key)
+        if totals.update(count=F('count') + delta) or delta < 0:
+            # a total that is gone was deleted with its candidate
+            continue
+
+        try:
+            with transaction.atomic():
+                PipelineCount.objects.create(
+                    candidate_id=candidate_id, dimension=dimension, key=key, count=delta
+                )
+        except IntegrityError:
+            # created by a concurrent save
+            totals.update(count=F('count') + delta)
+
+
+def record_saves(instances, created):
+    """Moves the totals by what saving instances changed"""
+
+    instances = list(instances)
+    candidates = candidates_of(instances)
+    changes = Counter()
+    unknown = set()
+
+    for instance in instances:
+        candidate_id = candidates[id(instance)]
+        if candidate_id is None:
+            continue
+
+        loaded = getattr(instance, '_loaded_values', None)
+        fields = tracked_fields(instance)
+
+        if not created:
+            if loaded is None or not fields <= set(loaded):
+                # the previous values weren't loaded, recount the candidate
+                unknown.add(candidate_id)
+                continue
+
+            # a job's previous totals belong to its previous candidate
+            previous_candidate = loaded.get('candidate_id', candidate_id)
+            changes.subtract(counts_of(instance, previous_candidate, loaded))
+
+        changes.update(counts_of(instance, candidate_id))
+
+        # a later save of the same instance starts from these values
+        instance._loaded_values = {field: getattr(instance, field) for field in fields}
+
+    adjust(changes)
+    if unknown:
+        rebuild(unknown)
+
+
+def record_deletes(instances):
+    """Takes deleted instances out of the totals"""
+
+    instances = list(instances)
+    values = {id(instance): saved_values(instance) for instance in instances}
+    candidates = candidates_of(instances, lambda instance: values[id(instance)])
+    changes = Counter()
+
+    for instance in instances:
+        if candidates[id(instance)] is not None:
+            changes.subtract(counts_of(instance, candidates[id(instance)], values[id(instance)]))
+
+    adjust(changes)
+
+
+def rebuild(candidate_ids=None):
+    """Recounts the totals of candidates, or of everyone, with SQL aggregation"""
+
+    jobs = Job.objects.all()
+    events = Event.objects.all()
+    questions = Question.objects.all()
+    totals = PipelineCount.objects.all()
+
+    if candidate_ids is not None:
+        jobs = jobs.filter(candidate_id__in=candidate_ids)
+        events = events.filter(job__candidate_id__in=candidate_ids)
+        questions = questions.filter(candidate_id__in=candidate_ids)
+        totals = totals.filter(candidate_id__in=candidate_ids)
+
+    rows = []
+
+    for dimension, column in ((PipelineCount.STATUS, 'status_id'), (PipelineCount.COMPANY, 'company_id')):
+        for row in jobs.order_by().values('candidate_id', column).annotate(count=Count('id')):
+            rows.append(PipelineCount(
+                candidate_id=row['candidate_id'], dimension=dimension,
+                key=str(row[column]), count=row['count']
+            ))
+
+    weeks = (
+        events.order_by()
+        .annotate(week=TruncWeek('start_time'))
+        .values('job__candidate_id', 'week')
+        .annotate(count=Count('id'))
+    )
+    for row in weeks:
+        rows.append(PipelineCount(
+            candidate_id=row['job__candidate_id'], dimension=PipelineCount.WEEK,
+            key=week_of(row['week']), count=row['count']
+        ))
+
+    answered = Q(answer__isnull=False) & ~Q(answer__regex=r'^\s*$')
+    for row in questions.order_by().values('candidate_id').annotate(
+        total=Count('id'), answered=Count('id', filter=answered)
+    ):
+        for key in ('total', 'answered'):
+            rows.append(PipelineCount(
+                candidate_id=row['candidate_id'], dimension=PipelineCount.QUESTIONS,
+                key=key, count=row[key]
+            ))
+
+    with transaction.atomic():
+        totals.delete()
+        PipelineCount.objects.bulk_create(rows)
+
+    return len(rows)
@@ -0,0 +1,19 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+class AppstationappConfig(AppConfig):
+    name = 'appstationapp'
+
+    def ready(self):
+        # connect the receivers that keep caches in step with the database
+        from . import signals
+
+        # tune each new SQLite connection, see applicationstationapi/database.py
+        from applicationstationapi.database import apply_sqlite_pragmas
+        connection_created.connect(apply_sqlite_pragmas)
+
+        # create and fill the search index once migrate has made the tables
+        from .search import create_search_table
+        post_migrate.connect(create_search_table, sender=self)
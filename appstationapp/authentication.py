@@ -0,0 +1,166 @@
+"""Authentication for Application Station API
+
+    Every request authenticates with a token, and nearly every view then
+    reads request.auth.user.candidate.id. CachedTokenAuthentication loads the
+    token, user and candidate in one query and keeps their field values in
+    an in-process LRU cache, so repeat requests with the same token run no
+    auth SQL. Each request gets its own Token, User and Candidate instances
+    built from those values, so concurrent requests never share them.
+
+    Each token has a version in the shared Django cache (see caching.py),
+    which is bumped when the token, its user or its candidate is saved or
+    deleted (see appstationapp/signals.py). A cached token is only used
+    while its version is the one read before it was loaded, so a revoked
+    token stops working in every process, not only the one that revoked it.
+"""
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from appstationapp.caching import get_version, token_namespace
+from appstationapp.models import Candidate
+
+
+def field_values(instance):
+    """Returns the names and values of instance's concrete fields"""
+
+    names = tuple(field.attname for field in instance._meta.concrete_fields)
+    return names, tuple(getattr(instance, name) for name in names)
+
+
+def from_values(model, values):
+    """Returns a new instance of model, as if loaded with field_values"""
+
+    names, row = values
+    return model.from_db('default', names, row)
+
+
+class TokenCache:
+    """Thread safe LRU cache of authenticated tokens with a time to live
+
+    Each entry holds a token's user_id, the plain field values of the
+    token, user and candidate, and the version of the token they were
+    loaded at.
+
+    Arguments:
+        max_size -- number of tokens kept before the least recently used is dropped
+        timeout -- seconds a token is trusted before it is loaded again
+    """
+
+    def __init__(self, max_size=10000, timeout=300):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is None:
+                return None
+
+            token, expires = entry
+            if expires < time.monotonic():
+                del self._tokens[key]
+                return None
+
+            self._tokens.move_to_end(key)
+            return token
+
+    def set(self, key, token):
+        with self._lock:
+            self._tokens[key] = (token, time.monotonic() + self.timeout)
+            self._tokens.move_to_end(key)
+
+            while len(self._tokens) > self.max_size:
+                self._tokens.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._tokens.pop(key, None)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            stale = [
+                key for key, (entry, expires) in self._tokens.items()
+                if entry['user_id'] == user_id
+            ]
+            for key in stale:
+                del self._tokens[key]
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+
+token_cache_settings = getattr(settings, 'TOKEN_CACHE', {})
+token_cache = TokenCache(
+    max_size=token_cache_settings.get('MAX_SIZE', 10000),
+    timeout=token_cache_settings.get('TIMEOUT', 300)
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication backed by token_cache
+
+    Clients authenticate exactly as with TokenAuthentication:
+        Authorization: Token ${token}
+    """
+
+    def authenticate_credentials(self, key):
+        # read before a load, so a revocation that races the load moves the
+        # token past the version it is cached at
+        version = get_version(token_namespace(key))
+
+        entry = token_cache.get(key)
+        if entry is None or entry['version'] != version:
+            entry = self.load_entry(key, version)
+            token_cache.set(key, entry)
+
+        token = from_values(self.get_model(), entry['token'])
+        token.user = from_values(User, entry['user'])
+        if entry['candidate'] is not None:
+            token.user.candidate = from_values(Candidate, entry['candidate'])
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
+
+    def load_entry(self, key, version):
+        """Loads a token, its user and candidate in one query, as a token_cache entry"""
+
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user__candidate').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        candidate = getattr(token.user, 'candidate', None)
+
+        return {
+            'user_id': token.user_id,
+            'version': version,
+            'token': field_values(token),
+            'user': field_values(token.user),
+            'candidate': field_values(candidate) if candidate is not None else None,
+        }
+
+
+class QueryTokenAuthentication(CachedTokenAuthentication):
+    """Token authentication with the token in the query string
+
+    For calendar clients, which subscribe to a URL and can't send headers:
+        http://localhost:8000/events/calendar?token=${token}
+    """
+
+    def authenticate(self, request):
+        key = request.query_params.get('token')
+        if not key:
+            return None
+
+        return self.authenticate_credentials(key)
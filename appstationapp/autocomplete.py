@@ -0,0 +1,123 @@
+"""Company name autocomplete for Application Station
+
+    company_names keeps every company's name in a sorted list in each
+    process. The companies whose names start with a prefix sit next to each
+    other in the list, so completing a prefix is a binary search followed by
+    reading the next few names, however many companies there are.
+
+    The index is built on first use and rebuilt whenever the 'companies'
+    cache namespace moves to a version it hasn't seen (see caching.py), so
+    companies added or changed by other processes show up on the next
+    request. Companies saved in this process are added in place once their
+    transaction commits, without a rebuild.
+"""
+import threading
+from array import array
+from bisect import bisect_left
+from applicationstationapi.database import primary_reads
+from appstationapp.caching import get_version
+from appstationapp.models import Company, normalize_company_name
+
+
+class CompanyNameIndex:
+    """Sorted index of company names, for prefix lookups"""
+
+    def __init__(self):
+        self._names = []
+        self._ids = array('q')
+        self._names_by_id = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def rebuild(self, version=None):
+        # the index is kept for version, so it is read from the primary
+        with primary_reads():
+            rows = sorted(
+                (normalize_company_name(name), company_id)
+                for company_id, name in Company.objects.values_list('id', 'name').iterator()
+            )
+
+        with self._lock:
+            self._names = [name for name, _ in rows]
+            self._ids = array('q', (company_id for _, company_id in rows))
+            self._names_by_id = {company_id: name for name, company_id in rows}
+            self._version = version
+
+    def current(self):
+        """Rebuilds the index if the companies changed since it was built"""
+
+        version = get_version('companies')
+        if version != self._version:
+            self.rebuild(version)
+
+    def add(self, company_id, name, version):
+        """Adds or renames a company saved in this process
+
+        Arguments:
+            version -- version the save moved the 'companies' namespace to
+        """
+
+        name = normalize_company_name(name)
+
+        with self._lock:
+            if self._version is None:
+                return
+
+            old_name = self._names_by_id.get(company_id)
+            if old_name is not None:
+                self._delete(company_id, old_name)
+
+            index = bisect_left(self._names, name)
+            while index < len(self._names) and self._names[index] == name and self._ids[index] < company_id:
+                index += 1
+            self._names.insert(index, name)
+            self._ids.insert(index, company_id)
+            self._names_by_id[company_id] = name
+
+            self._adopt(version)
+
+    def remove(self, company_id, version):
+        with self._lock:
+            if self._version is None:
+                return
+
+            name = self._names_by_id.pop(company_id, None)
+            if name is not None:
+                self._delete(company_id, name)
+
+            self._adopt(version)
+
+    def _delete(self, company_id, name):
+        index = bisect_left(self._names, name)
+        while self._ids[index] != company_id:
+            index += 1
+        del self._names[index]
+        del self._ids[index]
+
+    def _adopt(self, version):
+        # If the save was the only change since the index was last up to
+        # date, the index is up to date with the version the save moved to
+        if self._version == version - 1 and get_version('companies') == version:
+            self._version = version
+
+    def complete(self, prefix, limit=10):
+        """Returns (id, name) of the first limit companies whose names start with prefix"""
+
+        prefix = normalize_company_name(prefix)
+        self.current()
+
+        with self._lock:
+            index = bisect_left(self._names, prefix)
+            matches = []
+            while (
+                index < len(self._names)
+                and len(matches) < limit
+                and self._names[index].startswith(prefix)
+            ):
+                matches.append((self._ids[index], self._names[index]))
+                index += 1
+
+        return matches
+
+
+company_names = CompanyNameIndex()
@@ -0,0 +1,165 @@
+"""Helpers for the bulk create and update endpoints
+
+    A bulk request is a JSON list of items. Each item is checked on its own
+    and the items that pass are saved together in a single transaction.
+    The response has one entry per item, in the same order: the JSON
+    serialized instance, or {"error": ""} for an item that was not saved.
+"""
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from rest_framework import status
+from rest_framework.response import Response
+from appstationapp.models import lock_loaded_values
+from appstationapp.signals import bulk_saved
+
+
+class BulkItemError(Exception):
+    """Raised when a single item of a bulk request can't be saved"""
+
+
+def item_id(item, key):
+    """Returns the integer id stored under key in item, or None"""
+
+    try:
+        return int(item[key])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def item_ids(items, key):
+    """Returns the set of integer ids stored under key in items"""
+
+    ids = {item_id(item, key) for item in items if isinstance(item, dict)}
+    ids.discard(None)
+    return ids
+
+
+def existing_ids(queryset, items, key):
+    """Returns the ids under key in items that exist in queryset
+
+    All of the ids are checked with one query.
+    """
+
+    ids = item_ids(items, key)
+    return set(queryset.filter(pk__in=ids).values_list('id', flat=True))
+
+
+def require_id(item, key, allowed):
+    """Returns the id under key in item, if it is one of the allowed ids"""
+
+    value = item_id(item, key)
+    if value not in allowed:
+        raise BulkItemError(f'{key} {item.get(key)} does not exist')
+
+    return value
+
+
+def to_python(model, field_name, value):
+    """Converts value the same way the model field will when it is saved
+
+    Also runs the field's validators, such as a CharField's max_length,
+    so an item the database would reject fails on its own instead of
+    failing the whole transaction.
+
+    Raises:
+        BulkItemError -- if value is None and the field is not nullable
+        ValidationError -- if value can't be converted or is not valid
+    """
+
+    field = model._meta.get_field(field_name)
+    if value is None and not field.null:
+        raise BulkItemError(f'{field_name} can not be null')
+
+    value = field.to_python(value)
+    field.run_validators(value)
+
+    return value
+
+
+def build_instances(items, build):
+    """Calls build(item) for every item of a bulk request
+
+    Returns:
+        tuple -- dict of index to instance, and dict of index to error message
+    """
+
+    instances = {}
+    errors = {}
+
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise BulkItemError('Expected an object')
+
+            instances[index] = build(item)
+
+        except KeyError as ex:
+            errors[index] = f'{ex.args[0]} is required'
+
+        except ValidationError as ex:
+            errors[index] = ' '.join(ex.messages)
+
+        except BulkItemError as ex:
+            errors[index] = ex.args[0]
+
+    return instances, errors
+
+
+def save_in_bulk(model, instances, fields=None):
+    """Saves instances in a single transaction
+
+    New instances are inserted with bulk_create when the database can
+    return their ids. Otherwise (SQLite) they are inserted one at a time,
+    still inside the one transaction. Existing instances are written with a
+    single bulk_update of fields, after their rows are read again and
+    locked (lock_loaded_values), so the bulk_saved receivers see what the
+    update really changed even if an instance was stale.
+
+    Receivers of post_save are told about every instance exactly once: the
+    instances that bypass post_save are sent with the bulk_saved signal
+    after the transaction commits.
+    """
+
+    created = [instance for instance in instances if instance.pk is None]
+    updated = [instance for instance in instances if instance.pk is not None]
+
+    with transaction.atomic():
+        if created and connection.features.can_return_rows_from_bulk_insert:
+            model.objects.bulk_create(created)
+            transaction.on_commit(lambda: bulk_saved.send(
+                sender=model, instances=created, created=True
+            ))
+        else:
+            for instance in created:
+                instance.save(force_insert=True)
+
+        if updated:
+            lock_loaded_values(model, updated)
+            model.objects.bulk_update(updated, fields)
+            transaction.on_commit(lambda: bulk_saved.send(
+                sender=model, instances=updated, created=False
+            ))
+
+
+def bulk_response(count, data, errors):
+    """Builds the response of a bulk request
+
+    Arguments:
+        count -- number of items in the request
+        data -- dict of index to JSON serialized instance
+        errors -- dict of index to error message
+
+    Returns:
+        Response -- one entry per item, 200 status code if every item was
+        saved and 207 status code if some were not
+    """
+
+    results = [
+        data[index] if index in data else {'error': errors[index]}
+        for index in range(count)
+    ]
+
+    if errors:
+        return Response(results, status=status.HTTP_207_MULTI_STATUS)
+
+    return Response(results)
@@ -0,0 +1,127 @@
+"""Response caching for Application Station
+
+    Responses are cached under a versioned key: every cached response of a
+    namespace includes the namespace's current version number, and
+    bump_version() moves the namespace to a new number when its rows
+    change. Old entries are never read again and simply expire.
+
+    Cached responses carry a strong ETag. A client that sends it back in
+    If-None-Match gets an empty 304 response instead of the body.
+"""
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from applicationstationapi.database import primary_reads
+from appstationapp.renderers import FastJSONRenderer, json_loads
+
+
+# seconds a cached response is kept, even if its namespace never changes
+RESPONSE_CACHE_TIMEOUT = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+# alias in CACHES of the cache that holds candidates' dashboards
+DASHBOARD_CACHE = getattr(settings, 'DASHBOARD_CACHE', 'default')
+
+
+def version_key(namespace):
+    return f'{namespace}:version'
+
+
+def dashboard_namespace(candidate_id):
+    return f'dashboard:{candidate_id}'
+
+
+def calendar_namespace(candidate_id):
+    return f'calendar:{candidate_id}'
+
+
+def token_namespace(key):
+    # the key is a secret, so it isn't stored in the cache's key names
+    return f'token:{hashlib.sha1(key.encode()).hexdigest()}'
+
+
+def get_version(namespace, using='default'):
+    """Returns the current version number of namespace
+
+    A namespace starts at the current time in milliseconds, so if its
+    version is evicted from the cache it starts again above any version it
+    had before.
+    """
+
+    return caches[using].get_or_set(
+        version_key(namespace), lambda: int(time.time() * 1000), None
+    )
+
+
+def bump_version(namespace, using='default'):
+    """Moves namespace to a new version, so its cached responses are not used"""
+
+    try:
+        caches[using].incr(version_key(namespace))
+    except ValueError:
+        get_version(namespace, using)
+
+
+def make_etag(content, media_type=''):
+    """Returns a strong ETag for the rendered content of a response
+
+    Arguments:
+        media_type -- the representation the content is sent as, when the
+            same content can be sent as more than one
+    """
+
+    return '"%s"' % hashlib.sha1(media_type.encode() + b'\n' + content).hexdigest()
+
+
+def not_modified(request, etag):
+    """Returns True if the request's If-None-Match matches etag"""
+
+    etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    return '*' in etags or etag in [tag.replace('W/', '', 1) for tag in etags]
+
+
+def cached_response(request, namespace, build_response, using='default', variant=''):
+    """Returns the cached response for this request's URL and media type
+
+    The response is cached, and its ETag computed, per media type content
+    negotiation picked (JSON, indented JSON, the browsable API), so a
+    representation is never answered with another one's ETag.
+
+    Arguments:
+        namespace -- cache namespace the response belongs to
+        build_response -- function that builds the Response on a cache miss
+        using -- alias in CACHES of the cache to store the response in
+        variant -- anything else the response depends on, such as the
+            time it was built at, cached separately
+
+    Returns:
+        Response -- cached JSON with an ETag header, or 304 status code
+    """
+
+    cache = caches[using]
+    media_type = getattr(request, 'accepted_media_type', None) or ''
+    url = hashlib.sha1(f'{variant} {media_type} {request.build_absolute_uri()}'.encode()).hexdigest()
+    key = f'{namespace}:{get_version(namespace, using)}:{url}'
+
+    entry = cache.get(key)
+    if entry is None:
+        # built from the primary, a lagging replica could cache rows from
+        # before the change that bumped the version
+        with primary_reads():
+            data = build_response().data
+
+        # cache plain JSON data, serializers return objects that don't pickle
+        content = FastJSONRenderer().render(data)
+        entry = (make_etag(content, media_type), json_loads(content))
+        cache.set(key, entry, RESPONSE_CACHE_TIMEOUT)
+
+    etag, data = entry
+    headers = {'ETag': etag, 'Vary': 'Accept'}
+
+    if not_modified(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(data, headers=headers)
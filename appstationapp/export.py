@@ -0,0 +1,107 @@
+"""Streaming export of a candidate's application history
+
+    The export is built row by row while it is sent. Jobs are read from a
+    database cursor in chunks, with one query for the events of each chunk
+    of jobs, so memory use stays flat no matter how many jobs a candidate
+    has.
+"""
+import csv
+from itertools import islice
+from rest_framework import serializers
+from appstationapp.models import Event, Job, Question
+from appstationapp.renderers import json_dumps
+
+
+# number of rows read from the database at a time
+EXPORT_CHUNK_SIZE = 500
+
+JOB_COLUMNS = ('id', 'title', 'description', 'link', 'status__status', 'company__name')
+EVENT_COLUMNS = ('id', 'job_id', 'details', 'start_time', 'end_time')
+QUESTION_COLUMNS = ('id', 'question', 'is_from_interviewer', 'answer')
+
+# columns of the CSV export, one row per job, event or question
+CSV_COLUMNS = (
+    'record', 'id', 'job_id', 'company', 'status', 'title', 'description',
+    'link', 'details', 'start_time', 'end_time', 'question',
+    'is_from_interviewer', 'answer'
+)
+
+# formats datetimes the same way as the API's serializers
+datetime_field = serializers.DateTimeField()
+
+
+def export_records(candidate_id, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields every job, with its events, and then every question of a candidate"""
+
+    jobs = (
+        Job.objects.for_candidate(candidate_id)
+        .order_by('id')
+        .values(*JOB_COLUMNS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    while True:
+        chunk = list(islice(jobs, chunk_size))
+        if not chunk:
+            break
+
+        # one query for the events of the whole chunk of jobs
+        events = {}
+        for event in (
+            Event.objects.filter(job_id__in=[job['id'] for job in chunk])
+            .order_by('job_id', 'start_time')
+            .values(*EVENT_COLUMNS)
+        ):
+            event['start_time'] = datetime_field.to_representation(event['start_time'])
+            event['end_time'] = datetime_field.to_representation(event['end_time'])
+            events.setdefault(event['job_id'], []).append(event)
+
+        for job in chunk:
+            yield {
+                'record': 'job',
+                'id': job['id'],
+                'title': job['title'],
+                'description': job['description'],
+                'link': job['link'],
+                'status': job['status__status'],
+                'company': job['company__name'],
+                'events': events.get(job['id'], [])
+            }
+
+    questions = (
+        Question.objects.for_candidate(candidate_id)
+        .order_by('id')
+        .values(*QUESTION_COLUMNS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    for question in questions:
+        yield {'record': 'question', **question}
+
+
+def ndjson_lines(records):
+    """Yields each record as one line of JSON"""
+
+    for record in records:
+        yield json_dumps(record) + b'\n'
+
+
+class Echo:
+    """File-like object that returns what is written to it, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(records):
+    """Yields a header and then one CSV line per job, event and question"""
+
+    writer = csv.DictWriter(Echo(), fieldnames=CSV_COLUMNS)
+    yield writer.writerow(dict(zip(CSV_COLUMNS, CSV_COLUMNS)))
+
+    for record in records:
+        events = record.pop('events', [])
+        yield writer.writerow(record)
+
+        for event in events:
+            yield writer.writerow({'record': 'event', **event})
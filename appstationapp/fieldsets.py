@@ -0,0 +1,62 @@
+"""Sparse fieldsets for Application Station
+
+    GET requests for a list or a single row can ask for only some of the
+    serializer's fields:
+
+        ?fields=id,title -- only the named fields
+        ?view=summary -- the serializer's Meta.summary_fields
+
+    The other fields are left out of the SQL as well as the JSON: list
+    endpoints select only the columns of a trimmed Projection, and retrieve
+    endpoints load the row with only() (see projections.py).
+"""
+from rest_framework.exceptions import ValidationError
+
+
+def requested_fields(request, serializer_class):
+    """Returns the fields a request asks for, or None for every field
+
+    ?fields= wins over ?view= when both are given.
+
+    Raises:
+        ValidationError -- for an unknown field or view, or ?fields= without
+        any field
+    """
+
+    fields = serializer_class.Meta.fields
+    names = request.query_params.get('fields')
+    view = request.query_params.get('view')
+
+    if names is not None:
+        requested = [name.strip() for name in names.split(',') if name.strip()]
+        if not requested:
+            raise ValidationError({'fields': f'Name at least one field. Choose from: {", ".join(fields)}'})
+
+        unknown = [name for name in requested if name not in fields]
+        if unknown:
+            raise ValidationError({'fields': f'Unknown fields: {", ".join(unknown)}. '
+                f'Choose from: {", ".join(fields)}'})
+        return tuple(field for field in fields if field in requested)
+
+    if view == 'summary':
+        return serializer_class.Meta.summary_fields
+
+    if view not in (None, '', 'full'):
+        raise ValidationError({'view': 'view must be summary or full'})
+
+    return None
+
+
+class SparseFieldsMixin:
+    """Serializer mixin that takes the fields to output as a fields argument
+
+    Arguments:
+        fields -- names of the fields to keep, or None for every field
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -0,0 +1,199 @@
+"""Password hashing for Application Station, off the request threads
+
+    Checking or hashing a password runs PBKDF2 for a few hundred
+    milliseconds of CPU. Done directly on the request threads, a burst of
+    logins takes every worker and the rest of the API queues behind them.
+
+    hashing_pool runs the hashing in a small dedicated pool of threads
+    instead (hashlib releases the GIL while it hashes, so they run in
+    parallel with the request threads). At most MAX_PENDING hashes wait or
+    run at once; past that, and when a hash waits longer than TIMEOUT
+    seconds, PoolSaturated is raised so the view can answer 503 straight
+    away instead of tying up another worker.
+
+    run() still blocks its caller until the hash is done: a synchronous
+    view (every view, in Django 3.0) waits on its request thread either way.
+    What the pool buys there is the bound on how many hashes run at once,
+    and the immediate 503 past it. Only async code, under ASGI, gets the
+    thread back while it waits, with run_async(), which awaits the hash
+    instead of blocking.
+
+    A hash that times out is cancelled if it hasn't started yet. One that
+    has started can't be stopped, and keeps its place in MAX_PENDING until
+    it finishes. stats() counts both.
+
+    Every rejection is logged on the appstationapp.hashing logger, whether
+    or not METRICS are enabled.
+
+    Configured with AUTH_HASHING in settings.py. MODE 'inline' hashes on
+    the request thread, as Django does by default.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturated(Exception):
+    """Raised when the hashing pool has no room for another password"""
+
+
+class HashingPool:
+    """Bounded thread pool for CPU heavy password hashing
+
+    Arguments:
+        workers -- number of passwords hashed at the same time
+        max_pending -- number of passwords waiting or being hashed before
+            further ones are rejected
+        timeout -- seconds a request waits for its password to be hashed
+        mode -- 'pool', or 'inline' to hash on the calling thread
+    """
+
+    def __init__(self, workers=4, max_pending=16, timeout=10, mode='pool'):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.mode = mode
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._cancelled = 0
+        self._abandoned = 0
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix='hashing'
+                )
+            return self._executor
+
+    def run(self, function, *args, **kwargs):
+        """Returns function(*args, **kwargs), run on the pool
+
+        Blocks the calling thread until the result is ready.
+
+        Raises:
+            PoolSaturated -- if the pool is full or the result takes too long
+        """
+
+        if self.mode == 'inline':
+            return function(*args, **kwargs)
+
+        future = self.submit(function, args, kwargs)
+
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            self.timed_out(future)
+            raise PoolSaturated()
+
+    async def run_async(self, function, *args, **kwargs):
+        """Returns function(*args, **kwargs), run on the pool, without
+        blocking the event loop's thread while it waits
+
+        Raises:
+            PoolSaturated -- if the pool is full or the result takes too long
+        """
+
+        if self.mode == 'inline':
+            return function(*args, **kwargs)
+
+        future = self.submit(function, args, kwargs)
+
+        try:
+            # shield, so a timeout leaves the cancelling to timed_out
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out(future)
+            raise PoolSaturated()
+
+    def submit(self, function, args, kwargs):
+        """Queues function on the pool, unless MAX_PENDING are already queued or running"""
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                pending = self._pending
+            else:
+                pending = None
+                self._pending += 1
+
+        if pending is not None:
+            logger.warning('Hashing pool full, %d passwords pending, rejected one', pending)
+            raise PoolSaturated()
+
+        future = self.executor.submit(self._call, function, args, kwargs)
+        future.add_done_callback(self._done)
+        return future
+
+    def timed_out(self, future):
+        """Cancels a hash nobody waits for any more, if it hasn't started"""
+
+        cancelled = future.cancel()
+        with self._lock:
+            self._rejected += 1
+            if not cancelled:
+                self._abandoned += 1
+
+        logger.warning(
+            'Password hash timed out after %ss, %s', self.timeout,
+            'cancelled before it started' if cancelled else 'still hashing'
+        )
+
+    def _call(self, function, args, kwargs):
+        with self._lock:
+            self._running += 1
+        # authenticate queries the database from the pool's threads, which
+        # request_started and request_finished don't reach
+        close_old_connections()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            close_old_connections()
+            with self._lock:
+                self._running -= 1
+
+    def _done(self, future):
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                self._cancelled += 1
+            else:
+                self._completed += 1
+
+    def stats(self):
+        """Returns the pool's size, queue depth and counters"""
+
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending,
+                'running': self._running,
+                'queued': self._pending - self._running,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                # timed out before they started, and after
+                'cancelled': self._cancelled,
+                'abandoned': self._abandoned,
+            }
+
+
+hashing_settings = getattr(settings, 'AUTH_HASHING', {})
+hashing_pool = HashingPool(
+    workers=hashing_settings.get('WORKERS', 4),
+    max_pending=hashing_settings.get('MAX_PENDING', 16),
+    timeout=hashing_settings.get('TIMEOUT', 10),
+    mode=hashing_settings.get('MODE', 'pool')
+)
@@ -0,0 +1,126 @@
+"""iCalendar feed of a candidate's events
+
+    Calendar clients poll the feed, usually every few minutes, so it is
+    cached per candidate under the candidate's calendar namespace (see
+    caching.py), which moves to a new version when one of the candidate's
+    events or jobs changes.
+
+    The feed is regenerated incrementally: the cached feed keeps the
+    VEVENT block of every event along with the values it was rendered from,
+    and when the namespace has moved on only the events whose values
+    changed are rendered again. Regenerating the feed costs one indexed
+    query for the candidate's events.
+"""
+from django.core.cache import caches
+from django.utils import timezone
+from appstationapp.caching import calendar_namespace, get_version, make_etag
+from appstationapp.models import Event
+
+
+# Columns of an event that its VEVENT block is rendered from
+EVENT_COLUMNS = ('id', 'details', 'start_time', 'end_time', 'job__title', 'job__company__name')
+
+HEADER = (
+    'BEGIN:VCALENDAR\r\n'
+    'VERSION:2.0\r\n'
+    'PRODID:-//Application Station//Events//EN\r\n'
+    'CALSCALE:GREGORIAN\r\n'
+    'X-WR-CALNAME:Application Station\r\n'
+)
+
+FOOTER = 'END:VCALENDAR\r\n'
+
+
+def format_time(value):
+    """Returns a datetime as an iCalendar UTC date and time"""
+
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def escape(text):
+    """Escapes text for an iCalendar TEXT value"""
+
+    return (
+        (text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Folds a content line into lines of at most 75 octets, ending in CRLF"""
+
+    parts = []
+    part = ''
+    size = 0
+    for char in line:
+        width = len(char.encode())
+        # continuation lines start with a space, which counts to the 75
+        if size + width > 75:
+            parts.append(part)
+            part = ' '
+            size = 1
+        part += char
+        size += width
+    parts.append(part)
+
+    return '\r\n'.join(parts) + '\r\n'
+
+
+def vevent(row, stamp):
+    """Returns the VEVENT block of an event"""
+
+    event_id, details, start_time, end_time, title, company = row
+
+    return ''.join(fold(line) for line in (
+        'BEGIN:VEVENT',
+        f'UID:event-{event_id}@applicationstation',
+        f'DTSTAMP:{stamp}',
+        f'DTSTART:{format_time(start_time)}',
+        f'DTEND:{format_time(end_time)}',
+        f'SUMMARY:{escape(details)}',
+        f'DESCRIPTION:{escape(f"{title} at {company}")}',
+        'END:VEVENT',
+    ))
+
+
+def calendar_feed(candidate_id):
+    """Returns the ETag and iCalendar bytes of a candidate's events"""
+
+    cache = caches['default']
+    namespace = calendar_namespace(candidate_id)
+    version = get_version(namespace)
+    key = f'{namespace}:feed'
+
+    entry = cache.get(key)
+    if entry is not None and entry['version'] == version:
+        return entry['etag'], entry['content']
+
+    blocks = entry['blocks'] if entry is not None else {}
+    stamp = format_time(timezone.now())
+
+    rows = (
+        Event.objects.for_candidate(candidate_id)
+        .order_by('start_time', 'id')
+        .values_list(*EVENT_COLUMNS)
+    )
+
+    # reuse the block of every event that hasn't changed
+    new_blocks = {}
+    for row in rows:
+        block = blocks.get(row[0])
+        if block is None or block[0] != row:
+            block = (row, vevent(row, stamp))
+        new_blocks[row[0]] = block
+
+    content = (HEADER + ''.join(block for _, block in new_blocks.values()) + FOOTER).encode()
+    etag = make_etag(content)
+
+    # kept until it is evicted, the blocks stay useful across versions
+    cache.set(key, {
+        'version': version,
+        'etag': etag,
+        'content': content,
+        'blocks': new_blocks
+    }, None)
+
+    return etag, content
@@ -0,0 +1,33 @@
+"""Overlap detection for time intervals
+
+    overlapping_pairs sorts the intervals by start and sweeps through them
+    once, keeping a heap of the intervals that haven't ended yet. Each
+    interval overlaps exactly the intervals still on the heap when it
+    starts, so finding every overlap costs O(n log n) plus the number of
+    overlaps, instead of comparing every pair.
+"""
+import heapq
+
+
+def overlapping_pairs(intervals):
+    """Returns every pair of keys whose intervals overlap
+
+    Arguments:
+        intervals -- iterable of (start, end, key). Intervals that only touch,
+            one ending when the next starts, don't overlap
+
+    Returns:
+        list -- (earlier key, later key) tuples, ordered by the later start
+    """
+
+    pairs = []
+    active = []
+
+    for start, end, key in sorted(intervals, key=lambda interval: interval[:2]):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+
+        pairs.extend((other, key) for _, _, other in sorted(active, key=lambda item: item[1]))
+        heapq.heappush(active, (end, start, key))
+
+    return pairs
@@ -0,0 +1,104 @@
+"""Management command for load testing the ASGI entry point
+
+    Sends concurrent GET requests straight into Django's stock ASGIHandler
+    and into ReadPoolASGIHandler, in this process and without a server, and
+    reports throughput and latency for each concurrency level.
+
+    python manage.py benchasgi --requests 2000 --concurrency 10 100 500
+"""
+import asyncio
+import time
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+from applicationstationapi.handlers import ReadPoolASGIHandler
+
+
+class Command(BaseCommand):
+    help = 'Load test the ASGI handlers with concurrent GET requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000,
+            help='number of requests sent at each concurrency level')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 100, 500],
+            help='numbers of requests in flight at once')
+        parser.add_argument('--paths', nargs='+',
+            default=['/jobs', '/events', '/questions', '/companies', '/statuses'])
+        parser.add_argument('--token',
+            help='token to authenticate with, defaults to the first token in the database')
+
+    def handle(self, *args, **options):
+        token = options['token'] or Token.objects.values_list('key', flat=True).first()
+        if token is None:
+            raise CommandError('No token in the database, register a user or pass --token')
+
+        handlers = (
+            ('ASGIHandler', ASGIHandler()),
+            ('ReadPoolASGIHandler', ReadPoolASGIHandler()),
+        )
+
+        for concurrency in options['concurrency']:
+            for label, handler in handlers:
+                latencies, statuses, elapsed = asyncio.run(self.load(
+                    handler, options['paths'], token, options['requests'], concurrency
+                ))
+                latencies.sort()
+                self.stdout.write(
+                    f'{label:>20} concurrency {concurrency:>4}: '
+                    f'{len(latencies) / elapsed:8.1f} req/s, '
+                    f'p50 {latencies[len(latencies) // 2] * 1000:8.1f} ms, '
+                    f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:8.1f} ms, '
+                    f'status codes {dict(sorted(statuses.items()))}'
+                )
+
+    async def load(self, handler, paths, token, total, concurrency):
+        latencies = []
+        statuses = {}
+        sent = 0
+
+        async def worker():
+            nonlocal sent
+            while sent < total:
+                path = paths[sent % len(paths)]
+                sent += 1
+
+                start = time.perf_counter()
+                code = await self.request(handler, path, token)
+                latencies.append(time.perf_counter() - start)
+                statuses[code] = statuses.get(code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, statuses, time.perf_counter() - start
+
+    async def request(self, handler, path, token):
+        """Sends one GET request through handler and returns its status code"""
+
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [
+                (b'host', b'localhost'),
+                (b'authorization', f'Token {token}'.encode()),
+            ],
+            'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+        }
+        response = {}
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+
+        await handler(scope, receive, send)
+        return response['status']
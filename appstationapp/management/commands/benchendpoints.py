@@ -0,0 +1,232 @@
+"""Management command for benchmarking every endpoint of the router
+
+    Sends GET requests to every list, detail and extra action the router in
+    applicationstationapi/urls.py serves, through Django's test client and
+    the full middleware stack, as one user of the current database. Seed it
+    first with seeddata. Reports p50 and p99 latency, queries per request
+    and status codes for each endpoint.
+
+    --writes also benchmarks creating and updating, each request inside a
+    transaction that is rolled back, so the database is left unchanged.
+
+    --save writes the results to a JSON file, and --compare checks them
+    against a file saved earlier: an endpoint regressed if its p50 grew by
+    more than --threshold percent or it runs more queries. The command
+    fails if any endpoint regressed.
+
+    python manage.py benchendpoints --save baseline.json
+    python manage.py benchendpoints --compare baseline.json
+"""
+import json
+import time
+from contextlib import ExitStack
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from applicationstationapi.urls import router
+from appstationapp.models import Candidate, Event, Job, Question
+
+
+# query strings of the actions that need one
+QUERY_STRINGS = {
+    'search-list': '?q=engineer',
+    'company-autocomplete': '?q=bl',
+}
+
+
+class QueryCounter:
+    """Execute wrapper counting the queries of a request"""
+
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the latency and queries of every router endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50,
+            help='number of timed requests to each endpoint')
+        parser.add_argument('--warmup', type=int, default=5,
+            help='number of untimed requests to each endpoint first')
+        parser.add_argument('--user', default='seed-0@example.com',
+            help='username to send the requests as, defaults to the first seeded user '
+                'or else the user with the most jobs')
+        parser.add_argument('--writes', action='store_true',
+            help='also benchmark POST and PUT requests, rolled back after each one')
+        parser.add_argument('--only', nargs='+', default=[],
+            help='only benchmark endpoints whose name contains one of these')
+        parser.add_argument('--save', help='JSON file to write the results to')
+        parser.add_argument('--compare', help='JSON file of earlier results to compare with')
+        parser.add_argument('--threshold', type=float, default=25,
+            help='percent a p50 may grow by before it counts as a regression')
+
+    def handle(self, *args, **options):
+        candidate = self.candidate(options['user'])
+        token, _ = Token.objects.get_or_create(user=candidate.user)
+        client = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        requests = self.read_requests(candidate)
+        if options['writes']:
+            requests += self.write_requests(candidate)
+        if options['only']:
+            requests = [request for request in requests if any(part in request[0] for part in options['only'])]
+
+        self.stdout.write(f'{"endpoint":<28} {"p50 ms":>9} {"p99 ms":>9} {"queries":>8}  status codes')
+        results = {}
+        for name, method, path, body in requests:
+            results[name] = self.measure(client, method, path, body, options)
+            result = results[name]
+            self.stdout.write(
+                f'{name:<28} {result["p50_ms"]:9.2f} {result["p99_ms"]:9.2f} '
+                f'{result["queries"]:8.1f}  {result["status_codes"]}'
+            )
+
+        if options['save']:
+            with open(options['save'], 'w') as output:
+                json.dump({'user': candidate.user.username, 'endpoints': results}, output, indent=2)
+            self.stdout.write(f'Saved the results to {options["save"]}')
+
+        if options['compare']:
+            self.compare(results, options['compare'], options['threshold'])
+
+    def candidate(self, username):
+        candidates = Candidate.objects.select_related('user')
+        candidate = candidates.filter(user__username=username).first()
+        if candidate is None:
+            candidate = candidates.annotate(jobs=Count('job')).filter(jobs__gt=0).order_by('-jobs').first()
+        if candidate is None:
+            raise CommandError('No user with jobs in the database, run seeddata first')
+        return candidate
+
+    def read_requests(self, candidate):
+        """Returns (name, method, path, body) of a GET to every router endpoint"""
+
+        job = Job.objects.filter(candidate=candidate).order_by('id').first()
+        pks = {
+            'job': job.id,
+            'status': job.status_id,
+            'company': job.company_id,
+            'event': Event.objects.filter(job__candidate=candidate).values_list('id', flat=True).first(),
+            'question': Question.objects.filter(candidate=candidate).values_list('id', flat=True).first(),
+        }
+
+        requests = []
+        names = set()
+        for pattern in router.urls:
+            # each route is listed again with a format suffix
+            actions = getattr(pattern.callback, 'actions', None) or {}
+            if 'get' not in actions or pattern.name in names:
+                continue
+            names.add(pattern.name)
+
+            kwargs = {}
+            if 'pk' in pattern.pattern.regex.groupindex:
+                # the user may have no events or questions
+                pk = pks.get(pattern.name.rsplit('-', 1)[0])
+                if pk is None:
+                    continue
+                kwargs['pk'] = pk
+
+            path = reverse(pattern.name, kwargs=kwargs) + QUERY_STRINGS.get(pattern.name, '')
+            requests.append((f'GET {pattern.name}', 'get', path, None))
+
+        return requests
+
+    def write_requests(self, candidate):
+        """Returns (name, method, path, body) of a create or update of each kind of row"""
+
+        job = Job.objects.filter(candidate=candidate).order_by('id').first()
+        job_body = {
+            'title': 'Benchmark job', 'description': 'Benchmark', 'link': '',
+            'status_id': job.status_id, 'company_id': job.company_id,
+        }
+
+        return [
+            ('POST job-list', 'post', reverse('job-list'), job_body),
+            ('PUT job-detail', 'put', reverse('job-detail', kwargs={'pk': job.id}), job_body),
+            ('POST event-list', 'post', reverse('event-list') + '?force=true', {
+                'details': 'Benchmark', 'start_time': '2030-01-07T09:00:00Z',
+                'end_time': '2030-01-07T10:00:00Z', 'job_id': job.id,
+            }),
+            ('POST question-list', 'post', reverse('question-list'), {
+                'question': 'Benchmark?', 'is_from_interviewer': False,
+            }),
+            ('POST company-list', 'post', reverse('company-list'), {'name': 'Benchmark company'}),
+        ]
+
+    def measure(self, client, method, path, body, options):
+        send = getattr(client, method)
+        data = json.dumps(body) if body is not None else None
+        latencies = []
+        statuses = {}
+        counter = QueryCounter()
+
+        for n in range(options['warmup'] + options['requests']):
+            timed = n >= options['warmup']
+
+            with ExitStack() as stack:
+                if timed:
+                    for connection in connections.all():
+                        stack.enter_context(connection.execute_wrapper(counter))
+                if body is not None:
+                    # leave the database as it was
+                    stack.enter_context(transaction.atomic())
+
+                start = time.perf_counter()
+                response = send(path, data, content_type='application/json') if body is not None else send(path)
+                if response.streaming:
+                    # exports run their queries as they stream
+                    b''.join(response.streaming_content)
+                elapsed = time.perf_counter() - start
+
+                if body is not None:
+                    transaction.set_rollback(True)
+
+            if timed:
+                latencies.append(elapsed * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        latencies.sort()
+        return {
+            'p50_ms': round(latencies[len(latencies) // 2], 3),
+            'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3),
+            'queries': round(counter.queries / len(latencies), 2),
+            'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+        }
+
+    def compare(self, results, path, threshold):
+        try:
+            with open(path) as baseline_file:
+                baseline = json.load(baseline_file)['endpoints']
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'Could not read the baseline {path}: {error}')
+
+        self.stdout.write(f'\nCompared with {path}:')
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                self.stdout.write(f'{name:<28} not in the baseline')
+                continue
+
+            before = baseline[name]
+            change = (result['p50_ms'] - before['p50_ms']) / max(before['p50_ms'], 1e-9) * 100
+            regressed = change > threshold or result['queries'] > before['queries']
+            if regressed:
+                regressions.append(name)
+
+            self.stdout.write(
+                f'{name:<28} p50 {before["p50_ms"]:8.2f} -> {result["p50_ms"]:8.2f} ms ({change:+6.1f}%), '
+                f'queries {before["queries"]:5.1f} -> {result["queries"]:5.1f}'
+                + ('  REGRESSED' if regressed else '')
+            )
+
+        if regressions:
+            raise CommandError(f'{len(regressions)} endpoints regressed: {", ".join(regressions)}')
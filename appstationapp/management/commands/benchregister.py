@@ -0,0 +1,65 @@
+"""Management command for measuring how fast users are created
+
+    Creates the same number of users three ways and reports candidates per
+    second for each:
+
+        autocommit -- User, Candidate and Token saved one after another,
+            each in its own transaction, as registration used to
+        register -- register(), one transaction per user
+        provision -- provision(), one transaction per batch
+
+    Passwords are left unusable so the numbers are the database's alone;
+    hashing costs the same whichever way the rows are saved. The users are
+    committed, since commits are what is being measured, and deleted again
+    at the end.
+
+    python manage.py benchregister --users 1000
+"""
+import time
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from rest_framework.authtoken.models import Token
+from appstationapp.models import Candidate
+from appstationapp.registration import new_user, provision, register
+
+
+class Command(BaseCommand):
+    help = 'Compare the speed of creating users one at a time and in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000,
+            help='number of users created each way')
+        parser.add_argument('--batch-size', type=int, default=500,
+            help='number of users provision() saves in each transaction')
+
+    def handle(self, *args, **options):
+        password = make_password(None)
+
+        def users(label):
+            return [
+                new_user(f'bench-register-{label}-{n}@example.com', password, 'Bench', str(n))
+                for n in range(options['users'])
+            ]
+
+        try:
+            self.report('autocommit', lambda: [self.autocommit(user) for user in users('autocommit')])
+            self.report('register', lambda: [register(user) for user in users('register')])
+            self.report('provision', lambda: provision(users('provision'), options['batch_size']))
+        finally:
+            User.objects.filter(username__startswith='bench-register-').delete()
+
+    def autocommit(self, user):
+        user.save()
+        Candidate.objects.create(user=user)
+        Token.objects.create(user=user)
+
+    def report(self, label, create):
+        start = time.perf_counter()
+        created = len(create())
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f'{label:>10}: {created} candidates in {elapsed * 1000:8.1f} ms, '
+            f'{created / elapsed:8.0f} candidates/s'
+        )
@@ -0,0 +1,76 @@
+"""Management command for comparing the JSON renderers and parsers
+
+    Renders and parses a page of synthetic jobs with Django REST Framework's
+    JSONRenderer/JSONParser and with FastJSONRenderer/FastJSONParser.
+
+    python manage.py benchrender --jobs 5000
+"""
+import io
+import time
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from appstationapp import renderers
+from appstationapp.renderers import FastJSONParser, FastJSONRenderer
+
+
+class Command(BaseCommand):
+    help = 'Compare the throughput of the JSON renderers and parsers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=5000,
+            help='number of jobs in the payload')
+        parser.add_argument('--repeat', type=int, default=20,
+            help='number of times each renderer and parser runs')
+
+    def handle(self, *args, **options):
+        data = self.payload(options['jobs'])
+        content = JSONRenderer().render(data)
+        repeat = options['repeat']
+
+        backend = 'orjson' if renderers.orjson is not None else 'json (orjson is not installed)'
+        self.stdout.write(f'{options["jobs"]} jobs, {len(content) / 1e6:.2f} MB, '
+            f'FastJSON backend: {backend}')
+
+        for label, render in (
+            ('JSONRenderer', JSONRenderer().render),
+            ('FastJSONRenderer', FastJSONRenderer().render),
+        ):
+            self.report(label, repeat, len(content), lambda: render(data))
+
+        for label, parser in (
+            ('JSONParser', JSONParser()),
+            ('FastJSONParser', FastJSONParser()),
+        ):
+            self.report(label, repeat, len(content),
+                lambda: parser.parse(io.BytesIO(content), parser_context={'encoding': 'utf-8'}))
+
+    def payload(self, count):
+        """A page of jobs shaped like the response of Jobs.list"""
+
+        return {
+            'next': None,
+            'previous': None,
+            'results': [
+                {
+                    'id': n,
+                    'url': f'http://localhost:8000/jobs/{n}',
+                    'title': f'Software Engineer {n}',
+                    'description': 'Build and maintain our APIs — Python, Django, SQL. ' * 10,
+                    'link': f'https://example.com/careers/{n}',
+                    'candidate_id': 1,
+                    'status': {'url': 'http://localhost:8000/statuses/2', 'status': 'Applied'},
+                    'company': {'url': f'http://localhost:8000/companies/{n % 50}', 'name': f'company {n % 50}'},
+                }
+                for n in range(count)
+            ]
+        }
+
+    def report(self, label, repeat, size, run):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        elapsed = (time.perf_counter() - start) / repeat
+
+        self.stdout.write(f'{label:>18}: {elapsed * 1000:8.2f} ms per payload, '
+            f'{size / elapsed / 1e6:8.1f} MB/s')
@@ -0,0 +1,77 @@
+"""Management command for merging companies that have the same name
+
+    Companies used to be created without checking for an existing company
+    of the same name. This merges every group of companies whose normalized
+    names match into the oldest company of the group: jobs are moved to it,
+    the others are deleted and its name is normalized.
+
+    Run it before migrating to the unique company name, which fails while
+    duplicates exist.
+
+    python manage.py dedupecompanies --dry-run
+    python manage.py dedupecompanies
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from appstationapp import analytics
+from appstationapp.models import Company, Job, normalize_company_name
+from appstationapp.signals import invalidate_calendars, invalidate_dashboards
+
+
+class Command(BaseCommand):
+    help = 'Merge companies whose normalized names are the same'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+            help='report the duplicates without changing anything')
+
+    def handle(self, *args, **options):
+        groups = {}
+        for company_id, name in Company.objects.order_by('id').values_list('id', 'name').iterator():
+            groups.setdefault(normalize_company_name(name), []).append((company_id, name))
+
+        renamed = [
+            (name, group[0][0]) for name, group in groups.items() if group[0][1] != name
+        ]
+        merges = {
+            group[0][0]: [company_id for company_id, _ in group[1:]]
+            for group in groups.values() if len(group) > 1
+        }
+        duplicates = [company_id for ids in merges.values() for company_id in ids]
+
+        moved_jobs = Job.objects.filter(company_id__in=duplicates).count()
+        self.stdout.write(f'{len(duplicates)} duplicate companies in {len(merges)} names, '
+            f'{moved_jobs} jobs to move, {len(renamed)} names to normalize')
+
+        if options['dry_run']:
+            return
+
+        with transaction.atomic():
+            # the candidates whose jobs move to another company or whose
+            # company is renamed
+            candidate_ids = set(
+                Job.objects.filter(
+                    company_id__in=duplicates + [company_id for _, company_id in renamed]
+                ).values_list('candidate_id', flat=True)
+            )
+            for keeper, ids in merges.items():
+                Job.objects.filter(company_id__in=ids).update(company_id=keeper)
+
+            # jobs were moved first, deleting a company deletes its jobs
+            Company.objects.filter(id__in=duplicates).delete()
+
+            for name, company_id in renamed:
+                company = Company(id=company_id, name=name)
+                company.save(update_fields=['name'])
+
+            # update() doesn't send post_save. The dashboards, calendars and
+            # analytics of the moved jobs show the company they now belong
+            # to, and the renamed companies' new names. The deletes and
+            # renames send their signals, which update the autocomplete.
+            transaction.on_commit(lambda: (
+                invalidate_dashboards(candidate_ids), invalidate_calendars(candidate_ids)
+            ))
+            if candidate_ids:
+                analytics.rebuild(candidate_ids)
+
+        self.stdout.write(f'Merged {len(duplicates)} companies')
@@ -0,0 +1,91 @@
+"""Management command for checking the query plans of the list endpoints
+
+    Seeds large tables with seeddata inside a transaction, prints the query plan and
+    timing for the first page of each list endpoint, then rolls everything
+    back so the database is left untouched.
+
+    python manage.py explainlists --rows 100000
+"""
+import time
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from appstationapp.models import Candidate, Company, Event, Job, Question
+from appstationapp.pagination import ModelCursorPagination
+from appstationapp.views.jobs import jobs_with_relations
+
+
+class Command(BaseCommand):
+    help = 'Seed large tables and print the query plans of the list endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000,
+            help='number of jobs, events and questions to seed, on average')
+        parser.add_argument('--candidates', type=int, default=100,
+            help='number of candidates the rows are spread across')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            candidate_id, job_id, company_name = self.seed(options)
+
+            for label, queryset in self.list_queries(candidate_id, job_id, company_name):
+                self.explain(label, queryset)
+
+            # leave the database exactly as it was
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        """Seeds the rows with seeddata, returning a candidate, job and company to query
+
+        An already seeded database is flushed first, which is rolled back
+        along with the rest.
+        """
+
+        per_candidate = max(options['rows'] // max(options['candidates'], 1), 1)
+        args = [
+            '--candidates', options['candidates'], '--companies', max(options['rows'] // 20, 1),
+            '--jobs', per_candidate, '--events', 1, '--questions', per_candidate,
+        ]
+        if User.objects.filter(username__startswith='seed-').exists():
+            args.append('--flush')
+        call_command('seeddata', *map(str, args), stdout=self.stdout)
+
+        # the seeded candidate with the most jobs, so the pages are full
+        candidate = Candidate.objects.filter(
+            user__username__startswith='seed-'
+        ).annotate(jobs=Count('job')).order_by('-jobs', 'id').first()
+        if candidate is None:
+            raise CommandError('--candidates must be at least 1')
+        job = Job.objects.filter(candidate=candidate).select_related('company').order_by('id').first()
+        if job is None:
+            raise CommandError('--rows is too small to seed any jobs')
+
+        return candidate.id, job.id, job.company.name
+
+    def list_queries(self, candidate_id, job_id, company_name):
+        """The querysets the list endpoints run, before pagination"""
+
+        return (
+            ('jobs', jobs_with_relations().filter(candidate__id=candidate_id)),
+            ('events', Event.objects.filter(job__candidate_id=candidate_id)),
+            ('events?job_id', Event.objects.filter(
+                job__candidate_id=candidate_id, job__id=job_id
+            )),
+            ('questions', Question.objects.filter(candidate__id=candidate_id)),
+            ('companies?name', Company.objects.filter(name=company_name)),
+        )
+
+    def explain(self, label, queryset):
+        # order and slice the queryset the same way the paginator does
+        paginator = ModelCursorPagination()
+        ordering = paginator.get_ordering(None, queryset, None)
+        page = queryset.order_by(*ordering)[:paginator.page_size + 1]
+
+        start = time.perf_counter()
+        list(page)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n{label} ({elapsed:.2f} ms)'))
+        self.stdout.write(page.explain())
@@ -0,0 +1,72 @@
+"""Management command for creating many candidates at once
+
+    Reads a CSV file with the columns email, first_name, last_name and,
+    optionally, password, and creates a user, candidate and token for each
+    row in batches (see appstationapp/registration.py). Rows whose email is
+    already registered are skipped. Rows without a password get an
+    unusable one, and authenticate with the token written to --output.
+
+    Passwords are hashed on --workers threads before the rows are saved.
+
+    python manage.py provisioncandidates cohort.csv --output tokens.csv
+"""
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from appstationapp.registration import new_user, provision
+
+
+class Command(BaseCommand):
+    help = 'Create a user, candidate and token for each row of a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv', help='CSV file to read, or - for standard input')
+        parser.add_argument('--output',
+            help='CSV file to write the email and token of each created user to')
+        parser.add_argument('--batch-size', type=int, default=500,
+            help='number of users saved in each transaction')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+            help='number of threads hashing passwords')
+
+    def handle(self, *args, **options):
+        rows = self.read(options['csv'])
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            # a missing password hashes to an unusable one
+            passwords = list(executor.map(make_password, [row.get('password') or None for row in rows]))
+        hashed = time.perf_counter()
+
+        users = [
+            new_user(row['email'], password, row['first_name'], row['last_name'])
+            for row, password in zip(rows, passwords)
+        ]
+        created = provision(users, options['batch_size'])
+        saved = time.perf_counter()
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                writer = csv.writer(output)
+                writer.writerow(['email', 'token'])
+                writer.writerows((user.email, token.key) for user, token in created)
+
+        self.stdout.write(
+            f'Created {len(created)} of {len(rows)} candidates, '
+            f'{len(rows) - len(created)} already registered or repeated. '
+            f'Hashing {(hashed - start) * 1000:.1f} ms, '
+            f'saving {(saved - hashed) * 1000:.1f} ms '
+            f'({len(created) / max(saved - hashed, 1e-9):.0f} candidates/s)'
+        )
+
+    def read(self, path):
+        source = sys.stdin if path == '-' else open(path, newline='')
+        with source:
+            reader = csv.DictReader(source)
+            missing = {'email', 'first_name', 'last_name'} - set(reader.fieldnames or [])
+            if missing:
+                raise CommandError(f'{path} has no {", ".join(sorted(missing))} column')
+            return list(reader)
@@ -0,0 +1,21 @@
+"""Management command for recounting the analytics totals
+
+    Recounts every candidate's PipelineCount totals from the jobs, events
+    and questions, for instance after rows were loaded with loaddata or
+    changed with queryset.update().
+
+    python manage.py rebuildanalytics
+"""
+import time
+from django.core.management.base import BaseCommand
+from appstationapp import analytics
+
+
+class Command(BaseCommand):
+    help = 'Recount the analytics totals of every candidate'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rows = analytics.rebuild()
+
+        self.stdout.write(f'Recounted {rows} totals in {(time.perf_counter() - start) * 1000:.1f} ms')
@@ -0,0 +1,21 @@
+"""Management command for rebuilding the full-text search index
+
+    Indexes every job and question again, for instance after rows were
+    loaded with loaddata or changed outside the API.
+
+    python manage.py rebuildsearch
+"""
+import time
+from django.core.management.base import BaseCommand
+from appstationapp.search import search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of jobs and questions'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        search_index.rebuild()
+
+        self.stdout.write(f'Rebuilt the {type(search_index.backend).__name__} search index '
+            f'in {(time.perf_counter() - start) * 1000:.1f} ms')
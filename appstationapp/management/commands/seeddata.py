@@ -0,0 +1,297 @@
+"""Management command for seeding the database with realistic test data
+
+    Creates candidates, companies, jobs with their status history, events
+    and questions with bulk_create, a batch of candidates at a time. The
+    rows are generated from --seed, and their times are counted from
+    --start rather than from now, so the same arguments always produce the
+    same data.
+
+    Seeded users are named seed-${n}@example.com and log in with the
+    password 'seed-password'. --flush deletes them and everything they own
+    first. Companies are shared, so they are kept and reused.
+
+    The analytics totals and the search index are rebuilt for the new rows,
+    which bulk_create saves without sending signals.
+
+    python manage.py seeddata --candidates 1000
+    python manage.py seeddata --candidates 20000 --jobs 50 --events 2 --flush
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from appstationapp import analytics
+from appstationapp.caching import bump_version
+from appstationapp.models import (Candidate, Company, Event, Job, Question, Status, StatusTransition,
+    normalize_company_name)
+from appstationapp.registration import new_user, provision
+from appstationapp.search import search_index
+
+
+SEED_PASSWORD = 'seed-password'
+
+FIRST_NAMES = ('Ada', 'Grace', 'Alan', 'Linus', 'Barbara', 'Ken', 'Margaret', 'Dennis',
+    'Frances', 'Edsger', 'Radia', 'Guido', 'Katherine', 'Donald', 'Sophie', 'Tim')
+LAST_NAMES = ('Lovelace', 'Hopper', 'Turing', 'Torvalds', 'Liskov', 'Thompson', 'Hamilton',
+    'Ritchie', 'Allen', 'Dijkstra', 'Perlman', 'Rossum', 'Johnson', 'Knuth', 'Wilson', 'Lee')
+
+COMPANY_WORDS = (
+    ('Blue', 'Bright', 'Clear', 'Green', 'Iron', 'North', 'Quiet', 'Rapid', 'Red', 'Silver',
+        'Solid', 'Summit', 'True', 'Vivid', 'Wild', 'Golden', 'Open', 'Prime', 'Swift', 'Urban'),
+    ('Harbor', 'River', 'Stone', 'Pixel', 'Cloud', 'Forge', 'Field', 'Signal', 'Bridge', 'Orbit',
+        'Pine', 'Falcon', 'Beacon', 'Circuit', 'Canyon', 'Atlas', 'Vector', 'Maple', 'Comet', 'Anchor'),
+    ('Labs', 'Systems', 'Software', 'Health', 'Media', 'Logistics', 'Analytics', 'Networks',
+        'Robotics', 'Studios'),
+)
+
+LEVELS = ('Junior', 'Associate', '', 'Senior', 'Staff', 'Lead')
+ROLES = ('Software Engineer', 'Backend Developer', 'Frontend Developer', 'Data Analyst',
+    'DevOps Engineer', 'QA Engineer', 'Product Designer', 'Full Stack Developer',
+    'Mobile Developer', 'Data Engineer', 'Site Reliability Engineer', 'Technical Writer')
+
+WORDS = ('team', 'product', 'customers', 'python', 'django', 'react', 'api', 'database',
+    'testing', 'design', 'scale', 'remote', 'benefits', 'growth', 'mentoring', 'agile',
+    'cloud', 'security', 'performance', 'ownership', 'collaborate', 'build', 'ship',
+    'maintain', 'experience', 'years', 'degree', 'communication', 'roadmap', 'features')
+
+EVENTS = ('Phone screen', 'Technical interview', 'Coding challenge due', 'Onsite interview',
+    'Coffee chat', 'Career fair', 'Follow up call', 'Offer call', 'Team lunch')
+
+# how common each status of the status fixture is, in order
+STATUS_WEIGHTS = (8, 10, 5, 2, 1, 2, 6, 1)
+
+QUESTIONS = ('Tell me about yourself.', 'Why do you want to work here?',
+    'Describe a bug you were proud to fix.', 'How do you handle disagreements on a team?',
+    'What does a typical day look like?', 'How is success measured in this role?',
+    'Walk me through a project you built.', 'What are the next steps in the process?',
+    'How do you keep learning?', 'What is the team working on this quarter?')
+
+
+class Command(BaseCommand):
+    help = 'Seed the database with deterministic candidates, companies, jobs, events and questions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=1000,
+            help='number of candidates to create')
+        parser.add_argument('--companies', type=int, default=2000,
+            help='number of companies the jobs are spread across')
+        parser.add_argument('--jobs', type=int, default=30,
+            help='average number of jobs per candidate')
+        parser.add_argument('--events', type=int, default=2,
+            help='average number of events per job')
+        parser.add_argument('--questions', type=int, default=10,
+            help='average number of questions per candidate')
+        parser.add_argument('--seed', type=int, default=1,
+            help='seed of the random data, the same seed gives the same rows')
+        parser.add_argument('--start', default='2020-01-06',
+            help='date (YYYY-MM-DD) the seeded history starts on')
+        parser.add_argument('--batch-size', type=int, default=200,
+            help='number of candidates whose rows are saved in each transaction')
+        parser.add_argument('--flush', action='store_true',
+            help='delete previously seeded users and everything they own first')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        seeded = User.objects.filter(username__startswith='seed-')
+
+        if options['flush']:
+            deleted = self.flush(seeded)
+            self.stdout.write(f'Deleted {deleted} previously seeded rows')
+        elif seeded.exists():
+            raise CommandError('The database is already seeded, run with --flush to seed it again')
+
+        try:
+            start = timezone.make_aware(datetime.strptime(options['start'], '%Y-%m-%d'), timezone.utc)
+        except ValueError:
+            raise CommandError('--start must be a date like 2020-01-06')
+
+        rng = random.Random(options['seed'])
+        status_ids = self.status_ids()
+        company_ids = self.companies(options['companies'])
+        password = make_password(SEED_PASSWORD)
+
+        totals = {'candidates': 0, 'jobs': 0, 'transitions': 0, 'events': 0, 'questions': 0}
+        for first in range(0, options['candidates'], options['batch_size']):
+            numbers = range(first, min(first + options['batch_size'], options['candidates']))
+            with transaction.atomic():
+                counts = self.seed_batch(rng, numbers, password, status_ids, company_ids, start, options)
+            for table, count in counts.items():
+                totals[table] += count
+            self.stdout.write(f'  {first + len(numbers)} of {options["candidates"]} candidates', ending='\r')
+
+        # bulk_create sends no signals. Each batch recounted its analytics,
+        # the search index and company names are rebuilt here.
+        search_index.rebuild()
+        bump_version('companies')
+
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        self.stdout.write(
+            ', '.join(f'{count} {table}' for table, count in totals.items())
+            + f' in {elapsed:.1f} s ({rows / elapsed:.0f} rows/s)'
+        )
+
+    def flush(self, seeded):
+        """Deletes the seeded users and their rows, returning the number of rows deleted
+
+        The jobs, events and questions are deleted with one DELETE each,
+        without the post_delete signals a cascade would send one row at a
+        time. The search index is rebuilt afterwards for that reason. The
+        analytics totals are deleted along with their candidates.
+        """
+
+        candidates = (
+            f'SELECT candidate.id FROM {Candidate._meta.db_table} candidate '
+            f'INNER JOIN {User._meta.db_table} seeded ON seeded.id = candidate.user_id '
+            'WHERE seeded.username LIKE %s'
+        )
+        jobs = f'SELECT id FROM {Job._meta.db_table} WHERE candidate_id IN ({candidates})'
+        owned = (
+            (StatusTransition, f'job_id IN ({jobs})'),
+            (Event, f'job_id IN ({jobs})'),
+            (Job, f'candidate_id IN ({candidates})'),
+            (Question, f'candidate_id IN ({candidates})'),
+        )
+
+        deleted = 0
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for model, condition in owned:
+                    cursor.execute(f'DELETE FROM {model._meta.db_table} WHERE {condition}', ['seed-%'])
+                    deleted += cursor.rowcount
+            deleted += seeded.delete()[0]
+
+        search_index.rebuild()
+        return deleted
+
+    def status_ids(self):
+        if not Status.objects.exists():
+            call_command('loaddata', 'status', verbosity=0)
+        return list(Status.objects.order_by('id').values_list('id', flat=True))
+
+    def companies(self, count):
+        """Returns the ids of count companies with generated names, creating the missing ones"""
+
+        adjectives, nouns, kinds = COMPANY_WORDS
+        combinations = len(adjectives) * len(nouns) * len(kinds)
+
+        names = []
+        for n in range(count):
+            adjective = adjectives[n % len(adjectives)]
+            noun = nouns[n // len(adjectives) % len(nouns)]
+            kind = kinds[n // (len(adjectives) * len(nouns)) % len(kinds)]
+            repeat = f' {n // combinations + 1}' if n >= combinations else ''
+            names.append(normalize_company_name(f'{adjective} {noun} {kind}{repeat}'))
+
+        # companies are shared, so seeding again reuses the ones that exist
+        Company.objects.bulk_create([Company(name=name) for name in names],
+            ignore_conflicts=True)
+        ids = {}
+        for start in range(0, len(names), 500):
+            ids.update(Company.objects.filter(name__in=names[start:start + 500]).values_list('name', 'id'))
+        return [ids[name] for name in names]
+
+    def seed_batch(self, rng, numbers, password, status_ids, company_ids, start, options):
+        users = [
+            new_user(
+                f'seed-{n}@example.com', password,
+                FIRST_NAMES[n % len(FIRST_NAMES)], LAST_NAMES[n // len(FIRST_NAMES) % len(LAST_NAMES)]
+            )
+            for n in numbers
+        ]
+        provision(users, batch_size=len(users))
+        candidate_ids = dict(
+            User.objects.filter(pk__in=[user.pk for user in users]).values_list('id', 'candidate__id')
+        )
+
+        jobs = []
+        paths = []
+        for user in users:
+            for _ in range(rng.randint(0, options['jobs'] * 2)):
+                job_status, path = self.status_path(rng, status_ids)
+                jobs.append(Job(
+                    title=f'{rng.choice(LEVELS)} {rng.choice(ROLES)}'.strip(),
+                    description=self.text(rng, 20, 200),
+                    link=f'https://jobs.example.com/{rng.randrange(10 ** 8)}',
+                    candidate_id=candidate_ids[user.pk],
+                    status_id=job_status,
+                    company_id=rng.choice(company_ids)
+                ))
+                paths.append(path)
+        self.bulk_create(Job, jobs, candidate_id__in=candidate_ids.values())
+
+        transitions = []
+        events = []
+        for job, path in zip(jobs, paths):
+            changed_at = start + timedelta(days=rng.randrange(365), minutes=rng.randrange(1440))
+            for from_status, to_status in zip([None] + path, path):
+                transitions.append(StatusTransition(
+                    job_id=job.pk, from_status_id=from_status, to_status_id=to_status, changed_at=changed_at
+                ))
+                changed_at += timedelta(days=rng.randint(1, 21), minutes=rng.randrange(1440))
+
+            for _ in range(rng.randint(0, options['events'] * 2)):
+                start_time = start + timedelta(days=rng.randrange(400), hours=rng.randint(8, 17))
+                events.append(Event(
+                    job_id=job.pk,
+                    details=f'{rng.choice(EVENTS)} with {rng.choice(FIRST_NAMES)}',
+                    start_time=start_time,
+                    end_time=start_time + timedelta(minutes=rng.choice((15, 30, 45, 60, 90)))
+                ))
+        StatusTransition.objects.bulk_create(transitions)
+        Event.objects.bulk_create(events)
+
+        questions = []
+        for user in users:
+            for _ in range(rng.randint(0, options['questions'] * 2)):
+                questions.append(Question(
+                    question=rng.choice(QUESTIONS),
+                    is_from_interviewer=rng.random() < 0.5,
+                    answer=self.text(rng, 5, 60) if rng.random() < 0.7 else None,
+                    candidate_id=candidate_ids[user.pk]
+                ))
+        Question.objects.bulk_create(questions)
+
+        analytics.rebuild(list(candidate_ids.values()))
+
+        return {
+            'candidates': len(users),
+            'jobs': len(jobs),
+            'transitions': len(transitions),
+            'events': len(events),
+            'questions': len(questions),
+        }
+
+    def bulk_create(self, model, instances, **owned_by):
+        """Saves instances, setting the ids that only PostgreSQL returns from bulk_create
+
+        Arguments:
+            owned_by -- filter matching exactly the new rows
+        """
+
+        model.objects.bulk_create(instances)
+        if instances and instances[0].pk is None:
+            ids = model.objects.filter(**owned_by).order_by('id').values_list('id', flat=True)
+            for instance, pk in zip(instances, ids):
+                instance.pk = pk
+
+    def status_path(self, rng, status_ids):
+        """Returns a job's status and the statuses it moved through to get there
+
+        Statuses are in the order of the status fixture: the first three
+        are the stages of applying, the rest are outcomes.
+        """
+
+        weights = [STATUS_WEIGHTS[n] if n < len(STATUS_WEIGHTS) else 1 for n in range(len(status_ids))]
+        job_status = rng.choices(status_ids, weights=weights)[0]
+        stage = status_ids.index(job_status)
+        return job_status, status_ids[:min(stage, 3)] + [job_status]
+
+    def text(self, rng, shortest, longest):
+        words = rng.choices(WORDS, k=rng.randint(shortest, longest))
+        return ' '.join(words).capitalize() + '.'
@@ -0,0 +1,294 @@
+"""Per endpoint performance metrics for Application Station
+
+    MetricsMiddleware times every request and breaks the time down into:
+
+        db -- time and number of SQL queries, from an execute_wrapper on
+            each database connection
+        serialize -- time in serializers (TimedSerializerMixin) and in
+            list projections
+        render -- time in FastJSONRenderer
+
+    The breakdown is sent back in a Server-Timing header, which browser
+    developer tools show next to the request. Each route's latencies,
+    queries, stage times and response sizes are added to the in-process
+    metrics registry and served at /metrics to local clients.
+
+    Stages can overlap: a serializer that follows a relation runs a query
+    inside its serialize time.
+
+    A streaming response's Server-Timing covers the time until it starts
+    streaming. Its metrics are recorded once the stream ends, with the
+    queries, bytes and time of the whole stream.
+
+    Configured with METRICS in settings.py. When ENABLED is false the
+    middleware is removed from the stack and the hooks do nothing but
+    look up an unset context variable.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+metrics_settings = getattr(settings, 'METRICS', {})
+
+# the RequestTimings of the request being handled, None outside a request
+request_timings = contextvars.ContextVar('request_timings', default=None)
+
+# upper bounds, in milliseconds, of the latency histogram buckets
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class RequestTimings:
+    """Time spent in each stage of one request"""
+
+    def __init__(self):
+        self.queries = 0
+        self.stages = {'db': 0.0, 'serialize': 0.0, 'render': 0.0}
+        # stages being timed, so nested serializers aren't counted twice
+        self.active = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper that counts and times every query"""
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.stages['db'] += time.perf_counter() - start
+            self.queries += 1
+
+
+class timed:
+    """Context manager adding the time of its block to a stage of the current request"""
+
+    __slots__ = ('stage', 'timings', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.timings = request_timings.get()
+        if self.timings is None or self.stage in self.timings.active:
+            self.timings = None
+            return
+
+        self.timings.active.add(self.stage)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.stages[self.stage] += time.perf_counter() - self.start
+            self.timings.active.discard(self.stage)
+
+
+class TimedSerializerMixin:
+    """Serializer mixin that adds its to_representation time to the serialize stage
+
+    Also times lists, since a ListSerializer calls to_representation on its
+    child for every item.
+    """
+
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
+
+
+class Histogram:
+    """Counts of values in fixed buckets, with estimated percentiles
+
+    Arguments:
+        bounds -- upper bound of each bucket, ascending. Larger values go
+            in a last, unbounded bucket.
+    """
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        """Returns the upper bound of the bucket holding the percentile, or the max"""
+
+        if not self.count:
+            return 0.0
+
+        rank = percent / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': round(self.max, 3),
+            'buckets': {
+                **{f'le_{bound}': count for bound, count in zip(self.bounds, self.counts)},
+                'inf': self.counts[-1],
+            },
+        }
+
+
+class RouteMetrics:
+    """Totals of every request to one route"""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses = {}
+        self.queries = 0
+        self.stages = {'db': 0.0, 'serialize': 0.0, 'render': 0.0}
+        self.bytes = 0
+
+    def add(self, status_code, elapsed, timings, size):
+        self.latency.add(elapsed * 1000)
+        self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+        self.queries += timings.queries
+        for stage, seconds in timings.stages.items():
+            self.stages[stage] += seconds
+        self.bytes += size
+
+    def summary(self):
+        requests = self.latency.count or 1
+        return {
+            'latency_ms': self.latency.summary(),
+            'status_codes': dict(sorted(self.statuses.items())),
+            'queries_per_request': round(self.queries / requests, 2),
+            **{
+                f'{stage}_ms_per_request': round(seconds * 1000 / requests, 3)
+                for stage, seconds in self.stages.items()
+            },
+            'bytes_per_request': round(self.bytes / requests),
+        }
+
+
+class Metrics:
+    """Thread safe registry of the metrics of every route"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self.started = time.time()
+
+    def record(self, route, status_code, elapsed, timings, size):
+        with self._lock:
+            if route not in self._routes:
+                self._routes[route] = RouteMetrics()
+            self._routes[route].add(status_code, elapsed, timings, size)
+
+    def snapshot(self):
+        """Returns a summary of every route's metrics, keyed by route"""
+
+        with self._lock:
+            return {
+                route: route_metrics.summary()
+                for route, route_metrics in sorted(self._routes.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self.started = time.time()
+
+
+metrics = Metrics()
+
+
+def route_of(request):
+    """Returns the method and URL name a request was routed to"""
+
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return f'{request.method} unmatched'
+
+    return f'{request.method} {match.url_name or match.route}'
+
+
+def server_timing(timings, elapsed):
+    """Returns the Server-Timing header value of a request"""
+
+    return ', '.join([
+        f'db;dur={timings.stages["db"] * 1000:.2f};desc="{timings.queries} queries"',
+        f'serialize;dur={timings.stages["serialize"] * 1000:.2f}',
+        f'render;dur={timings.stages["render"] * 1000:.2f}',
+        f'total;dur={elapsed * 1000:.2f}',
+    ])
+
+
+class MetricsMiddleware:
+    """Times each request, adds a Server-Timing header and records the route's metrics"""
+
+    def __init__(self, get_response):
+        if not metrics_settings.get('ENABLED', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.server_timing = metrics_settings.get('SERVER_TIMING', True)
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        start = time.perf_counter()
+
+        try:
+            with timed_queries(timings):
+                response = self.get_response(request)
+        finally:
+            request_timings.reset(token)
+
+        elapsed = time.perf_counter() - start
+
+        if self.server_timing:
+            response['Server-Timing'] = server_timing(timings, elapsed)
+
+        if response.streaming:
+            response.streaming_content = self.timed_stream(
+                response.streaming_content, route_of(request), response.status_code, timings, start
+            )
+        else:
+            metrics.record(route_of(request), response.status_code, elapsed, timings, len(response.content))
+
+        return response
+
+    def timed_stream(self, parts, route, status_code, timings, start):
+        """Yields the parts of a streaming response, recording its metrics
+        once the stream ends or is closed
+        """
+
+        size = 0
+        try:
+            # the queries of a generator run as it streams, on the thread
+            # that sends the response
+            with timed_queries(timings):
+                for part in parts:
+                    size += len(part)
+                    yield part
+        finally:
+            metrics.record(route, status_code, time.perf_counter() - start, timings, size)
+
+
+def timed_queries(timings):
+    """Returns a context manager timing the queries of every connection of this thread"""
+
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(timings))
+    return stack
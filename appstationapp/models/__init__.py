@@ -1,6 +1,9 @@
-from .company import Company
+from .company import Company, normalize_company_name
 from .status import Status
 from .job import Job
-from .event import Event
+from .event import Event, clean_event_times
 from .question import Question
-from .candidate import Candidate
\ No newline at end of file
+from .candidate import Candidate
+from .pipeline_count import PipelineCount
+from .status_transition import StatusTransition
+from .tracking import lock_loaded_values
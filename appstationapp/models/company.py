@@ -1,23 +1,33 @@
 from django.db import models
 
+
+def normalize_company_name(name):
+    """Returns name lowercase, without surrounding or repeated whitespace"""
+
+    return ' '.join((name or '').split()).lower()
+
+
 class Company(models.Model):
     """
     This class is responsible for creating the Company instances.
 
+    Company names are shared by every candidate, and are saved normalized
+    (see normalize_company_name) so that each company exists only once.
+
     Author: 
         Ryan Crowley
     """
 
-    name = models.CharField(max_length=50)
+    name = models.CharField(max_length=50, unique=True)
 
     class Meta:
         ordering = ("name", )
         verbose_name = ("company")
         verbose_name_plural = ("companies")
 
+    def save(self, *args, **kwargs):
+        self.name = normalize_company_name(self.name)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
-
-    
-
-
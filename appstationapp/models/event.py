@@ -1,7 +1,50 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
+from .owned import JobOwnedQuerySet
+from .tracking import LoadedValuesModel
 from .job import Job
 
-class Event(models.Model):
+
+def clean_event_times(start_time, end_time):
+    """Returns the start and end of an event as aware datetimes
+
+    A time without a UTC offset is taken to be in the current time zone.
+
+    Raises:
+        ValidationError -- if either time is missing, or the event doesn't
+        end after it starts
+    """
+
+    if start_time is None or end_time is None:
+        raise ValidationError('start_time and end_time are required')
+
+    start_time, end_time = (
+        timezone.make_aware(time) if timezone.is_naive(time) else time
+        for time in (start_time, end_time)
+    )
+
+    if end_time <= start_time:
+        raise ValidationError('end_time must be after start_time')
+
+    return start_time, end_time
+
+
+class EventQuerySet(JobOwnedQuerySet):
+    """
+    This class is responsible for finding the events that overlap a time
+    range, so that a conflict is found without loading every event.
+    """
+
+    def overlapping(self, start_time, end_time):
+        # An overlapping event starts before end_time and ends after
+        # start_time. Events can be any length, so only the first of these
+        # bounds the (job, start_time) index search, to the events of each
+        # of the candidate's jobs that start before end_time.
+        return self.filter(start_time__lt=end_time, end_time__gt=start_time)
+
+
+class Event(LoadedValuesModel):
     """
     This class is responsible for creating the Event instances.
 
@@ -14,9 +57,15 @@ class Event(models.Model):
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
 
+    objects = EventQuerySet.as_manager()
+
 
     class Meta:
         ordering = ("start_time", ) 
+        # events are listed per job, ordered by start time
+        indexes = [
+            models.Index(fields=["job", "start_time"]),
+        ]
         verbose_name = ("event")
         verbose_name_plural = ("events")
 
@@ -1,10 +1,12 @@
 from django.db import models
+from .owned import CandidateOwnedQuerySet
+from .tracking import LoadedValuesModel
 from .company import Company
 from .status import Status
 from .candidate import Candidate
 # from djrichtextfield.widgets import RichTextField
 
-class Job(models.Model):
+class Job(LoadedValuesModel):
     """
     This class is responsible for creating the Job instances.
 
@@ -19,9 +21,15 @@ class Job(models.Model):
     status = models.ForeignKey(Status, on_delete=models.DO_NOTHING)
     company = models.ForeignKey(Company, on_delete=models.CASCADE)
 
+    objects = CandidateOwnedQuerySet.as_manager()
+
 
     class Meta:
         ordering = ("company_id", )
+        # jobs are always listed per candidate, ordered by company
+        indexes = [
+            models.Index(fields=["candidate", "company"]),
+        ]
         verbose_name = ("job")
         verbose_name_plural = ("jobs")
 
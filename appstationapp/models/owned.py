@@ -0,0 +1,22 @@
+from django.db import models
+
+class CandidateOwnedQuerySet(models.QuerySet):
+    """
+    This class is responsible for scoping querysets to the candidate that
+    owns the rows, so that a lookup and its ownership check happen in the
+    same query.
+    """
+
+    # lookup from the model to the id of the candidate that owns it
+    candidate_lookup = "candidate_id"
+
+    def for_candidate(self, candidate_id):
+        return self.filter(**{self.candidate_lookup: candidate_id})
+
+
+class JobOwnedQuerySet(CandidateOwnedQuerySet):
+    """
+    Events are owned through the job they belong to.
+    """
+
+    candidate_lookup = "job__candidate_id"
@@ -0,0 +1,31 @@
+from django.db import models
+from .candidate import Candidate
+
+class PipelineCount(models.Model):
+    """
+    This class is responsible for creating the PipelineCount instances, the
+    running totals behind a candidate's analytics: jobs per status and per
+    company, events per week, and questions asked and answered. They are
+    kept up to date by the receivers in signals.py.
+    """
+
+    STATUS = 'status'
+    COMPANY = 'company'
+    WEEK = 'week'
+    QUESTIONS = 'questions'
+
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE)
+    # what is counted, and the status id, company id, week or 'total' and
+    # 'answered' for questions it is counted for
+    dimension = models.CharField(max_length=20)
+    key = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+
+
+    class Meta:
+        unique_together = (("candidate", "dimension", "key"), )
+        verbose_name = ("pipeline count")
+        verbose_name_plural = ("pipeline counts")
+
+    def __str__(self):
+        return f'{self.dimension} {self.key}: {self.count}'
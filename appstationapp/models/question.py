@@ -1,8 +1,10 @@
 from django.db import models
+from .owned import CandidateOwnedQuerySet
+from .tracking import LoadedValuesModel
 from .candidate import Candidate
 # from djrichtextfield.widgets import RichTextField
 
-class Question(models.Model):
+class Question(LoadedValuesModel):
     """
     This class is responsible for creating the Question instances.
 
@@ -15,6 +17,8 @@ class Question(models.Model):
     answer = models.TextField(null=True)
     candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE)
 
+    objects = CandidateOwnedQuerySet.as_manager()
+
 
     class Meta:
         verbose_name = ("question")
@@ -0,0 +1,32 @@
+from django.db import models
+from django.utils import timezone
+from .job import Job
+from .status import Status
+
+class StatusTransition(models.Model):
+    """
+    This class is responsible for creating the StatusTransition instances,
+    an append only log of every status a job has moved to. A job's first
+    transition has no from_status.
+    """
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE)
+    from_status = models.ForeignKey(
+        Status, on_delete=models.DO_NOTHING, null=True, related_name="+"
+    )
+    to_status = models.ForeignKey(Status, on_delete=models.DO_NOTHING, related_name="+")
+    changed_at = models.DateTimeField(default=timezone.now)
+
+
+    class Meta:
+        ordering = ("changed_at", )
+        # a job's history is read in order, and the time in each stage is
+        # the gap to the job's next transition
+        indexes = [
+            models.Index(fields=["job", "changed_at"]),
+        ]
+        verbose_name = ("status transition")
+        verbose_name_plural = ("status transitions")
+
+    def __str__(self):
+        return f'job {self.job_id}: {self.from_status_id} -> {self.to_status_id} at {self.changed_at}'
@@ -0,0 +1,60 @@
+from django.db import models, router, transaction
+from django.db.models import DEFERRED
+
+
+def lock_loaded_values(model, instances):
+    """Reads the saved values of instances again, locking their rows
+
+    Sets each instance's _loaded_values to its row as it is in the database
+    now, rather than as it was when the instance was loaded, so that what a
+    save changes is known even if another request saved the row since. The
+    rows stay locked until the transaction ends. Must be called inside one.
+    """
+
+    instances = [instance for instance in instances if instance.pk is not None]
+    if not instances:
+        return
+
+    rows = model._base_manager.select_for_update().filter(
+        pk__in=[instance.pk for instance in instances]
+    ).values()
+    rows = {row[model._meta.pk.attname]: row for row in rows}
+
+    for instance in instances:
+        instance._loaded_values = rows.get(instance.pk, {})
+
+
+class LoadedValuesModel(models.Model):
+    """
+    This class is responsible for remembering the values an instance was
+    loaded from the database with, so that a post_save receiver can tell
+    what a save changed. Saving or deleting an instance reads them again,
+    with the row locked, in case the instance is stale.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # fields left out with only() or defer() weren't loaded
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values) if value is not DEFERRED
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+
+        # the row is read again and locked, so the post_save receivers see
+        # what this save really changed
+        with transaction.atomic(using=router.db_for_write(type(self), instance=self)):
+            lock_loaded_values(type(self), [self])
+            return super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=router.db_for_write(type(self), instance=self)):
+            lock_loaded_values(type(self), [self])
+            return super().delete(*args, **kwargs)
@@ -0,0 +1,147 @@
+"""Pagination for Application Station list endpoints
+
+    List endpoints are paginated with a keyset cursor instead of an offset.
+    The cursor holds every ordering value of the last row of a page,
+    including the id that breaks ties, and the next page is fetched with
+    `WHERE (ordering_field > value) OR (ordering_field = value AND id > last_id)`
+    rather than by skipping every row in front of it with OFFSET. Rows that
+    share an ordering value are never skipped or repeated, however many
+    there are.
+"""
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+
+
+def keyset_filter(ordering, position):
+    """Returns a Q matching the rows that come after position in ordering
+
+    Arguments:
+        ordering -- tuple of field names, each with a leading - if it is
+            descending
+        position -- the values of those fields for the last row seen
+    """
+
+    after = Q()
+    equal = Q()
+
+    for field, value in zip(ordering, position):
+        name = field.lstrip('-')
+        lookup = '__lt' if field.startswith('-') else '__gt'
+        after |= equal & Q(**{name + lookup: value})
+        equal &= Q(**{name: value})
+
+    return after
+
+
+class ModelCursorPagination(CursorPagination):
+    """Cursor pagination ordered by the model's Meta ordering
+
+    Company pages by name, Event by start_time and Job by company_id. Models
+    without a Meta ordering page by id. The id is always added as a final
+    ordering, and is part of the cursor, so rows that share an ordering
+    value come back in a stable order and each appears on exactly one page.
+
+    Fetch call to get the next page of any list endpoint:
+        http://localhost:8000/jobs?cursor=${cursor}
+
+    Fetch call to change the number of results on a page (max 100):
+        http://localhost:8000/jobs?page_size=${page_size}
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(queryset.model._meta.ordering) or ('id', )
+
+        if 'id' not in ordering and '-id' not in ordering:
+            ordering += ('id', )
+
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = None if self.cursor is None else self.cursor.position
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+
+        if position is not None:
+            if len(position) != len(ordering):
+                raise NotFound(self.invalid_cursor_message)
+
+            try:
+                queryset = queryset.filter(keyset_filter(ordering, position))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # one extra row tells whether there is another page
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        position = self.position(self.page[-1]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+
+        position = self.position(self.page[0]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def position(self, row):
+        """Returns the value of every ordering field of a page's row"""
+
+        names = [field.lstrip('-') for field in self.ordering]
+        if isinstance(row, dict):
+            return [str(row[name]) for name in names]
+
+        return [str(getattr(row, name)) for name in names]
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list):
+            raise NotFound(self.invalid_cursor_message)
+
+        return cursor._replace(position=position)
+
+    def encode_cursor(self, cursor):
+        if cursor.position is not None:
+            cursor = cursor._replace(position=json.dumps(cursor.position))
+
+        return super().encode_cursor(cursor)
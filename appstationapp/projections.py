@@ -0,0 +1,137 @@
+"""Fast read only serialization for list endpoints
+
+    A HyperlinkedModelSerializer builds its fields, reverses a URL and
+    walks every field of every row. For lists that adds up to most of the
+    request time. A Projection produces the same JSON from a values()
+    queryset instead: it selects only the columns the serializer outputs,
+    and builds every hyperlink from a URL template reversed once per
+    request.
+"""
+from datetime import datetime
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+from appstationapp.metrics import timed
+
+
+# placeholder primary key used to reverse a URL template
+PK_PLACEHOLDER = '__pk__'
+
+
+class Projection:
+    """Read only equivalent of a HyperlinkedModelSerializer
+
+    Arguments:
+        view_name -- view name the serializer's url field reverses
+        fields -- the serializer's fields, in order
+        nested -- dict of field name to the Projection of a nested relation
+    """
+
+    # formats datetimes exactly as the serializers' DateTimeField does
+    datetime_field = serializers.DateTimeField()
+
+    def __init__(self, view_name, fields, nested=None):
+        self.view_name = view_name
+        self.fields = tuple(fields)
+        self.nested = nested or {}
+
+    def columns(self, prefix=''):
+        """Returns the values() lookups needed to build the fields"""
+
+        columns = []
+
+        for field in self.fields:
+            if field in self.nested:
+                columns += self.nested[field].columns(f'{prefix}{field}__')
+            elif field == 'url':
+                columns.append(f'{prefix}id')
+            else:
+                columns.append(f'{prefix}{field}')
+
+        return list(dict.fromkeys(columns))
+
+    def subset(self, fields):
+        """Returns the Projection of only fields, or this one when fields is None"""
+
+        if fields is None:
+            return self
+
+        return Projection(
+            self.view_name,
+            [field for field in self.fields if field in fields],
+            {field: nested for field, nested in self.nested.items() if field in fields}
+        )
+
+    def values(self, queryset):
+        """Returns queryset as dicts holding only the projected columns
+
+        The columns of the model's Meta ordering and the id are selected
+        too, so the cursor paginator can read its position from the rows.
+        """
+
+        ordering = [field.lstrip('-') for field in queryset.model._meta.ordering]
+        return queryset.values(*dict.fromkeys(self.columns() + ordering + ['id']))
+
+    def only(self, queryset):
+        """Returns queryset loading only the projected columns into instances
+
+        Only the nested relations of the projection are joined, since
+        only() can't defer a relation select_related follows.
+        """
+
+        queryset = queryset.select_related(None)
+        if self.nested:
+            queryset = queryset.select_related(*self.nested)
+
+        return queryset.only(*self.columns())
+
+    def url_template(self, request):
+        """Returns the parts of this projection's URL before and after the pk"""
+
+        url = reverse(self.view_name, kwargs={'pk': PK_PLACEHOLDER}, request=request)
+        prefix, placeholder, suffix = url.rpartition(PK_PLACEHOLDER)
+        return prefix, suffix
+
+    def serializer(self, request, prefix=''):
+        """Returns a function that turns one values() row into JSON data"""
+
+        builders = []
+
+        for field in self.fields:
+            if field in self.nested:
+                builders.append(
+                    (field, self.nested[field].serializer(request, f'{prefix}{field}__'))
+                )
+            elif field == 'url':
+                builders.append((field, self.url_builder(request, f'{prefix}id')))
+            else:
+                builders.append((field, self.value_builder(f'{prefix}{field}')))
+
+        def serialize(row):
+            return {field: build(row) for field, build in builders}
+
+        return serialize
+
+    def url_builder(self, request, column):
+        url_prefix, url_suffix = self.url_template(request)
+
+        def build(row):
+            return f'{url_prefix}{row[column]}{url_suffix}'
+
+        return build
+
+    def value_builder(self, column):
+        def build(row):
+            value = row[column]
+            if isinstance(value, datetime):
+                return self.datetime_field.to_representation(value)
+
+            return value
+
+        return build
+
+    def serialize(self, rows, request):
+        """Returns the JSON data of every row"""
+
+        with timed('serialize'):
+            serialize = self.serializer(request)
+            return [serialize(row) for row in rows]
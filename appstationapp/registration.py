@@ -0,0 +1,108 @@
+"""Creating users for Application Station
+
+    A user of the API is three rows: the User, the Candidate that owns
+    their jobs, events and questions, and the Token they authenticate
+    with. They are inserted in one transaction, so a signup is a single
+    commit, and a failure part way leaves none of them behind instead of a
+    User without a Candidate.
+
+    Token keys are generated before the insert rather than in Token.save(),
+    which lets provision() create users in batches with one bulk_create per
+    table instead of three inserts per user.
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+from appstationapp.models import Candidate
+
+
+def new_user(email, password, first_name, last_name):
+    """Returns an unsaved User, built the way User.objects.create_user builds one
+
+    Arguments:
+        password -- the already hashed password
+    """
+
+    return User(
+        username=User.normalize_username(email),
+        email=User.objects.normalize_email(email),
+        password=password,
+        first_name=first_name,
+        last_name=last_name,
+        is_active=True
+    )
+
+
+def new_token(user):
+    """Returns an unsaved Token for user, with its key already generated"""
+
+    token = Token(user=user)
+    token.key = token.generate_key()
+    return token
+
+
+def register(user):
+    """Saves a new user with their Candidate and Token in one transaction
+
+    Returns:
+        Token -- the new user's token
+
+    Raises:
+        IntegrityError -- if the username is taken
+    """
+
+    token = new_token(user)
+    with transaction.atomic():
+        user.save()
+        Candidate.objects.create(user=user)
+        token.save(force_insert=True)
+
+    return token
+
+
+def provision(users, batch_size=500):
+    """Saves many new users with their Candidates and Tokens
+
+    Each batch of batch_size users is saved in one transaction. Users whose
+    username is taken, or repeats an earlier one in users, are skipped.
+
+    Returns:
+        list -- (user, token) for each user created, in order
+    """
+
+    unique = {}
+    for user in users:
+        unique.setdefault(user.username, user)
+    users = list(unique.values())
+
+    created = []
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+
+        with transaction.atomic():
+            taken = set(
+                User.objects.filter(username__in=[user.username for user in batch])
+                .values_list('username', flat=True)
+            )
+            batch = [user for user in batch if user.username not in taken]
+            if not batch:
+                continue
+
+            User.objects.bulk_create(batch)
+
+            # only PostgreSQL sets the ids of bulk created rows
+            if batch[0].pk is None:
+                ids = dict(
+                    User.objects.filter(username__in=[user.username for user in batch])
+                    .values_list('username', 'id')
+                )
+                for user in batch:
+                    user.pk = ids[user.username]
+
+            tokens = [new_token(user) for user in batch]
+            Candidate.objects.bulk_create([Candidate(user=user) for user in batch])
+            Token.objects.bulk_create(tokens)
+
+        created.extend(zip(batch, tokens))
+
+    return created
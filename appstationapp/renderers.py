@@ -0,0 +1,92 @@
+"""JSON rendering and parsing for Application Station
+
+    Uses orjson when it is installed (pip install orjson), which renders
+    and parses JSON several times faster than the standard library json
+    module. Without orjson everything falls back to the standard library,
+    with the same output.
+
+    The renderer and parser are selected in REST_FRAMEWORK in settings.py.
+    json_dumps and json_loads are used by the views that don't go through
+    Django REST Framework.
+"""
+import json
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from appstationapp.metrics import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Renders datetimes, decimals, lazy strings and the like the same way as
+# Django REST Framework's encoder
+encoder = JSONEncoder()
+
+
+def json_dumps(data):
+    """Returns data rendered as compact JSON bytes"""
+
+    if orjson is not None:
+        return orjson.dumps(
+            data,
+            default=encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        )
+
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+
+
+def json_loads(content):
+    """Returns the data of JSON bytes or a JSON string"""
+
+    if orjson is not None:
+        return orjson.loads(content)
+
+    return json.loads(content)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that renders with orjson when it is installed
+
+    Output that is requested indented (the browsable API) is still
+    rendered by JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        with timed('render'):
+            indent = self.get_indent(accepted_media_type, renderer_context or {})
+            if orjson is None or indent is not None or not self.compact or self.ensure_ascii:
+                return super().render(data, accepted_media_type, renderer_context)
+
+            # Escape \u2028 and \u2029, as JSONRenderer does, so the JSON is a
+            # strict javascript subset
+            return json_dumps(data).replace(
+                b'\xe2\x80\xa8', b'\\u2028'
+            ).replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser that parses with orjson when it is installed"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8')
+
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,392 @@
+"""Full-text search over a candidate's jobs and questions
+
+    Jobs are searched by title and description, questions by question and
+    answer. Results are ranked with BM25, matches in a title or question
+    counting twice as much as matches in a description or answer.
+
+    On SQLite with FTS5 the index is a virtual table, appstationapp_search,
+    created and filled by migrate (or rebuildsearch) and kept in step by the
+    receivers in signals.py in the same transaction as the rows it indexes. Each row's rowid encodes
+    the kind and id of the object it indexes, so updates and deletes are
+    lookups by rowid.
+
+    Other databases use MemoryIndex, an inverted index built in each process
+    per candidate. Saving or deleting a candidate's jobs or questions moves
+    the candidate's search namespace to a new version (see caching.py) and
+    the index is built again on the next search.
+"""
+import math
+import re
+import threading
+import unicodedata
+import weakref
+from collections import Counter, OrderedDict
+from django.db import connections, router
+from appstationapp.caching import bump_version, get_version
+from appstationapp.models import Job, Question
+
+
+# kinds of objects in the index, and the digit of the rowid they take
+KINDS = {'job': 0, 'question': 1}
+
+# BM25 weights of the title and body columns
+TITLE_WEIGHT = 2.0
+BODY_WEIGHT = 1.0
+
+SNIPPET_TOKENS = 16
+
+WORD = re.compile(r'\w+')
+
+
+def search_namespace(candidate_id):
+    return f'search:{candidate_id}'
+
+
+def tokenize(text):
+    """Returns the lower case words of text, without diacritics"""
+
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return WORD.findall(text.lower())
+
+
+def documents(candidate_id=None):
+    """Yields (kind, id, candidate_id, title, body) for every job and question"""
+
+    jobs = Job.objects.order_by('id')
+    questions = Question.objects.order_by('id')
+    if candidate_id is not None:
+        jobs = jobs.for_candidate(candidate_id)
+        questions = questions.for_candidate(candidate_id)
+
+    for job in jobs.values_list('id', 'candidate_id', 'title', 'description').iterator():
+        yield ('job', *job)
+
+    for question in questions.values_list('id', 'candidate_id', 'question', 'answer').iterator():
+        yield ('question', *question)
+
+
+def document(instance):
+    """Returns the (kind, id, candidate_id, title, body) of a Job or Question"""
+
+    if isinstance(instance, Job):
+        return ('job', instance.id, instance.candidate_id, instance.title, instance.description)
+    return ('question', instance.id, instance.candidate_id, instance.question, instance.answer)
+
+
+class FTSIndex:
+    """Search index in an SQLite FTS5 virtual table
+
+    All candidates share the table. candidate_id is indexed as a token of
+    its own, so a search only reads the doclists of the candidate's rows.
+    BM25 still counts how many documents have a word over the whole table:
+    other candidates' rows can change the order of a candidate's results,
+    though never which rows match. MemoryIndex ranks with each candidate's
+    own statistics.
+    """
+
+    table = 'appstationapp_search'
+
+    @property
+    def schema(self):
+        return (
+            f'CREATE VIRTUAL TABLE {self.table} USING fts5('
+            'title, body, kind UNINDEXED, object_id UNINDEXED, '
+            "candidate_id, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    def rowid(self, kind, object_id):
+        return object_id * len(KINDS) + KINDS[kind]
+
+    def __init__(self):
+        # connections the table is known to exist on
+        self._created = weakref.WeakSet()
+
+    def create_table(self, connection, fill=True):
+        """Creates the virtual table if it doesn't exist yet
+
+        A table created before candidate_id was indexed is dropped and
+        created again, and filled whatever fill is.
+
+        Arguments:
+            fill -- whether to index every job and question in the new table
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [self.table]
+            )
+            row = cursor.fetchone()
+            exists = row is not None and row[0] == self.schema
+            if row is not None and not exists:
+                cursor.execute(f'DROP TABLE {self.table}')
+                fill = True
+            if not exists:
+                cursor.execute(self.schema)
+
+        self._created.add(connection)
+        if fill and not exists:
+            self.insert(connection, documents())
+
+    def ensure_table(self, connection):
+        """Makes sure the virtual table exists before it is used
+
+        Looks the table up once per connection. If migrate hasn't created it
+        yet it is created empty, instead of indexing every candidate's rows
+        inside one request. rebuildsearch fills it.
+        """
+
+        if connection not in self._created:
+            self.create_table(connection, fill=False)
+
+    def insert(self, connection, docs):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} '
+                '(rowid, title, body, kind, object_id, candidate_id) '
+                'VALUES (%s, %s, %s, %s, %s, %s)',
+                [
+                    (self.rowid(kind, object_id), title, body or '', kind, object_id, candidate_id)
+                    for kind, object_id, candidate_id, title, body in docs
+                ]
+            )
+
+    def delete(self, connection, kind, object_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(self.rowid(kind, object_id),) for object_id in object_ids]
+            )
+
+    def update(self, instances):
+        """Indexes saved jobs or questions again"""
+
+        docs = [document(instance) for instance in instances]
+        if not docs:
+            return
+
+        connection = connections[router.db_for_write(Job)]
+        self.ensure_table(connection)
+        self.delete(connection, docs[0][0], [doc[1] for doc in docs])
+        self.insert(connection, docs)
+
+    def remove(self, instances):
+        """Removes deleted jobs or questions from the index"""
+
+        docs = [document(instance) for instance in instances]
+        if not docs:
+            return
+
+        connection = connections[router.db_for_write(Job)]
+        self.ensure_table(connection)
+        self.delete(connection, docs[0][0], [doc[1] for doc in docs])
+
+    def rebuild(self):
+        connection = connections[router.db_for_write(Job)]
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {self.table}')
+        self.create_table(connection)
+
+    def search(self, candidate_id, query, limit):
+        """Returns the best (kind, id, title, snippet) matches of query"""
+
+        words = tokenize(query)
+        if not words:
+            return []
+
+        # every word must match in the title or body, the last one as a
+        # prefix of a longer word
+        match = (
+            f'candidate_id : "{int(candidate_id)}" AND {{title body}} : ('
+            + ' '.join(f'"{word}"' for word in words) + '*)'
+        )
+
+        connection = connections[router.db_for_read(Job)]
+        self.ensure_table(connection)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT kind, object_id, title, '
+                f"snippet({self.table}, 1, '', '', '…', {SNIPPET_TOKENS}) "
+                f'FROM {self.table} '
+                f'WHERE {self.table} MATCH %s '
+                f'ORDER BY bm25({self.table}, {TITLE_WEIGHT}, {BODY_WEIGHT}, 0, 0, 0) '
+                'LIMIT %s',
+                [match, limit]
+            )
+            return cursor.fetchall()
+
+
+class MemoryIndex:
+    """Inverted index of each candidate's jobs and questions, built in process
+
+    Arguments:
+        max_candidates -- number of candidates' indexes kept before the least
+            recently used is dropped
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, max_candidates=256):
+        self.max_candidates = max_candidates
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def build(self, candidate_id):
+        """Returns the postings, document lengths and documents of a candidate"""
+
+        postings = {}
+        lengths = {}
+        docs = {}
+
+        for kind, object_id, _, title, body in documents(candidate_id):
+            key = (kind, object_id)
+            words = Counter()
+            for word in tokenize(title):
+                words[word] += TITLE_WEIGHT
+            for word in tokenize(body):
+                words[word] += BODY_WEIGHT
+
+            for word, frequency in words.items():
+                postings.setdefault(word, {})[key] = frequency
+            lengths[key] = sum(words.values())
+            docs[key] = (title, body or '')
+
+        return postings, lengths, docs
+
+    def index_of(self, candidate_id):
+        version = get_version(search_namespace(candidate_id))
+
+        with self._lock:
+            entry = self._indexes.get(candidate_id)
+            if entry is not None and entry[0] == version:
+                self._indexes.move_to_end(candidate_id)
+                return entry[1]
+
+        index = self.build(candidate_id)
+
+        with self._lock:
+            self._indexes[candidate_id] = (version, index)
+            self._indexes.move_to_end(candidate_id)
+            while len(self._indexes) > self.max_candidates:
+                self._indexes.popitem(last=False)
+
+        return index
+
+    def update(self, instances):
+        for candidate_id in {instance.candidate_id for instance in instances}:
+            bump_version(search_namespace(candidate_id))
+
+    remove = update
+
+    def rebuild(self):
+        with self._lock:
+            self._indexes.clear()
+
+    def search(self, candidate_id, query, limit):
+        """Returns the best (kind, id, title, snippet) matches of query"""
+
+        words = tokenize(query)
+        if not words:
+            return []
+
+        postings, lengths, docs = self.index_of(candidate_id)
+        if not lengths:
+            return []
+        average_length = sum(lengths.values()) / len(lengths)
+
+        # the last word matches as a prefix of a longer word
+        prefix = words[-1]
+        matches = [postings.get(word, {}) for word in words[:-1]]
+        last = {}
+        for word, posting in postings.items():
+            if word.startswith(prefix):
+                for key, frequency in posting.items():
+                    last[key] = last.get(key, 0) + frequency
+        matches.append(last)
+
+        # every word must match
+        keys = set(matches[0]).intersection(*matches[1:])
+
+        scores = {}
+        for posting in matches:
+            idf = math.log(1 + (len(lengths) - len(posting) + 0.5) / (len(posting) + 0.5))
+            for key in keys:
+                frequency = posting[key]
+                norm = self.k1 * (1 - self.b + self.b * lengths[key] / average_length)
+                scores[key] = scores.get(key, 0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        ranked = sorted(keys, key=lambda key: (-scores[key], key))[:limit]
+        return [
+            (kind, object_id, docs[(kind, object_id)][0], self.snippet(docs[(kind, object_id)][1], words))
+            for kind, object_id in ranked
+        ]
+
+    def snippet(self, body, words):
+        """Returns the part of body around the first matching word"""
+
+        tokens = body.split()
+        for position, token in enumerate(tokens):
+            if any(word.startswith(words[-1]) or word in words for word in tokenize(token)):
+                start = max(0, position - SNIPPET_TOKENS // 2)
+                break
+        else:
+            start = 0
+
+        end = start + SNIPPET_TOKENS
+        return ' '.join(
+            (['…'] if start > 0 else []) + tokens[start:end] + (['…'] if end < len(tokens) else [])
+        )
+
+
+def fts5_available(connection):
+    if connection.vendor != 'sqlite':
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def create_search_table(sender, using, **kwargs):
+    """Receiver of post_migrate that creates and fills the FTS5 table
+
+    Only builds the index when the table doesn't exist yet, so running
+    migrate again costs one lookup.
+    """
+
+    connection = connections[using]
+    if fts5_available(connection):
+        search_index.fts.create_table(connection)
+
+
+class SearchIndex:
+    """Uses FTSIndex when the database has FTS5, and MemoryIndex otherwise"""
+
+    def __init__(self):
+        self._backend = None
+        self.fts = FTSIndex()
+        self.memory = MemoryIndex()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            connection = connections[router.db_for_write(Job)]
+            self._backend = self.fts if fts5_available(connection) else self.memory
+        return self._backend
+
+    def update(self, instances):
+        self.backend.update(instances)
+
+    def remove(self, instances):
+        self.backend.remove(instances)
+
+    def rebuild(self):
+        self.backend.rebuild()
+
+    def search(self, candidate_id, query, limit=20):
+        return self.backend.search(candidate_id, query, limit)
+
+
+search_index = SearchIndex()
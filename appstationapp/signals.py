@@ -0,0 +1,174 @@
+"""Signals and signal receivers for Application Station
+
+    Keeps the in-process caches, the search index and the analytics totals
+    in step with the database when rows are saved or deleted.
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+from rest_framework.authtoken.models import Token
+from appstationapp import analytics
+from appstationapp.authentication import token_cache
+from appstationapp.autocomplete import company_names
+from appstationapp.caching import (DASHBOARD_CACHE, bump_version, calendar_namespace,
+    dashboard_namespace, get_version, token_namespace)
+from appstationapp.models import Candidate, Company, Event, Job, Question, Status
+from appstationapp.search import search_index
+
+
+# Sent with the instances a bulk endpoint saved without sending post_save.
+# Arguments: sender (the model class), instances, created
+bulk_saved = Signal()
+
+
+def revoke_tokens(keys):
+    """Stops the cached tokens with keys from being used, in every process
+
+    The versions are moved once the transaction commits, so that a process
+    loading a token in the meantime can't cache it at the new version.
+    """
+
+    for key in keys:
+        token_cache.invalidate(key)
+    transaction.on_commit(lambda: [bump_version(token_namespace(key)) for key in keys])
+
+
+def revoke_user_tokens(user_id):
+    token_cache.invalidate_user(user_id)
+    revoke_tokens(list(Token.objects.filter(user_id=user_id).values_list('key', flat=True)))
+
+
+# Tokens are deleted on logout and when they are rotated
+@receiver([post_save, post_delete], sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    revoke_tokens([instance.key])
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    revoke_user_tokens(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Candidate)
+def invalidate_candidate_tokens(sender, instance, **kwargs):
+    revoke_user_tokens(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Company)
+def invalidate_companies(sender, **kwargs):
+    bump_version('companies')
+
+
+# Runs after invalidate_companies has moved the namespace to a new version
+@receiver(post_save, sender=Company)
+def add_company_name(sender, instance, **kwargs):
+    company_id, name, version = instance.id, instance.name, get_version('companies')
+    transaction.on_commit(lambda: company_names.add(company_id, name, version))
+
+
+@receiver(post_delete, sender=Company)
+def remove_company_name(sender, instance, **kwargs):
+    # delete() sets instance.id to None before the transaction commits
+    company_id, version = instance.id, get_version('companies')
+    transaction.on_commit(lambda: company_names.remove(company_id, version))
+
+
+# Statuses only change when the fixtures are loaded
+@receiver([post_save, post_delete], sender=Status)
+def invalidate_statuses(sender, **kwargs):
+    bump_version('statuses')
+
+
+def invalidate_dashboards(candidate_ids):
+    for candidate_id in set(candidate_ids):
+        bump_version(dashboard_namespace(candidate_id), DASHBOARD_CACHE)
+
+
+@receiver([post_save, post_delete], sender=Job)
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_owner_dashboard(sender, instance, **kwargs):
+    invalidate_dashboards([instance.candidate_id])
+
+
+def invalidate_calendars(candidate_ids):
+    for candidate_id in set(candidate_ids):
+        bump_version(calendar_namespace(candidate_id))
+
+
+@receiver([post_save, post_delete], sender=Event)
+def invalidate_event_dashboard(sender, instance, **kwargs):
+    candidate_ids = list(
+        Job.objects.filter(pk=instance.job_id).values_list('candidate_id', flat=True)
+    )
+    invalidate_dashboards(candidate_ids)
+    invalidate_calendars(candidate_ids)
+
+
+# the calendar describes each event with its job's title and company
+@receiver([post_save, post_delete], sender=Job)
+def invalidate_job_calendar(sender, instance, **kwargs):
+    invalidate_calendars([instance.candidate_id])
+
+
+@receiver(bulk_saved, sender=Job)
+@receiver(bulk_saved, sender=Question)
+def invalidate_owner_dashboards(sender, instances, **kwargs):
+    invalidate_dashboards(instance.candidate_id for instance in instances)
+
+
+@receiver(bulk_saved, sender=Job)
+def invalidate_job_calendars(sender, instances, **kwargs):
+    invalidate_calendars(instance.candidate_id for instance in instances)
+
+
+@receiver(bulk_saved, sender=Event)
+def invalidate_event_dashboards(sender, instances, **kwargs):
+    candidate_ids = list(
+        Job.objects.filter(
+            pk__in={instance.job_id for instance in instances}
+        ).values_list('candidate_id', flat=True)
+    )
+    invalidate_dashboards(candidate_ids)
+    invalidate_calendars(candidate_ids)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_save, sender=Question)
+def index_instance(sender, instance, **kwargs):
+    search_index.update([instance])
+
+
+@receiver(post_delete, sender=Job)
+@receiver(post_delete, sender=Question)
+def unindex_instance(sender, instance, **kwargs):
+    search_index.remove([instance])
+
+
+@receiver(bulk_saved, sender=Job)
+@receiver(bulk_saved, sender=Question)
+def index_instances(sender, instances, **kwargs):
+    search_index.update(instances)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Question)
+def count_instance(sender, instance, created, **kwargs):
+    analytics.record_saves([instance], created)
+
+
+# before the delete, when the job of an event deleted with it still exists,
+# in the same transaction
+@receiver(pre_delete, sender=Job)
+@receiver(pre_delete, sender=Event)
+@receiver(pre_delete, sender=Question)
+def uncount_instance(sender, instance, **kwargs):
+    analytics.record_deletes([instance])
+
+
+@receiver(bulk_saved, sender=Job)
+@receiver(bulk_saved, sender=Event)
+@receiver(bulk_saved, sender=Question)
+def count_instances(sender, instances, created, **kwargs):
+    analytics.record_saves(instances, created)
@@ -0,0 +1,57 @@
+"""Shared setup for the Application Station tests"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
+from appstationapp.models import Candidate, Company, Job, Status
+
+
+class CandidateMixin:
+    """A logged in candidate, statuses and companies"""
+
+    @classmethod
+    def create_candidate(cls):
+        cls.user = User.objects.create_user(
+            username='ada@example.com', password='password', first_name='Ada', last_name='Lovelace'
+        )
+        cls.candidate = Candidate.objects.create(user=cls.user)
+        cls.token = Token.objects.create(user=cls.user)
+        cls.statuses = [Status.objects.create(status=name) for name in ('Applied', 'Interviewing', 'Offer')]
+        cls.companies = [Company.objects.create(name=name) for name in ('Acme', 'Globex', 'Initech')]
+
+    def setUp(self):
+        # tokens and list versions are cached between requests
+        cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def create_jobs(self, count, candidate=None):
+        """Creates count jobs spread across the statuses and companies"""
+
+        return [
+            Job.objects.create(
+                title=f'Engineer {n}', description='Build things', link='https://example.com',
+                candidate=candidate or self.candidate,
+                status=self.statuses[n % len(self.statuses)],
+                company=self.companies[n % len(self.companies)],
+            )
+            for n in range(count)
+        ]
+
+
+class CandidateTestCase(CandidateMixin, APITestCase):
+    """Test case with a logged in candidate, statuses and companies"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_candidate()
+
+
+class CandidateTransactionTestCase(CandidateMixin, APITransactionTestCase):
+    """CandidateTestCase for tests that need transactions to commit, for
+    on_commit callbacks or reads from other threads
+    """
+
+    def setUp(self):
+        self.create_candidate()
+        super().setUp()
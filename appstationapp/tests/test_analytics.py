@@ -0,0 +1,121 @@
+from datetime import timedelta
+from django.utils import timezone
+from appstationapp import analytics
+from appstationapp.models import Event, Job, PipelineCount, Question
+from .base import CandidateTestCase, CandidateTransactionTestCase
+
+
+class AnalyticsTests(CandidateTestCase):
+
+    def test_answer_rate_without_questions(self):
+        response = self.client.get('/analytics')
+
+        self.assertEqual(response.json()['questions'], {'total': 0, 'answered': 0, 'answer_rate': 0.0})
+
+    def test_answer_rate(self):
+        for answer in (None, None, None, 'Competitive'):
+            Question.objects.create(
+                candidate=self.candidate, question='Salary?', is_from_interviewer=False, answer=answer
+            )
+
+        response = self.client.get('/analytics')
+
+        self.assertEqual(response.json()['questions'], {'total': 4, 'answered': 1, 'answer_rate': 0.25})
+
+
+class IncrementalTotalsTests(CandidateTransactionTestCase):
+    """The totals kept up to date by the receivers match a recount. Bulk
+    saves are counted once their transaction commits
+    """
+
+    def totals(self):
+        return {
+            (total.candidate_id, total.dimension, total.key): total.count
+            for total in PipelineCount.objects.all() if total.count
+        }
+
+    def assertMatchesRebuild(self):
+        incremental = self.totals()
+        analytics.rebuild()
+        self.assertEqual(incremental, self.totals())
+
+    def create_event(self, job, days=0):
+        start = timezone.now() + timedelta(days=days)
+        return Event.objects.create(job=job, details='Interview', start_time=start, end_time=start + timedelta(hours=1))
+
+    def test_create(self):
+        job = self.create_jobs(3)[0]
+        self.create_event(job)
+        Question.objects.create(candidate=self.candidate, question='Why?', is_from_interviewer=False, answer='')
+
+        self.assertMatchesRebuild()
+
+    def test_update(self):
+        job = self.create_jobs(3)[0]
+        event = self.create_event(job)
+        question = Question.objects.create(candidate=self.candidate, question='Why?', is_from_interviewer=False)
+
+        job.status = self.statuses[2]
+        job.company = self.companies[1]
+        job.save()
+        event.start_time += timedelta(days=14)
+        event.save()
+        question.answer = 'Because'
+        question.save()
+
+        self.assertMatchesRebuild()
+
+    def test_delete(self):
+        jobs = self.create_jobs(3)
+        self.create_event(jobs[0])
+        self.create_event(jobs[1], days=7)
+        Question.objects.create(candidate=self.candidate, question='Why?', is_from_interviewer=False, answer='Yes')
+
+        # deleting a job deletes its events too
+        jobs[0].delete()
+        Event.objects.filter(job=jobs[1]).first().delete()
+        Question.objects.first().delete()
+
+        self.assertMatchesRebuild()
+
+    def test_stale_instances(self):
+        job = self.create_jobs(1)[0]
+        first = Job.objects.get(pk=job.pk)
+        second = Job.objects.get(pk=job.pk)
+
+        first.status = self.statuses[1]
+        first.save()
+        second.status = self.statuses[2]
+        second.save()
+
+        self.assertMatchesRebuild()
+        self.assertEqual(self.totals()[(self.candidate.id, PipelineCount.STATUS, str(self.statuses[2].id))], 1)
+
+    def test_stale_delete(self):
+        job = self.create_jobs(1)[0]
+        stale = Job.objects.get(pk=job.pk)
+        job.status = self.statuses[1]
+        job.save()
+
+        stale.delete()
+
+        self.assertMatchesRebuild()
+
+    def test_bulk(self):
+        jobs = self.create_jobs(2)
+        jobs[0].status = self.statuses[2]
+        jobs[0].save()
+
+        response = self.client.post('/jobs/bulk', [
+            {'title': 'New', 'description': '', 'link': '',
+                'status_id': self.statuses[0].id, 'company_id': self.companies[2].id},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.put('/jobs/bulk', [
+            {'id': jobs[0].id, 'title': 'Moved', 'description': '', 'link': '',
+                'status_id': self.statuses[1].id, 'company_id': self.companies[0].id},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertMatchesRebuild()
@@ -0,0 +1,55 @@
+from rest_framework.authtoken.models import Token
+from appstationapp.authentication import CachedTokenAuthentication, token_cache
+from appstationapp.caching import bump_version, token_namespace
+from .base import CandidateTestCase
+
+
+class CachedTokenTests(CandidateTestCase):
+
+    def setUp(self):
+        super().setUp()
+        token_cache.clear()
+        self.authentication = CachedTokenAuthentication()
+
+    def test_cached_tokens_run_no_queries(self):
+        self.authentication.authenticate_credentials(self.token.key)
+
+        with self.assertNumQueries(0):
+            user, token = self.authentication.authenticate_credentials(self.token.key)
+
+        self.assertEqual((user.id, token.key, user.candidate.id), (self.user.id, self.token.key, self.candidate.id))
+
+    def test_each_request_gets_its_own_instances(self):
+        first_user, first_token = self.authentication.authenticate_credentials(self.token.key)
+        second_user, second_token = self.authentication.authenticate_credentials(self.token.key)
+
+        self.assertIsNot(first_user, second_user)
+        self.assertIsNot(first_token, second_token)
+        self.assertIsNot(first_user.candidate, second_user.candidate)
+
+    def test_token_revoked_by_another_process(self):
+        self.authentication.authenticate_credentials(self.token.key)
+        entry = token_cache.get(self.token.key)
+
+        # another process deletes the token: the row goes and the version
+        # moves once it commits, but this process's token_cache keeps it
+        Token.objects.filter(key=self.token.key).delete()
+        token_cache.set(self.token.key, entry)
+        bump_version(token_namespace(self.token.key))
+
+        self.assertEqual(self.client.get('/jobs').status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.authentication.authenticate_credentials(self.token.key)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get('/jobs').status_code, 401)
+
+    def test_logout_revokes_the_old_token(self):
+        self.assertEqual(self.client.get('/jobs').status_code, 200)
+
+        self.client.post('/logout')
+
+        self.assertEqual(self.client.get('/jobs').status_code, 401)
@@ -0,0 +1,77 @@
+from appstationapp.models import Event, Job, Question
+from .base import CandidateTestCase
+
+
+class BulkTests(CandidateTestCase):
+
+    def job(self, **fields):
+        return {
+            'title': 'Engineer', 'description': 'Build things', 'link': '',
+            'status_id': self.statuses[0].id, 'company_id': self.companies[0].id,
+            **fields,
+        }
+
+    def test_invalid_jobs_fail_on_their_own(self):
+        items = [
+            self.job(title=None),
+            self.job(title='Saved'),
+            self.job(title='x' * 101),
+            self.job(status_id=0),
+            {'title': 'Missing fields'},
+        ]
+
+        response = self.client.post('/jobs/bulk', items, format='json')
+
+        self.assertEqual(response.status_code, 207)
+        results = response.json()
+        self.assertEqual(results[0], {'error': 'title can not be null'})
+        self.assertEqual(results[1]['title'], 'Saved')
+        self.assertIn('at most 100 characters', results[2]['error'])
+        self.assertEqual(results[3], {'error': 'status_id 0 does not exist'})
+        self.assertEqual(results[4], {'error': 'description is required'})
+        self.assertEqual(list(Job.objects.values_list('title', flat=True)), ['Saved'])
+
+    def test_invalid_updates_fail_on_their_own(self):
+        first, second = self.create_jobs(2)
+        items = [
+            self.job(id=first.id, title='Renamed'),
+            self.job(id=second.id, description=None),
+        ]
+
+        response = self.client.put('/jobs/bulk', items, format='json')
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json()[1], {'error': 'description can not be null'})
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.title, 'Renamed')
+        self.assertEqual(second.description, 'Build things')
+
+    def test_valid_jobs(self):
+        response = self.client.post('/jobs/bulk', [self.job(), self.job()], format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_invalid_events_and_questions_fail_on_their_own(self):
+        job = self.create_jobs(1)[0]
+        events = [
+            {'details': None, 'start_time': '2030-01-07T09:00:00Z',
+                'end_time': '2030-01-07T10:00:00Z', 'job_id': job.id},
+            {'details': 'Phone screen', 'start_time': '2030-01-07T09:00:00Z',
+                'end_time': '2030-01-07T10:00:00Z', 'job_id': job.id},
+        ]
+        questions = [
+            {'question': None, 'is_from_interviewer': True},
+            {'question': 'Why here?', 'is_from_interviewer': False},
+        ]
+
+        response = self.client.post('/events/bulk', events, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json()[0], {'error': 'details can not be null'})
+        self.assertEqual(Event.objects.count(), 1)
+
+        response = self.client.post('/questions/bulk', questions, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json()[0], {'error': 'question can not be null'})
+        self.assertEqual(Question.objects.count(), 1)
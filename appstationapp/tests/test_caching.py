@@ -0,0 +1,41 @@
+from appstationapp.models import Company
+from .base import CandidateTestCase
+
+
+class CachedResponseTests(CandidateTestCase):
+
+    def test_not_modified(self):
+        response = self.client.get('/companies')
+        etag = response['ETag']
+
+        response = self.client.get('/companies', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_each_representation_has_its_own_etag(self):
+        json_etag = self.client.get('/companies')['ETag']
+
+        indented = self.client.get('/companies', HTTP_ACCEPT='application/json; indent=4')
+        html = self.client.get('/companies', HTTP_ACCEPT='text/html')
+
+        self.assertIn(b'\n    ', indented.content)
+        self.assertTrue(html['Content-Type'].startswith('text/html'))
+        self.assertEqual(len({json_etag, indented['ETag'], html['ETag']}), 3)
+        self.assertIn('Accept', html['Vary'])
+
+        # the JSON ETag isn't answered with a 304 for another representation
+        response = self.client.get('/companies', HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=json_etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_creating_a_company_changes_the_list(self):
+        etag = self.client.get('/companies?page_size=100')['ETag']
+
+        response = self.client.post('/companies', {'name': 'Umbrella'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get('/companies?page_size=100', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('umbrella', [company['name'] for company in response.json()['results']])
@@ -0,0 +1,78 @@
+from io import StringIO
+from django.core.management import call_command
+from appstationapp.autocomplete import company_names
+from appstationapp.caching import DASHBOARD_CACHE, calendar_namespace, dashboard_namespace, get_version
+from appstationapp.models import Company, Job
+from .base import CandidateTestCase, CandidateTransactionTestCase
+
+
+class CreateCompanyTests(CandidateTestCase):
+
+    def test_existing_name_returns_the_company(self):
+        response = self.client.post('/companies', {'name': '  ACME '}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], self.companies[0].id)
+        self.assertEqual(Company.objects.count(), 3)
+
+    def test_new_name_is_created_once(self):
+        first = self.client.post('/companies', {'name': 'Umbrella Corp'}, format='json').json()
+        second = self.client.post('/companies', {'name': 'umbrella  corp'}, format='json').json()
+
+        self.assertEqual(first['id'], second['id'])
+        self.assertEqual(first['name'], 'umbrella corp')
+        self.assertEqual(Company.objects.filter(name='umbrella corp').count(), 1)
+
+
+class DedupeCompaniesTests(CandidateTransactionTestCase):
+    """dedupecompanies moves jobs with update(), which sends no signals"""
+
+    def setUp(self):
+        super().setUp()
+        # saved without Company.save, as companies were before names were
+        # normalized
+        Company.objects.bulk_create([Company(name='ACME'), Company(name='  Hooli ')])
+        self.duplicate = Company.objects.get(name='ACME')
+        self.unnormalized = Company.objects.get(name='  Hooli ')
+        self.job = self.create_jobs(1)[0]
+        Job.objects.filter(pk=self.job.pk).update(company=self.duplicate)
+        self.renamed_job = self.create_jobs(1)[0]
+        Job.objects.filter(pk=self.renamed_job.pk).update(company=self.unnormalized)
+
+    def versions(self):
+        return (
+            get_version(dashboard_namespace(self.candidate.id), DASHBOARD_CACHE),
+            get_version(calendar_namespace(self.candidate.id)),
+        )
+
+    def test_dry_run_changes_nothing(self):
+        output = StringIO()
+        call_command('dedupecompanies', '--dry-run', stdout=output)
+
+        self.assertIn('1 duplicate companies in 1 names, 1 jobs to move, 1 names to normalize', output.getvalue())
+        self.assertTrue(Company.objects.filter(pk=self.duplicate.pk).exists())
+
+    def test_merge(self):
+        dashboard, calendar = self.versions()
+        company_names.rebuild(get_version('companies'))
+
+        call_command('dedupecompanies', stdout=StringIO())
+
+        self.assertEqual(Job.objects.get(pk=self.job.pk).company_id, self.companies[0].id)
+        self.assertFalse(Company.objects.filter(pk=self.duplicate.pk).exists())
+        self.assertEqual(Company.objects.get(pk=self.unnormalized.pk).name, 'hooli')
+
+        new_dashboard, new_calendar = self.versions()
+        self.assertNotEqual(new_dashboard, dashboard)
+        self.assertNotEqual(new_calendar, calendar)
+
+        self.assertEqual(company_names.complete('acme'), [(self.companies[0].id, 'acme')])
+        self.assertEqual(company_names.complete('hoo'), [(self.unnormalized.id, 'hooli')])
+
+    def test_dashboard_shows_the_merged_company(self):
+        self.client.get('/dashboard')
+
+        call_command('dedupecompanies', stdout=StringIO())
+
+        names = {job['company']['name'] for job in self.client.get('/dashboard').json()['jobs']}
+        self.assertEqual(names, {'acme', 'hooli'})
@@ -0,0 +1,52 @@
+import time
+from datetime import timedelta
+from unittest import mock
+from django.utils import timezone
+from appstationapp.models import Event, Question
+from appstationapp.views.dashboard import DASHBOARD_LIMIT, UPCOMING_REFRESH
+from .base import CandidateTestCase
+
+
+class DashboardTests(CandidateTestCase):
+
+    def dashboard(self, **headers):
+        response = self.client.get('/dashboard', **headers)
+        self.assertIn(response.status_code, (200, 304))
+        return response
+
+    def test_lists_are_capped(self):
+        jobs = self.create_jobs(DASHBOARD_LIMIT + 1)
+        Question.objects.create(candidate=self.candidate, question='Why?', is_from_interviewer=False)
+
+        data = self.dashboard().json()
+
+        self.assertEqual(len(data['jobs']), DASHBOARD_LIMIT)
+        self.assertEqual(data['jobs'][0]['id'], jobs[-1].id)
+        self.assertEqual(data['more'], {'jobs': True, 'upcoming_events': False, 'questions': False})
+
+    def test_changes_invalidate_the_cache(self):
+        etag = self.dashboard()['ETag']
+        self.assertEqual(self.dashboard(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        job = self.create_jobs(1)[0]
+        response = self.dashboard(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()['jobs']], [job.id])
+
+        start = timezone.now() + timedelta(days=1)
+        event = Event.objects.create(job=job, details='Interview', start_time=start, end_time=start + timedelta(hours=1))
+        self.assertEqual([row['id'] for row in self.dashboard().json()['upcoming_events']], [event.id])
+
+        question = Question.objects.create(candidate=self.candidate, question='Why?', is_from_interviewer=False)
+        self.assertEqual([row['id'] for row in self.dashboard().json()['questions']], [question.id])
+
+    def test_events_that_end_drop_off(self):
+        job = self.create_jobs(1)[0]
+        start = timezone.now()
+        event = Event.objects.create(job=job, details='Interview', start_time=start, end_time=start + timedelta(seconds=30))
+        self.assertEqual([row['id'] for row in self.dashboard().json()['upcoming_events']], [event.id])
+
+        later = time.time() + UPCOMING_REFRESH
+        with mock.patch('appstationapp.views.dashboard.time.time', return_value=later), \
+                mock.patch('appstationapp.views.dashboard.timezone.now', return_value=start + timedelta(seconds=UPCOMING_REFRESH)):
+            self.assertEqual(self.dashboard().json()['upcoming_events'], [])
@@ -0,0 +1,148 @@
+import time
+import warnings
+from unittest import mock
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.response import Response
+from applicationstationapi.database import PIN_COOKIE, ReplicaReadMiddleware, apply_sqlite_pragmas
+from appstationapp.caching import cached_response
+from appstationapp.models import Job
+from appstationapp.views.jobs import Jobs
+
+# a second SQLite alias standing in for a replica. Only the router and the
+# middleware read it, the connections keep their settings.
+DATABASES_WITH_REPLICA = {
+    **settings.DATABASES,
+    'replica': {**settings.DATABASES['default'], 'TEST': {'MIRROR': 'default'}},
+}
+warnings.filterwarnings('ignore', 'Overriding setting DATABASES', UserWarning)
+
+
+class SqlitePragmaTests(TestCase):
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_set_on_connection_created(self):
+        # the test database's connection was created with the settings' pragmas
+        self.assertEqual(self.pragma('busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(self.pragma('cache_size'), settings.SQLITE_PRAGMAS['cache_size'])
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('temp_store'), 2)
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234})
+    def test_receiver_applies_the_configured_pragmas(self):
+        apply_sqlite_pragmas(sender=type(connection), connection=connection)
+        self.assertEqual(self.pragma('busy_timeout'), 1234)
+
+    def test_receiver_ignores_other_databases(self):
+        other = mock.Mock(vendor='postgresql')
+        apply_sqlite_pragmas(sender=type(other), connection=other)
+        other.cursor.assert_not_called()
+
+
+@override_settings(DATABASES=DATABASES_WITH_REPLICA)
+class ReplicaRoutingTests(SimpleTestCase):
+
+    def route(self, method, actions, cookies=None):
+        """Returns the databases a request's reads and writes are routed to"""
+
+        routed = {}
+        view = Jobs.as_view(actions)
+
+        # stands in for the rest of the middleware stack and the view
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            routed['read'] = Job.objects.all().db
+            routed['write'] = router.db_for_write(Job)
+            return HttpResponse()
+
+        middleware = ReplicaReadMiddleware(get_response)
+        request = getattr(RequestFactory(), method)('/jobs')
+        request.COOKIES.update(cookies or {})
+        routed['response'] = middleware(request)
+        return routed
+
+    def reads(self, method, actions, view_body, cookies=None):
+        """Returns the database of each read view_body(request) makes"""
+
+        view = Jobs.as_view(actions)
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view_body(request)
+
+        middleware = ReplicaReadMiddleware(get_response)
+        request = getattr(RequestFactory(), method)('/jobs')
+        request.COOKIES.update(cookies or {})
+        return middleware(request)
+
+    def test_list_and_retrieve_read_from_the_replica(self):
+        for actions in ({'get': 'list'}, {'get': 'retrieve'}):
+            with self.subTest(actions=actions):
+                routed = self.route('get', actions)
+                self.assertEqual((routed['read'], routed['write']), ('replica', 'default'))
+                self.assertNotIn(PIN_COOKIE, routed['response'].cookies)
+
+    def test_writes_and_other_actions_use_default(self):
+        routed = self.route('post', {'get': 'list', 'post': 'create'})
+        self.assertEqual((routed['read'], routed['write']), ('default', 'default'))
+
+        routed = self.route('get', {'get': 'history'})
+        self.assertEqual((routed['read'], routed['write']), ('default', 'default'))
+
+    def test_reads_in_a_transaction_use_default(self):
+        with mock.patch.object(connection, 'in_atomic_block', True):
+            routed = self.route('get', {'get': 'list'})
+        self.assertEqual(routed['read'], 'default')
+
+    def test_reads_after_a_write_in_the_request_use_default(self):
+        def view_body(request):
+            reads.append(Job.objects.all().db)
+            router.db_for_write(Job)
+            reads.append(Job.objects.all().db)
+            return HttpResponse()
+
+        reads = []
+        self.reads('get', {'get': 'list'}, view_body)
+        self.assertEqual(reads, ['replica', 'default'])
+
+        # the next request starts on the replica again
+        self.assertEqual(self.route('get', {'get': 'list'})['read'], 'replica')
+
+    @override_settings(DB_REPLICA_PIN_SECONDS=5)
+    def test_reads_after_a_write_stay_on_default_for_a_while(self):
+        response = self.route('put', {'get': 'retrieve', 'put': 'update'})['response']
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], 5)
+
+        pinned = self.route('get', {'get': 'list'}, cookies={PIN_COOKIE: cookie.value})
+        self.assertEqual(pinned['read'], 'default')
+
+        expired = self.route('get', {'get': 'list'}, cookies={PIN_COOKIE: str(time.time() - 1)})
+        self.assertEqual(expired['read'], 'replica')
+
+    def test_cached_responses_are_built_from_default(self):
+        def view_body(request):
+            return cached_response(request, 'jobs-test', build_response)
+
+        def build_response():
+            reads.append(Job.objects.all().db)
+            return Response({})
+
+        reads = []
+        self.reads('get', {'get': 'list'}, view_body)
+        self.assertEqual(reads, ['default'])
+
+    def test_reads_outside_a_request_use_default(self):
+        self.assertEqual(Job.objects.all().db, 'default')
+
+    @override_settings(DATABASES={'default': settings.DATABASES['default']})
+    def test_middleware_is_unused_without_a_replica(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaReadMiddleware(lambda request: None)
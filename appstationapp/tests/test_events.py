@@ -0,0 +1,114 @@
+from datetime import timedelta
+from django.utils import timezone
+from appstationapp.models import Event
+from .base import CandidateTestCase
+
+
+class EventConflictTests(CandidateTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.job = self.create_jobs(1)[0]
+        self.start = timezone.now().replace(microsecond=0) + timedelta(days=30)
+
+    def event(self, start, length, **fields):
+        return {
+            'details': 'Interview', 'start_time': start.isoformat(),
+            'end_time': (start + length).isoformat(), 'job_id': self.job.id, **fields,
+        }
+
+    def create_event(self, start, length):
+        return Event.objects.create(
+            job=self.job, details='Interview', start_time=start, end_time=start + length
+        )
+
+    def test_overlapping_event_conflicts(self):
+        existing = self.create_event(self.start, timedelta(hours=1))
+
+        response = self.client.post(
+            '/events', self.event(self.start + timedelta(minutes=30), timedelta(hours=1)), format='json'
+        )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual([event['id'] for event in response.json()['conflicts']], [existing.id])
+
+    def test_touching_event_does_not_conflict(self):
+        self.create_event(self.start, timedelta(hours=1))
+
+        response = self.client.post(
+            '/events', self.event(self.start + timedelta(hours=1), timedelta(hours=1)), format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_long_event_is_found(self):
+        longest = self.create_event(self.start - timedelta(days=60), timedelta(days=90))
+
+        response = self.client.post(
+            '/events', self.event(self.start, timedelta(hours=1)), format='json'
+        )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual([event['id'] for event in response.json()['conflicts']], [longest.id])
+
+    def test_naive_start_time(self):
+        naive = self.start.replace(tzinfo=None).isoformat()
+
+        response = self.client.post('/events', {
+            **self.event(self.start, timedelta(hours=1)), 'start_time': naive,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Event.objects.get().start_time, self.start)
+
+    def test_event_must_end_after_it_starts(self):
+        for length in (timedelta(0), timedelta(hours=-1)):
+            response = self.client.post('/events', self.event(self.start, length), format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['message'], 'end_time must be after start_time')
+
+        response = self.client.post('/events/bulk', [
+            self.event(self.start, timedelta(0)), self.event(self.start, timedelta(hours=1)),
+        ], format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json()[0]['error'], 'end_time must be after start_time')
+        self.assertEqual(Event.objects.count(), 1)
+
+    def test_bulk_conflicts(self):
+        existing = self.create_event(self.start, timedelta(hours=1))
+        later = self.start + timedelta(days=1)
+
+        response = self.client.post('/events/bulk', [
+            self.event(self.start + timedelta(minutes=30), timedelta(hours=1)),
+            self.event(later, timedelta(hours=1)),
+            self.event(later + timedelta(minutes=30), timedelta(hours=1)),
+        ], format='json')
+
+        self.assertEqual(response.status_code, 207)
+        results = response.json()
+        self.assertTrue(results[0]['error'].startswith(f'The event overlaps event {existing.id}.'))
+        self.assertEqual(results[1]['start_time'], later.isoformat().replace('+00:00', 'Z'))
+        self.assertTrue(results[2]['error'].startswith('The event overlaps item 1.'))
+        self.assertEqual(Event.objects.count(), 2)
+
+    def test_bulk_put_compares_moved_events_at_their_new_times(self):
+        first = self.create_event(self.start, timedelta(hours=1))
+        second = self.create_event(self.start + timedelta(hours=2), timedelta(hours=1))
+
+        # the two events swap places
+        response = self.client.put('/events/bulk', [
+            {**self.event(self.start + timedelta(hours=2), timedelta(hours=1)), 'id': first.id},
+            {**self.event(self.start, timedelta(hours=1)), 'id': second.id},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_bulk_force(self):
+        self.create_event(self.start, timedelta(hours=1))
+
+        response = self.client.post('/events/bulk?force=true', [
+            self.event(self.start, timedelta(hours=1)), self.event(self.start, timedelta(hours=1)),
+        ], format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Event.objects.count(), 3)
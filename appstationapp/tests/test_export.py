@@ -0,0 +1,101 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from applicationstationapi.handlers import ReadPoolASGIHandler
+from appstationapp.models import Candidate, Company, Event, Job, Question, Status
+from appstationapp.export import CSV_COLUMNS
+
+
+class ExportTests(TransactionTestCase):
+    """Exports run outside a test transaction, so the ASGI threads can read the rows"""
+
+    def setUp(self):
+        status = Status.objects.create(status='Applied')
+        company = Company.objects.create(name='Acme')
+        self.tokens = []
+        self.jobs = []
+
+        for n in range(2):
+            user = User.objects.create_user(username=f'user{n}@example.com', password='password')
+            candidate = Candidate.objects.create(user=user)
+            self.tokens.append(Token.objects.create(user=user).key)
+
+            job = Job.objects.create(
+                title=f'Engineer {n}', description='Build things', link='', candidate=candidate,
+                status=status, company=company
+            )
+            start = timezone.now().replace(microsecond=0)
+            Event.objects.create(
+                job=job, details=f'Interview {n}', start_time=start, end_time=start + timedelta(hours=1)
+            )
+            Question.objects.create(candidate=candidate, question=f'Why {n}?', is_from_interviewer=False)
+            self.jobs.append(job)
+
+    def export(self, query=''):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.tokens[0]}')
+        response = client.get(f'/jobs/export{query}')
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        records = [json.loads(line) for line in self.export().splitlines()]
+
+        self.assertEqual([record['record'] for record in records], ['job', 'question'])
+        self.assertEqual(records[0]['id'], self.jobs[0].id)
+        self.assertEqual(records[0]['company'], Company.objects.get().name)
+        self.assertEqual([event['details'] for event in records[0]['events']], ['Interview 0'])
+        self.assertEqual(records[1]['question'], 'Why 0?')
+
+    def test_csv(self):
+        rows = list(csv.DictReader(io.StringIO(self.export('?output=csv'))))
+
+        self.assertEqual(list(rows[0]), list(CSV_COLUMNS))
+        self.assertEqual([row['record'] for row in rows], ['job', 'event', 'question'])
+        self.assertEqual(rows[0]['title'], 'Engineer 0')
+        self.assertEqual(rows[1]['details'], 'Interview 0')
+
+    def test_other_candidates_rows_are_left_out(self):
+        export = self.export() + self.export('?output=csv')
+
+        for text in ('Engineer 1', 'Interview 1', 'Why 1?'):
+            self.assertNotIn(text, export)
+
+    def test_export_through_the_asgi_handler(self):
+        body, status = asyncio.run(self.asgi_get('/jobs/export', self.tokens[0]))
+
+        self.assertEqual(status, 200)
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([record['record'] for record in records], ['job', 'question'])
+
+    async def asgi_get(self, path, token):
+        """Returns the body and status of a GET sent to a ReadPoolASGIHandler"""
+
+        handler = ReadPoolASGIHandler()
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+            'headers': [(b'host', b'testserver'), (b'authorization', f'Token {token}'.encode())],
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        try:
+            await handler(scope, receive, send)
+        finally:
+            handler.read_executor.shutdown()
+
+        status = messages[0]['status']
+        body = b''.join(message.get('body', b'') for message in messages[1:])
+        return body, status
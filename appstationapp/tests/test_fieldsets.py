@@ -0,0 +1,95 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from appstationapp.models import Event, Question
+from appstationapp.views.companies import CompanySerializer
+from appstationapp.views.events import EventSerializer
+from appstationapp.views.questions import QuestionSerializer
+from appstationapp.views.statuses import StatusSerializer
+from .base import CandidateTestCase
+
+
+class SparseFieldsetTests(CandidateTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.job = self.create_jobs(2)[0]
+        # cache the token, so only the queries of the jobs are captured
+        self.client.get('/statuses')
+
+    def get(self, path):
+        """Returns the JSON of a GET and the SQL of the query that selected the jobs"""
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+
+        self.assertEqual(response.status_code, 200, response.content)
+        jobs_sql = [query['sql'] for query in queries if 'FROM "appstationapp_job"' in query['sql']]
+        self.assertEqual(len(jobs_sql), 1)
+        return response.json(), jobs_sql[0]
+
+    def test_list_fields(self):
+        data, sql = self.get('/jobs?fields=id,title')
+
+        self.assertEqual(data['results'][0], {'id': self.job.id, 'title': self.job.title})
+        self.assertIn('"appstationapp_job"."title"', sql)
+        self.assertNotIn('"appstationapp_job"."description"', sql)
+        self.assertNotIn('appstationapp_company', sql)
+
+    def test_list_summary(self):
+        data, sql = self.get('/jobs?view=summary')
+
+        self.assertEqual(data['results'][0], {'id': self.job.id, 'title': self.job.title})
+        self.assertNotIn('"appstationapp_job"."description"', sql)
+
+    def test_retrieve_fields(self):
+        data, sql = self.get(f'/jobs/{self.job.id}?fields=title,company')
+
+        self.assertEqual(data, {
+            'title': self.job.title,
+            'company': {'url': f'http://testserver/companies/{self.job.company_id}', 'name': self.job.company.name},
+        })
+        self.assertNotIn('"appstationapp_job"."description"', sql)
+        self.assertNotIn('appstationapp_status', sql)
+
+    def test_retrieve_summary(self):
+        data, sql = self.get(f'/jobs/{self.job.id}?view=summary')
+
+        self.assertEqual(data, {'id': self.job.id, 'title': self.job.title})
+        self.assertNotIn('"appstationapp_job"."description"', sql)
+        self.assertNotIn('"appstationapp_job"."link"', sql)
+
+    def test_full_view(self):
+        data, sql = self.get(f'/jobs/{self.job.id}?view=full')
+
+        self.assertEqual(data['description'], self.job.description)
+        self.assertIn('"appstationapp_job"."description"', sql)
+
+    def test_bad_fields_and_views(self):
+        for query in ('fields=', 'fields=,', 'fields=%20', 'fields=title,salary', 'view=compact'):
+            for path in ('/jobs', f'/jobs/{self.job.id}'):
+                with self.subTest(path=path, query=query):
+                    self.assertEqual(self.client.get(f'{path}?{query}').status_code, 400)
+
+    def test_summary_of_every_resource(self):
+        event = Event.objects.create(
+            job=self.job, details='Interview', start_time=timezone.now(), end_time=timezone.now()
+        )
+        question = Question.objects.create(candidate=self.candidate, question='Why?', is_from_interviewer=True)
+        resources = (
+            ('events', event.id, EventSerializer),
+            ('questions', question.id, QuestionSerializer),
+            ('companies', self.job.company_id, CompanySerializer),
+            ('statuses', self.job.status_id, StatusSerializer),
+        )
+
+        for resource, pk, serializer_class in resources:
+            summary_fields = list(serializer_class.Meta.summary_fields)
+            with self.subTest(resource=resource):
+                response = self.client.get(f'/{resource}?view=summary')
+                results = response.json()
+                results = results['results'] if isinstance(results, dict) else results
+                self.assertEqual(list(results[0]), summary_fields)
+
+                response = self.client.get(f'/{resource}/{pk}?view=summary')
+                self.assertEqual(list(response.json()), summary_fields)
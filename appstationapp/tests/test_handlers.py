@@ -0,0 +1,46 @@
+import asyncio
+from unittest import mock
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from applicationstationapi.handlers import ReadPoolASGIHandler, with_fresh_connections
+
+
+class ReadPoolTests(TestCase):
+
+    def test_closes_old_connections_around_each_read(self):
+        calls = []
+        get_response = mock.Mock(side_effect=lambda request: calls.append('get_response'))
+
+        with mock.patch('applicationstationapi.handlers.close_old_connections',
+                side_effect=lambda: calls.append('close_old_connections')):
+            with_fresh_connections(get_response, 'request')
+
+        self.assertEqual(calls, ['close_old_connections', 'get_response', 'close_old_connections'])
+
+    def test_closes_old_connections_when_the_read_fails(self):
+        get_response = mock.Mock(side_effect=RuntimeError)
+
+        with mock.patch('applicationstationapi.handlers.close_old_connections') as close:
+            with self.assertRaises(RuntimeError):
+                with_fresh_connections(get_response, 'request')
+
+        self.assertEqual(close.call_count, 2)
+
+    @override_settings(ASGI_READ_THREADS=1)
+    def test_read_pool_thread_closes_an_expired_connection(self):
+        handler = ReadPoolASGIHandler()
+        self.addCleanup(handler.read_executor.shutdown)
+
+        # runs in the pool's one thread, on that thread's connection. The
+        # test database is in memory, which Django never really closes.
+        def expire_connection():
+            connection.ensure_connection()
+            connection.close_at = 0
+            connection.close = mock.Mock()
+            return connection.close
+
+        close = handler.read_executor.submit(expire_connection).result()
+        response = asyncio.run(handler.get_response(RequestFactory().get('/statuses')))
+
+        self.assertEqual(response.status_code, 200)
+        close.assert_called_with()
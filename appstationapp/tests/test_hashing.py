@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from django.test import SimpleTestCase
+from appstationapp.hashing import HashingPool, PoolSaturated
+
+
+class HashingPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        self.pool = HashingPool(workers=1, max_pending=2, timeout=0.05)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def block(self):
+        """Takes the pool's only worker until the test ends"""
+
+        started = threading.Event()
+        future = self.pool.submit(lambda: (started.set(), self.release.wait(5)), (), {})
+        started.wait(5)
+        return future
+
+    def test_queued_hash_that_times_out_is_cancelled(self):
+        self.block()
+
+        with self.assertLogs('appstationapp.hashing', 'WARNING') as logs:
+            with self.assertRaises(PoolSaturated):
+                self.pool.run(pow, 2, 10)
+
+        self.assertIn('cancelled before it started', logs.output[0])
+        stats = self.pool.stats()
+        self.assertEqual((stats['pending'], stats['cancelled'], stats['rejected']), (1, 1, 1))
+
+    def test_running_hash_that_times_out_keeps_its_place(self):
+        with self.assertLogs('appstationapp.hashing', 'WARNING') as logs:
+            with self.assertRaises(PoolSaturated):
+                self.pool.run(self.release.wait, 5)
+
+        self.assertIn('still hashing', logs.output[0])
+        stats = self.pool.stats()
+        self.assertEqual((stats['pending'], stats['abandoned']), (1, 1))
+
+        self.release.set()
+        self.pool.executor.shutdown(wait=True)
+        self.assertEqual(self.pool.stats()['pending'], 0)
+
+    def test_full_pool_rejects_and_logs(self):
+        self.block()
+        self.pool.submit(pow, (2, 10), {})
+
+        with self.assertLogs('appstationapp.hashing', 'WARNING') as logs:
+            with self.assertRaises(PoolSaturated):
+                self.pool.run(pow, 2, 10)
+
+        self.assertIn('Hashing pool full', logs.output[0])
+        self.assertEqual(self.pool.stats()['rejected'], 1)
+
+    def test_run_async(self):
+        self.assertEqual(asyncio.run(self.pool.run_async(pow, 2, 10)), 1024)
+
+        self.block()
+        with self.assertLogs('appstationapp.hashing', 'WARNING'):
+            with self.assertRaises(PoolSaturated):
+                asyncio.run(self.pool.run_async(pow, 2, 10))
+        self.assertEqual(self.pool.stats()['cancelled'], 1)
@@ -0,0 +1,110 @@
+from unittest import mock
+from django.db.models import QuerySet
+from django.test import RequestFactory
+from rest_framework.request import Request
+from appstationapp.models import Job, StatusTransition
+from appstationapp.views.jobs import JobSerializer, jobs_with_relations
+from .base import CandidateTestCase
+
+
+class JobQueryCountTests(CandidateTestCase):
+    """The number of queries of a request doesn't grow with the number of jobs"""
+
+    def setUp(self):
+        super().setUp()
+        # cache the token, so only the queries of the jobs are counted
+        self.client.get('/statuses')
+        self.client.get('/jobs')
+
+    def test_list(self):
+        for count in (1, 25):
+            with self.subTest(jobs=count):
+                self.create_jobs(count)
+                with self.assertNumQueries(1):
+                    response = self.client.get('/jobs?page_size=100')
+                self.assertEqual(len(response.json()['results']), Job.objects.count())
+
+    def test_retrieve(self):
+        for count in (1, 25):
+            with self.subTest(jobs=count):
+                job = self.create_jobs(count)[-1]
+                with self.assertNumQueries(1):
+                    response = self.client.get(f'/jobs/{job.id}')
+                self.assertEqual(response.json()['company']['name'], job.company.name)
+
+    def test_serializing_jobs_with_relations(self):
+        request = Request(RequestFactory().get('/jobs'))
+
+        for count in (1, 25):
+            with self.subTest(jobs=count):
+                self.create_jobs(count)
+                with self.assertNumQueries(1):
+                    data = JobSerializer(jobs_with_relations(), many=True, context={'request': request}).data
+                self.assertTrue(all(job['status']['status'] for job in data))
+
+
+class StatusHistoryTests(CandidateTestCase):
+    """Every change of a job's status is logged once, from the status it had"""
+
+    def job(self, status, **fields):
+        return {
+            'title': 'Engineer', 'description': '', 'link': '',
+            'status_id': status.id, 'company_id': self.companies[0].id, **fields,
+        }
+
+    def history(self, job_id):
+        response = self.client.get(f'/jobs/{job_id}/history')
+        self.assertEqual(response.status_code, 200)
+        return [(change['from_status_id'], change['to_status_id']) for change in response.json()]
+
+    def test_create_and_update(self):
+        applied, interviewing, _ = self.statuses
+        job_id = self.client.post('/jobs', self.job(applied), format='json').json()['id']
+
+        self.client.put(f'/jobs/{job_id}', self.job(interviewing), format='json')
+        self.client.put(f'/jobs/{job_id}', self.job(interviewing, title='Renamed'), format='json')
+
+        self.assertEqual(self.history(job_id), [(None, applied.id), (applied.id, interviewing.id)])
+
+    def test_bulk(self):
+        applied, interviewing, offer = self.statuses
+        created = self.client.post('/jobs/bulk', [self.job(applied), self.job(applied)], format='json')
+        first, second = [job['id'] for job in created.json()]
+
+        response = self.client.put('/jobs/bulk', [
+            self.job(offer, id=first), self.job(applied, id=second, title='Renamed'),
+        ], format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.history(first), [(None, applied.id), (applied.id, offer.id)])
+        self.assertEqual(self.history(second), [(None, applied.id)])
+
+    def test_bulk_logs_changes_from_the_saved_status(self):
+        applied, interviewing, offer = self.statuses
+        job = self.create_jobs(1)[0]
+        in_bulk = QuerySet.in_bulk
+
+        # another request moves the job after the bulk request loaded it
+        def load_then_move(queryset, *args, **kwargs):
+            jobs = in_bulk(queryset, *args, **kwargs)
+            Job.objects.filter(pk=job.id).update(status=interviewing)
+            return jobs
+
+        with mock.patch.object(QuerySet, 'in_bulk', load_then_move):
+            self.client.put('/jobs/bulk', [self.job(offer, id=job.id)], format='json')
+
+        self.assertEqual(
+            list(StatusTransition.objects.filter(job=job).values_list('from_status', 'to_status')),
+            [(interviewing.id, offer.id)]
+        )
+
+    def test_stages(self):
+        applied, interviewing, _ = self.statuses
+        job_id = self.client.post('/jobs', self.job(applied), format='json').json()['id']
+        self.client.put('/jobs/bulk', [self.job(interviewing, id=job_id)], format='json')
+
+        stages = {stage['status']: stage for stage in self.client.get('/jobs/stages').json()}
+
+        self.assertEqual(stages['Applied']['entered'], 1)
+        self.assertEqual(stages['Applied']['current'], 0)
+        self.assertEqual(stages['Interviewing']['current'], 1)
@@ -0,0 +1,62 @@
+from rest_framework.authtoken.models import Token
+from appstationapp.metrics import metrics
+from .base import CandidateTestCase
+
+
+class MetricsTests(CandidateTestCase):
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+
+    def test_server_timing(self):
+        response = self.client.get('/statuses')
+
+        timing = response['Server-Timing']
+        for stage in ('db;dur=', 'queries"', 'serialize;dur=', 'render;dur=', 'total;dur='):
+            self.assertIn(stage, timing)
+
+    def test_routes_are_recorded(self):
+        self.client.get('/jobs')
+        self.client.get('/jobs')
+
+        routes = metrics.snapshot()
+
+        self.assertEqual(routes['GET job-list']['latency_ms']['count'], 2)
+        self.assertEqual(routes['GET job-list']['status_codes'], {200: 2})
+        self.assertGreater(routes['GET job-list']['queries_per_request'], 0)
+
+    def test_streaming_response_is_recorded_when_it_ends(self):
+        self.create_jobs(3)
+        response = self.client.get('/jobs/export')
+        self.assertNotIn('GET job-export', metrics.snapshot())
+
+        body = b''.join(response.streaming_content)
+        response.close()
+
+        route = metrics.snapshot()['GET job-export']
+        self.assertEqual(route['latency_ms']['count'], 1)
+        self.assertEqual(route['bytes_per_request'], len(body))
+        self.assertGreater(route['queries_per_request'], 0)
+
+    def test_metrics_only_answer_staff(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+        self.client.credentials()
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=self.user).key}')
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hashing_pool', response.json())
+
+    def test_metrics_only_answer_allowed_ips(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get('/metrics', REMOTE_ADDR='203.0.113.7')
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,61 @@
+from base64 import b64encode
+from urllib.parse import urlencode
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from appstationapp.models import Job
+from .base import CandidateTestCase
+
+
+class CursorPaginationTests(CandidateTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # jobs are ordered by company_id, so every one of these ties
+        self.jobs = self.create_jobs(25)
+        Job.objects.update(company=self.companies[0])
+
+    def pages(self, url, link):
+        """Follows the link of each page from url, returning the ids of each page"""
+
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([job['id'] for job in response.json()['results']])
+            url = response.json()[link]
+
+        return pages
+
+    def test_pages_through_ties(self):
+        pages = self.pages('/jobs?fields=id', 'next')
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(sum(pages, []), sorted(job.id for job in self.jobs))
+
+    def test_pages_back_through_ties(self):
+        last = self.client.get(self.client.get('/jobs?fields=id').json()['next']).json()
+        last = self.client.get(last['next']).json()
+
+        pages = self.pages(last['previous'], 'previous')
+
+        self.assertEqual(pages, [
+            sorted(job.id for job in self.jobs)[10:20], sorted(job.id for job in self.jobs)[:10]
+        ])
+
+    def test_next_page_is_a_keyset_query(self):
+        url = self.client.get('/jobs?fields=id').json()['next']
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+
+        sql = [query['sql'] for query in queries if 'appstationapp_job' in query['sql']][-1]
+        self.assertNotIn('OFFSET', sql)
+        self.assertIn('"company_id" >', sql)
+        self.assertIn('"company_id" =', sql)
+        self.assertIn('"id" >', sql)
+
+    def test_invalid_cursor(self):
+        for position in ('nope', '[1]', '["x", "1"]'):
+            cursor = b64encode(urlencode({'p': position}).encode()).decode()
+            response = self.client.get('/jobs', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404)
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from appstationapp.models import Company, Event, Job, Question, Status
+from appstationapp.renderers import FastJSONRenderer
+from appstationapp.views.companies import CompanySerializer, company_projection
+from appstationapp.views.events import EventSerializer, event_projection
+from appstationapp.views.jobs import JobSerializer, job_projection, jobs_with_relations
+from appstationapp.views.questions import QuestionSerializer, question_projection
+from appstationapp.views.statuses import StatusSerializer, status_projection
+from .base import CandidateTestCase
+
+
+class ProjectionTests(CandidateTestCase):
+    """Projections render the same bytes as the serializers they replace"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        jobs = [
+            Job.objects.create(
+                title=f'Engineer {n}', description='Build things', link='https://example.com',
+                candidate=cls.candidate, status=cls.statuses[n % 3], company=cls.companies[n % 3],
+            )
+            for n in range(4)
+        ]
+        # microseconds and a time zone other than UTC
+        start = timezone.make_aware(datetime(2030, 1, 7, 9, 30, 15, 123456), timezone.get_fixed_timezone(-300))
+        for n, job in enumerate(jobs):
+            Event.objects.create(
+                job=job, details=f'Interview {n}',
+                start_time=start + timedelta(days=n), end_time=start + timedelta(days=n, hours=1),
+            )
+        Question.objects.create(candidate=cls.candidate, question='Why here?', is_from_interviewer=True)
+        Question.objects.create(candidate=cls.candidate, question='Salary?', is_from_interviewer=False,
+            answer='Competitive')
+
+    def setUp(self):
+        super().setUp()
+        self.request = Request(APIRequestFactory().get('/'))
+
+    def endpoints(self):
+        """Returns (projection, serializer class, queryset) of each list endpoint"""
+
+        return (
+            (job_projection, JobSerializer, jobs_with_relations()),
+            (event_projection, EventSerializer, Event.objects.all()),
+            (question_projection, QuestionSerializer, Question.objects.all()),
+            (company_projection, CompanySerializer, Company.objects.all()),
+            (status_projection, StatusSerializer, Status.objects.all()),
+        )
+
+    def render(self, data):
+        return FastJSONRenderer().render(data)
+
+    def test_serialize_matches_the_serializer(self):
+        for projection, serializer_class, queryset in self.endpoints():
+            with self.subTest(serializer=serializer_class.__name__):
+                queryset = queryset.order_by('id')
+                expected = serializer_class(queryset, many=True, context={'request': self.request}).data
+                rows = projection.values(queryset)
+
+                self.assertEqual(self.render(projection.serialize(rows, self.request)), self.render(expected))
+
+    def test_subset_matches_the_serializer(self):
+        for projection, serializer_class, queryset in self.endpoints():
+            for fields in (serializer_class.Meta.summary_fields, ('url',), serializer_class.Meta.fields[-2:]):
+                with self.subTest(serializer=serializer_class.__name__, fields=fields):
+                    queryset = queryset.order_by('id')
+                    subset = projection.subset(fields)
+                    expected = serializer_class(
+                        queryset, many=True, fields=fields, context={'request': self.request}
+                    ).data
+
+                    self.assertEqual(
+                        self.render(subset.serialize(subset.values(queryset), self.request)),
+                        self.render(expected)
+                    )
+
+    def test_only_matches_the_serializer(self):
+        for projection, serializer_class, queryset in self.endpoints():
+            fields = serializer_class.Meta.summary_fields
+            with self.subTest(serializer=serializer_class.__name__):
+                instance = projection.subset(fields).only(queryset).order_by('id').first()
+                expected = serializer_class(
+                    queryset.order_by('id').first(), fields=fields, context={'request': self.request}
+                ).data
+
+                with self.assertNumQueries(0):
+                    data = serializer_class(instance, fields=fields, context={'request': self.request}).data
+                self.assertEqual(self.render(data), self.render(expected))
+
+    def test_subset_of_every_field_is_the_projection(self):
+        self.assertIs(job_projection.subset(None), job_projection)
+        self.assertEqual(job_projection.subset(JobSerializer.Meta.fields).columns(), job_projection.columns())
@@ -0,0 +1,85 @@
+from unittest import mock
+from django.contrib.auth import authenticate
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_login_failed
+from django.test import TransactionTestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from appstationapp.hashing import hashing_pool
+from appstationapp.models import Candidate
+from .base import CandidateTestCase
+
+
+class PasswordlessBackend(ModelBackend):
+    """Logs in any existing user, whatever the password"""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        return User.objects.filter(username=username).first()
+
+
+@mock.patch.object(hashing_pool, 'mode', 'inline')
+class LoginTests(CandidateTestCase):
+
+    def login(self, username, password):
+        return self.client.post('/login', {'username': username, 'password': password}, format='json').json()
+
+    def test_login(self):
+        self.assertEqual(self.login('ada@example.com', 'password'), {'valid': True, 'token': self.token.key})
+
+    def test_wrong_password_sends_user_login_failed(self):
+        receiver = mock.Mock()
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+
+        self.assertEqual(self.login('ada@example.com', 'wrong'), {'valid': False})
+        self.assertEqual(self.login('nobody@example.com', 'wrong'), {'valid': False})
+        self.assertEqual(receiver.call_count, 2)
+
+    @override_settings(AUTHENTICATION_BACKENDS=['appstationapp.tests.test_register.PasswordlessBackend'])
+    def test_login_uses_the_authentication_backends(self):
+        self.assertEqual(self.login('ada@example.com', 'wrong'), {'valid': True, 'token': self.token.key})
+
+    def test_authenticate_runs_on_the_hashing_pool(self):
+        with mock.patch.object(hashing_pool, 'run', return_value=None) as run:
+            self.assertEqual(self.login('ada@example.com', 'password'), {'valid': False})
+
+        run.assert_called_once_with(authenticate, mock.ANY, username='ada@example.com', password='password')
+
+
+class PooledLoginTests(TransactionTestCase):
+    """Logs in on the hashing pool's threads, which use their own connections"""
+
+    def test_login(self):
+        user = User.objects.create_user(username='ada@example.com', password='password')
+        Candidate.objects.create(user=user)
+        token = Token.objects.create(user=user)
+
+        with mock.patch.object(hashing_pool, 'mode', 'pool'):
+            response = APIClient().post(
+                '/login', {'username': 'ada@example.com', 'password': 'password'}, format='json'
+            )
+
+        self.assertEqual(response.json(), {'valid': True, 'token': token.key})
+
+
+class LogoutTests(CandidateTestCase):
+
+    def test_logout_rotates_the_token(self):
+        response = self.client.post('/logout')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'valid': True})
+        self.assertNotEqual(Token.objects.get(user=self.user).key, self.token.key)
+
+    def test_logout_without_a_token(self):
+        self.client.credentials()
+
+        self.assertEqual(self.client.post('/logout').status_code, 401)
+
+    def test_logout_only_accepts_post(self):
+        for method in ('get', 'put', 'delete'):
+            with self.subTest(method=method):
+                response = getattr(self.client, method)('/logout')
+                self.assertEqual(response.status_code, 405)
+                self.assertEqual(response['Allow'], 'POST')
@@ -0,0 +1,118 @@
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from appstationapp.models import Candidate, Company, Job, Status
+from appstationapp.search import FTSIndex, fts5_available, search_index
+from .base import CandidateTestCase
+
+
+class SearchIndexTests(CandidateTestCase):
+
+    def test_saved_jobs_are_found(self):
+        job = self.create_jobs(1)[0]
+
+        response = self.client.get('/search?q=engin')
+
+        self.assertEqual([(result['kind'], result['id']) for result in response.json()], [('job', job.id)])
+
+    def test_saving_a_job_doesnt_look_up_the_table(self):
+        job = self.create_jobs(1)[0]
+        self.client.get('/statuses')
+        data = {
+            'title': 'Designer', 'description': 'Draw things', 'link': '',
+            'status_id': self.statuses[1].id, 'company_id': self.companies[0].id,
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(f'/jobs/{job.id}', data, format='json')
+
+        self.assertEqual(response.status_code, 204)
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('sqlite_master', sql)
+        self.assertNotIn('compile_options', sql)
+
+
+class FTSTableTests(TransactionTestCase):
+    """Creating and dropping the virtual table, outside a test transaction"""
+
+    def setUp(self):
+        if not fts5_available(connection):
+            self.skipTest('SQLite without FTS5')
+
+        user = User.objects.create_user(username='ada@example.com', password='password')
+        self.candidate = Candidate.objects.create(user=user)
+        self.status = Status.objects.create(status='Applied')
+        self.company = Company.objects.create(name='Acme')
+
+    def create_jobs(self, count):
+        for n in range(count):
+            Job.objects.create(
+                title=f'Engineer {n}', description='Build things', link='',
+                candidate=self.candidate, status=self.status, company=self.company
+            )
+
+    def test_missing_table_is_created_empty(self):
+        self.create_jobs(3)
+        index = FTSIndex()
+        index.table = 'appstationapp_search_test'
+        self.addCleanup(self.drop_table, index.table)
+
+        index.ensure_table(connections['default'])
+
+        self.assertEqual(self.count(index.table), 0)
+        with self.assertNumQueries(0):
+            index.ensure_table(connections['default'])
+
+    def test_rebuild_indexes_every_row(self):
+        self.create_jobs(3)
+        search_index.rebuild()
+
+        self.assertEqual(self.count(FTSIndex.table), Job.objects.count())
+
+    def test_table_with_unindexed_candidate_id_is_created_again(self):
+        self.create_jobs(3)
+        index = FTSIndex()
+        index.table = 'appstationapp_search_test'
+        self.addCleanup(self.drop_table, index.table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE {index.table} USING fts5('
+                'title, body, kind UNINDEXED, object_id UNINDEXED, candidate_id UNINDEXED)'
+            )
+
+        index.ensure_table(connections['default'])
+
+        self.assertEqual(self.count(index.table), 3)
+        self.assertEqual(
+            sorted(row[1] for row in index.search(self.candidate.id, 'engineer', 10)),
+            sorted(Job.objects.values_list('id', flat=True))
+        )
+
+    def test_other_candidates_rows_dont_match(self):
+        self.create_jobs(1)
+        other = Candidate.objects.create(user=User.objects.create_user(username='grace@example.com'))
+        Job.objects.create(
+            title=f'Engineer {self.candidate.id}', description='Build things', link='',
+            candidate=other, status=self.status, company=self.company
+        )
+        search_index.rebuild()
+
+        own = Job.objects.get(candidate=self.candidate)
+
+        def found(query):
+            return [row[1] for row in FTSIndex().search(self.candidate.id, query, 10)]
+
+        self.assertEqual(found('engineer'), [own.id])
+        # the candidate ids are only matched against the candidate_id column
+        self.assertEqual(found(str(self.candidate.id)), [])
+        self.assertEqual(found(str(other.id)), [])
+
+    def count(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {table}')
+            return cursor.fetchone()[0]
+
+    def drop_table(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
@@ -0,0 +1,64 @@
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+from appstationapp.models import Candidate, Company, Event, Job, PipelineCount, Question, Status
+from appstationapp.search import FTSIndex, fts5_available
+
+
+class SeedDataTests(TransactionTestCase):
+    """seeddata runs its own transactions and rebuilds the search table"""
+
+    def seed(self, *args):
+        call_command(
+            'seeddata', '--candidates', '3', '--companies', '5', '--jobs', '4', '--events', '1',
+            '--questions', '2', *args, stdout=StringIO()
+        )
+
+    def search_rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {FTSIndex.table}')
+            return cursor.fetchone()[0]
+
+    def test_same_seed_same_rows(self):
+        self.seed()
+        first = list(Job.objects.order_by('id').values_list('title', 'description', 'status_id'))
+
+        self.seed('--flush')
+        second = list(Job.objects.order_by('id').values_list('title', 'description', 'status_id'))
+
+        self.assertTrue(first)
+        self.assertEqual(first, second)
+
+    def test_flush_deletes_the_seeded_rows_and_their_search_rows(self):
+        user = User.objects.create_user(username='ada@example.com', password='password')
+        candidate = Candidate.objects.create(user=user)
+        self.seed()
+        Job.objects.create(
+            title='Kept', description='Not seeded', link='', candidate=candidate,
+            status=Status.objects.first(), company=Company.objects.first()
+        )
+
+        call_command('seeddata', '--candidates', '0', '--flush', stdout=StringIO())
+
+        self.assertEqual(list(User.objects.values_list('username', flat=True)), ['ada@example.com'])
+        self.assertEqual(list(Job.objects.values_list('title', flat=True)), ['Kept'])
+        self.assertFalse(Event.objects.exists())
+        self.assertFalse(Question.objects.exists())
+        self.assertFalse(PipelineCount.objects.exclude(candidate=candidate).exists())
+        if fts5_available(connection):
+            self.assertEqual(self.search_rows(), 1)
+
+    def test_explainlists_seeds_with_seeddata_and_rolls_back(self):
+        self.seed()
+        jobs = list(Job.objects.order_by('id').values_list('id', 'title'))
+        out = StringIO()
+
+        call_command('explainlists', '--rows', '20', '--candidates', '2', stdout=out)
+
+        self.assertIn('jobs (', out.getvalue())
+        self.assertEqual(list(Job.objects.order_by('id').values_list('id', 'title')), jobs)
+        self.assertEqual(User.objects.count(), 3)
+        if fts5_available(connection):
+            self.assertEqual(self.search_rows(), Job.objects.count() + Question.objects.count())
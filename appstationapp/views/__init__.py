@@ -1,7 +1,12 @@
 from .register import register_user
 from .register import login_user
+from .register import logout_user
 from .questions import Questions
 from .companies import Companies
 from .statuses import Statuses
 from .jobs import Jobs
-from .events import Events
\ No newline at end of file
+from .events import Events
+from .dashboard import Dashboard
+from .search import Search
+from .analytics import Analytics
+from .metrics import metrics_view
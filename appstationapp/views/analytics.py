@@ -0,0 +1,70 @@
+"""View module for handling requests about a candidate's pipeline analytics
+
+    The analytics are read from the running totals in PipelineCount (see
+    appstationapp/analytics.py), so they cost the same however many jobs,
+    events and questions a candidate has.
+"""
+from rest_framework.viewsets import ViewSet
+from rest_framework.response import Response
+from appstationapp.models import Company, PipelineCount, Status
+
+
+class Analytics(ViewSet):
+    """Analytics for Application Station API"""
+
+    # Handles GET all
+    def list(self, request):
+        """Handle GET requests to Analytics
+
+        Fetch call to get the logged in candidate's jobs counted by status
+        and by company, events counted by week and the share of questions
+        that have an answer:
+            http://localhost:8000/analytics
+
+        Returns:
+            Response -- JSON serialized analytics
+        """
+
+        candidate_id = request.auth.user.candidate.id
+
+        totals = {}
+        for dimension, key, count in PipelineCount.objects.filter(
+            candidate_id=candidate_id, count__gt=0
+        ).values_list('dimension', 'key', 'count'):
+            totals.setdefault(dimension, {})[key] = count
+
+        by_status = totals.get(PipelineCount.STATUS, {})
+        statuses = Status.objects.in_bulk([int(key) for key in by_status])
+
+        by_company = totals.get(PipelineCount.COMPANY, {})
+        companies = Company.objects.in_bulk([int(key) for key in by_company])
+
+        questions = totals.get(PipelineCount.QUESTIONS, {})
+        asked = questions.get('total', 0)
+        answered = questions.get('answered', 0)
+
+        return Response({
+            'jobs_by_status': sorted(
+                (
+                    {'status_id': int(key), 'status': statuses[int(key)].status, 'count': count}
+                    for key, count in by_status.items() if int(key) in statuses
+                ),
+                key=lambda row: row['status_id']
+            ),
+            'jobs_by_company': sorted(
+                (
+                    {'company_id': int(key), 'name': companies[int(key)].name, 'count': count}
+                    for key, count in by_company.items() if int(key) in companies
+                ),
+                key=lambda row: (-row['count'], row['name'])
+            ),
+            'events_by_week': [
+                {'week': week, 'count': count}
+                for week, count in sorted(totals.get(PipelineCount.WEEK, {}).items())
+            ],
+            'questions': {
+                'total': asked,
+                'answered': answered,
+                'answer_rate': answered / asked if asked else 0.0
+            }
+        })
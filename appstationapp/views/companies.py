@@ -8,13 +8,21 @@
     job.
 """
 from django.http import HttpResponseServerError
+from rest_framework.decorators import action
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import serializers, status
-from appstationapp.models import Company
+from appstationapp.models import Company, normalize_company_name
+from appstationapp.fieldsets import SparseFieldsMixin, requested_fields
+from appstationapp.metrics import TimedSerializerMixin
+from appstationapp.autocomplete import company_names
+from appstationapp.caching import cached_response
+from appstationapp.pagination import ModelCursorPagination
+from appstationapp.projections import Projection
 
 
-class CompanySerializer(serializers.HyperlinkedModelSerializer):
+class CompanySerializer(TimedSerializerMixin, SparseFieldsMixin,
+    serializers.HyperlinkedModelSerializer):
     """JSON serializer for companies
 
     Arugments:
@@ -29,8 +37,18 @@ class CompanySerializer(serializers.HyperlinkedModelSerializer):
             lookup_field='id'
         )
         fields = ('id', 'url', 'name')
+        # fields of ?view=summary
+        summary_fields = ('id', 'name')
 
 
+# Read only projection of CompanySerializer, used to list companies
+company_projection = Projection('company-detail', CompanySerializer.Meta.fields)
+
+
+# number of names autocomplete returns by default, and at most
+AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 50
+
 
 class Companies(ViewSet):
     """Companies for Application Station"""
@@ -46,9 +64,13 @@ class Companies(ViewSet):
             Response -- JSON serialized Company instance
         """
 
+        # the fields asked for with ?fields= or ?view=summary
+        fields = requested_fields(request, CompanySerializer)
+
         try:
-            company = Company.objects.get(pk=pk)
-            serializer = CompanySerializer(company, context={'request': request})
+            companies = company_projection.subset(fields).only(Company.objects.all())
+            company = companies.get(pk=pk)
+            serializer = CompanySerializer(company, fields=fields, context={'request': request})
             return Response(serializer.data)
 
         except Exception as ex:
@@ -62,11 +84,26 @@ class Companies(ViewSet):
         Fetch call to get all companies:
             http://localhost:8000/companies
 
+        Fetch call to get only some fields of all companies, or their summary:
+            http://localhost:8000/companies?fields=id,name
+            http://localhost:8000/companies?view=summary
+
         Fetch call to get company based on name:
             http://localhost:8000/companies?name=${name}
 
         Returns:
-            Response -- JSON serialized list of companies
+            Response -- JSON serialized page of companies, or 304 status code
+        """
+
+        # serve the page from the cache until the companies change
+        return cached_response(request, 'companies', lambda: self.page_of_companies(request))
+
+
+    def page_of_companies(self, request):
+        """Builds the response to a GET all request that isn't cached yet
+
+        Returns:
+            Response -- JSON serialized page of companies
         """
 
         # list of company instances
@@ -75,37 +112,68 @@ class Companies(ViewSet):
         # Get the name from the query params. If name, filter companies by name
         name = self.request.query_params.get('name', False)
         if name:
-            companies = companies.filter(name=name)
+            companies = companies.filter(name=normalize_company_name(name))
 
-        # takes companies and converts to JSON
-        serializer = CompanySerializer(
-            companies,
-            many=True,
-            context={'request': request}
-        )
+        # only fetch the columns and the page of companies that were requested
+        projection = company_projection.subset(requested_fields(request, CompanySerializer))
+        paginator = ModelCursorPagination()
+        page = paginator.paginate_queryset(projection.values(companies), request, view=self)
 
-        # Return the JSON response
-        return Response(serializer.data)
+        # converts the page of companies to JSON
+        data = projection.serialize(page, request)
+
+        # Return the JSON response with links to the next and previous pages
+        return paginator.get_paginated_response(data)
+
+
+    # Handles GET companies/autocomplete
+    @action(detail=False)
+    def autocomplete(self, request):
+        """Handle GET requests for the companies whose names start with a prefix
+
+        Fetch call to get the first companies, in name order, whose names
+        start with a prefix:
+            http://localhost:8000/companies/autocomplete?q=${prefix}
+            http://localhost:8000/companies/autocomplete?q=${prefix}&limit=${number}
+
+        Returns:
+            Response -- JSON serialized list of companies
+        """
+
+        try:
+            limit = int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            limit = AUTOCOMPLETE_LIMIT
+        limit = max(1, min(limit, MAX_AUTOCOMPLETE_LIMIT))
+
+        matches = company_names.complete(request.query_params.get('q', ''), limit)
+
+        return Response(company_projection.serialize(
+            [{'id': company_id, 'name': name} for company_id, name in matches],
+            request
+        ))
 
 
     # Handles POST
     def create(self, request):
         """Handle POST for Company
 
-        Fetch call to post company:
+        Fetch call to post company, which returns the existing company if
+        one already has the same name:
             http://localhost:8000/companies
 
         Returns:
             Response -- JSON serialized Company instance
         """
 
-        new_company = Company.objects.create(
-            # all company names will be saved lowercase
-            name=request.data["name"].lower(),
-        )  
+        # all company names are saved normalized and unique, so posting a
+        # name twice, even at the same time, returns the same company
+        company, created = Company.objects.get_or_create(
+            name=normalize_company_name(request.data["name"])
+        )
 
         serializer = CompanySerializer(
-            new_company,
+            company,
             context={'request': request}
         )
 
@@ -0,0 +1,94 @@
+"""View module for handling requests about a candidate's dashboard
+
+    The dashboard bundles everything the client's home page shows into one
+    cached response, instead of three separate calls to /jobs, /events and
+    /questions. Each list holds at most DASHBOARD_LIMIT items, and says if
+    there are more to page through at its own endpoint.
+
+    Which events are upcoming changes as time passes, not only when the
+    candidate's rows change, so the cached dashboard is also rebuilt every
+    UPCOMING_REFRESH seconds.
+"""
+import time
+from django.utils import timezone
+from rest_framework.viewsets import ViewSet
+from rest_framework.response import Response
+from appstationapp.caching import DASHBOARD_CACHE, cached_response, dashboard_namespace
+from appstationapp.models import Event, Job, Question
+from .events import event_projection
+from .jobs import job_projection
+from .questions import question_projection
+
+
+# most jobs, upcoming events and questions a dashboard lists
+DASHBOARD_LIMIT = 20
+
+# seconds an event that has ended may still be listed as upcoming
+UPCOMING_REFRESH = 60
+
+
+def first(projection, queryset, request):
+    """Returns the first DASHBOARD_LIMIT rows of queryset, serialized, and
+    whether there are more
+    """
+
+    rows = list(projection.values(queryset)[:DASHBOARD_LIMIT + 1])
+    return projection.serialize(rows[:DASHBOARD_LIMIT], request), len(rows) > DASHBOARD_LIMIT
+
+
+class Dashboard(ViewSet):
+    """Dashboard for Application Station API"""
+
+    # Handles GET all
+    def list(self, request):
+        """Handle GET requests to Dashboard
+
+        Fetch call to get the logged in candidate's dashboard:
+            http://localhost:8000/dashboard
+
+        Returns:
+            Response -- JSON serialized jobs, upcoming events and questions,
+            or 304 status code
+        """
+
+        # serve the dashboard from the cache until the candidate's jobs,
+        # events or questions change
+        candidate_id = request.auth.user.candidate.id
+
+        return cached_response(
+            request,
+            dashboard_namespace(candidate_id),
+            lambda: self.build_dashboard(request, candidate_id),
+            using=DASHBOARD_CACHE,
+            variant=int(time.time() // UPCOMING_REFRESH)
+        )
+
+
+    def build_dashboard(self, request, candidate_id):
+        """Builds the dashboard of a candidate when it isn't cached yet
+
+        Returns:
+            Response -- JSON serialized newest jobs, next upcoming events and
+            newest questions
+        """
+
+        jobs = Job.objects.for_candidate(candidate_id).order_by('-id')
+        events = Event.objects.for_candidate(candidate_id).filter(
+            end_time__gte=timezone.now()
+        ).order_by('start_time', 'id')
+        questions = Question.objects.for_candidate(candidate_id).order_by('-id')
+
+        jobs, more_jobs = first(job_projection, jobs, request)
+        events, more_events = first(event_projection, events, request)
+        questions, more_questions = first(question_projection, questions, request)
+
+        return Response({
+            'jobs': jobs,
+            'upcoming_events': events,
+            'questions': questions,
+            'more': {
+                'jobs': more_jobs,
+                'upcoming_events': more_events,
+                'questions': more_questions,
+            }
+        })
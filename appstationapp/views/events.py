@@ -1,11 +1,27 @@
 """View module for handling requests about Events"""
-from django.http import HttpResponseServerError
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, HttpResponseServerError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import serializers, status
-from appstationapp.models import Event, Job
-
-class EventSerializer(serializers.HyperlinkedModelSerializer):
+from appstationapp.authentication import CachedTokenAuthentication, QueryTokenAuthentication
+from appstationapp.bulk import (BulkItemError, build_instances, bulk_response,
+    existing_ids, item_id, item_ids, require_id, save_in_bulk, to_python)
+from appstationapp.caching import not_modified
+from appstationapp.ical import calendar_feed
+from appstationapp.intervals import overlapping_pairs
+from appstationapp.models import Event, Job, clean_event_times
+from appstationapp.fieldsets import SparseFieldsMixin, requested_fields
+from appstationapp.metrics import TimedSerializerMixin
+from appstationapp.pagination import ModelCursorPagination
+from appstationapp.projections import Projection
+
+class EventSerializer(TimedSerializerMixin, SparseFieldsMixin,
+    serializers.HyperlinkedModelSerializer):
     """JSON serializer for Events
 
     Arugments:
@@ -20,11 +36,130 @@ class EventSerializer(serializers.HyperlinkedModelSerializer):
             lookup_field='id'
         )
         fields = ('id', 'url', 'details', 'start_time', 'end_time', 'job_id')
+        # fields of ?view=summary
+        summary_fields = ('id', 'details', 'start_time')
+
+
+# Read only projection of EventSerializer, used to list events
+event_projection = Projection('event-detail', EventSerializer.Meta.fields)
+
+
+def parse_time(name, value):
+    """Returns the aware datetime of an ISO 8601 query param
+
+    Raises:
+        ValueError -- if value isn't a date and time
+    """
+
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+
+    if parsed is None:
+        raise ValueError(f'{name} must be an ISO 8601 date and time')
+
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+
+    return parsed
+
+
+def event_times(data):
+    """Returns the start and end aware datetimes of the event in request data
+
+    Raises:
+        ValidationError -- if either isn't a date and time, or the event
+        doesn't end after it starts
+    """
+
+    return clean_event_times(
+        Event._meta.get_field('start_time').to_python(data["start_time"]),
+        Event._meta.get_field('end_time').to_python(data["end_time"])
+    )
+
+
+def bulk_conflicts(candidate_id, events):
+    """Checks the events of a bulk request against the candidate's other
+    events and against each other
+
+    The other events are read with one query over the time range of the
+    whole request, and compared to the request's events in one sweep.
+    When two events of the request overlap, the one that starts later is
+    rejected.
+
+    Arguments:
+        events -- dict of item index to unsaved Event
+
+    Returns:
+        dict -- item index to error message, for each event that overlaps
+    """
+
+    if not events:
+        return {}
+
+    saved = (
+        Event.objects.for_candidate(candidate_id)
+        .overlapping(
+            min(event.start_time for event in events.values()),
+            max(event.end_time for event in events.values())
+        )
+        # the events being moved are compared at their new times
+        .exclude(pk__in=[event.pk for event in events.values() if event.pk is not None])
+        .values_list('start_time', 'end_time', 'id')
+    )
+
+    pairs = overlapping_pairs(
+        [(start, end, ('event', event_id)) for start, end, event_id in saved]
+        + [(event.start_time, event.end_time, ('item', index)) for index, event in events.items()]
+    )
+
+    errors = {}
+    for (first_kind, first), (second_kind, second) in pairs:
+        if first_kind == 'event' or second_kind == 'event':
+            index, other = (second, first) if first_kind == 'event' else (first, second)
+            errors[index] = f'The event overlaps event {other}'
+
+    for (first_kind, first), (second_kind, second) in pairs:
+        if first_kind == 'item' and second_kind == 'item' and first not in errors:
+            errors.setdefault(second, f'The event overlaps item {first}')
+
+    force = 'Send the request again with ?force=true to save the events anyway'
+    return {index: f'{message}. {force}' for index, message in errors.items()}
 
 
 class Events(ViewSet):
     """Events for Application Station API"""
 
+    def conflict_response(self, request, candidate_id, start_time, end_time, event_id=None):
+        """Checks an event's new time against the candidate's other events
+
+        The check is skipped when the request has ?force=true
+
+        Returns:
+            Response -- 409 status code listing the overlapping events, or
+            None if there are none
+        """
+
+        if request.query_params.get('force') == 'true':
+            return None
+
+        conflicts = Event.objects.for_candidate(candidate_id).overlapping(start_time, end_time)
+        if event_id is not None:
+            conflicts = conflicts.exclude(pk=event_id)
+
+        rows = list(event_projection.values(conflicts))
+        if not rows:
+            return None
+
+        return Response(
+            {
+                'message': 'The event overlaps other events. Send it again with ?force=true to save it anyway',
+                'conflicts': event_projection.serialize(rows, request)
+            },
+            status=status.HTTP_409_CONFLICT
+        )
+
     # Handles POST
     def create(self, request):
         """Handle POST for Event
@@ -32,32 +167,49 @@ class Events(ViewSet):
         Fetch call to post event:
             http://localhost:8000/events
 
+        Fetch call to post event even if it overlaps other events:
+            http://localhost:8000/events?force=true
 
         Returns:
-            Response -- JSON serialized Question instance
+            Response -- JSON serialized Event instance, or 400, 404 or 409
+            status code
         """
 
         try:
             # filter by the logged in customer for job, so that only the 
             # user who owns the job can create an event for the job
             candidate_id = request.auth.user.candidate.id
-            job_candidate_id = Job.objects.get(pk=request.data["job_id"]).candidate.id
-
-            if candidate_id == job_candidate_id:
-                new_event = Event.objects.create(
-                    details=request.data["details"],
-                    start_time=request.data["start_time"],
-                    end_time=request.data["end_time"],
-                    job_id=request.data["job_id"]
-                )  
-
-                serializer = EventSerializer(
-                    new_event,
-                    context={'request': request}
-                )
-
-                return Response(serializer.data)
-                
+            job = Job.objects.for_candidate(candidate_id).get(pk=request.data["job_id"])
+
+            start_time, end_time = event_times(request.data)
+            conflict = self.conflict_response(request, candidate_id, start_time, end_time)
+            if conflict is not None:
+                return conflict
+
+            new_event = Event.objects.create(
+                details=request.data["details"],
+                start_time=start_time,
+                end_time=end_time,
+                job_id=job.id
+            )  
+
+            serializer = EventSerializer(
+                new_event,
+                context={'request': request}
+            )
+
+            return Response(serializer.data)
+
+        except Job.DoesNotExist as ex:
+            return Response(
+                {'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        except ValidationError as ex:
+            return Response(
+                {'message': ' '.join(ex.messages)}, status=status.HTTP_400_BAD_REQUEST
+            )
+
         except Exception as ex:
             return HttpResponseServerError(ex)
 
@@ -73,14 +225,23 @@ class Events(ViewSet):
             Response -- JSON serialized Event instance
         """
 
+        # the fields asked for with ?fields= or ?view=summary
+        fields = requested_fields(request, EventSerializer)
+
         try:
-            event = Event.objects.get(pk=pk)
+            # only find the event if it belongs to the logged in candidate,
+            # and only load the columns of the requested fields
             candidate_id = request.auth.user.candidate.id
+            events = event_projection.subset(fields).only(Event.objects.all())
+            event = events.for_candidate(candidate_id).get(pk=pk)
 
-            # filter by the logged in candidate
-            if event.job.candidate.id == candidate_id:
-                serializer = EventSerializer(event, context={'request': request})
-                return Response(serializer.data)
+            serializer = EventSerializer(event, fields=fields, context={'request': request})
+            return Response(serializer.data)
+
+        except Event.DoesNotExist as ex:
+            return Response(
+                {'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND
+            )
 
         except Exception as ex:
             return HttpResponseServerError(ex)
@@ -93,11 +254,22 @@ class Events(ViewSet):
         Fetch call to get all events:
             http://localhost:8000/events
 
+        Fetch call to get only some fields of all events, or their summary:
+            http://localhost:8000/events?fields=id,start_time,end_time
+            http://localhost:8000/events?view=summary
+
         Fetch call to get events based on job_id:
             http://localhost:8000/events?job_id=${job_id}
 
+        Fetch call to get the events in a time range (either end may be left
+        out, and both can be combined with job_id):
+            http://localhost:8000/events?start__gte=${start}&end__lte=${end}
+
+        Fetch call to get the next events that haven't ended yet:
+            http://localhost:8000/events?upcoming=${number}
+
         Returns:
-            Response -- JSON serialized list of events
+            Response -- JSON serialized page of events, or 400 status code
         """
 
         # list of job instances
@@ -105,22 +277,46 @@ class Events(ViewSet):
 
         # filter by the logged in candidate
         candidate_id = request.auth.user.candidate.id
-        events = events.filter(job__candidate_id=candidate_id)
+        events = events.for_candidate(candidate_id)
 
         # Get the job ID from the query params. If job_id filter events by job_id
         job_id = self.request.query_params.get('job_id', False)
         if job_id:
             events = events.filter(job__id=job_id)
 
-        # takes events and converts to JSON
-        serializer = EventSerializer(
-            events,
-            many=True,
-            context={'request': request}
-        )
+        paginator = ModelCursorPagination()
+
+        # time range filters, served by the (job, start_time) index
+        try:
+            start = self.request.query_params.get('start__gte')
+            if start:
+                events = events.filter(start_time__gte=parse_time('start__gte', start))
+
+            end = self.request.query_params.get('end__lte')
+            if end:
+                events = events.filter(end_time__lte=parse_time('end__lte', end))
+
+            # the first page holds the next upcoming events
+            upcoming = self.request.query_params.get('upcoming')
+            if upcoming:
+                if not upcoming.isdigit() or int(upcoming) < 1:
+                    raise ValueError('upcoming must be a positive number')
+
+                events = events.filter(end_time__gte=timezone.now())
+                paginator.page_size = min(int(upcoming), paginator.max_page_size)
 
-        # Return the JSON response
-        return Response(serializer.data)
+        except ValueError as ex:
+            return Response({'message': ex.args[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        # only fetch the columns and the page of events that were requested
+        projection = event_projection.subset(requested_fields(request, EventSerializer))
+        page = paginator.paginate_queryset(projection.values(events), request, view=self)
+
+        # converts the page of events to JSON
+        data = projection.serialize(page, request)
+
+        # Return the JSON response with links to the next and previous pages
+        return paginator.get_paginated_response(data)
 
     
     # Handles PUT
@@ -130,25 +326,53 @@ class Events(ViewSet):
         Fetch call to PUT one event by event id:
             http://localhost:8000/events/${id}
 
+        Fetch call to PUT one event even if it overlaps other events:
+            http://localhost:8000/events/${id}?force=true
+
         Returns:
-            Response -- Empty body with 204 status code
+            Response -- Empty body with 204 status code, or 400, 404 or 409
+            status code
         """
         try:
-            event = Event.objects.get(pk=pk)
+            # only find the event if it belongs to the logged in candidate
             candidate_id = request.auth.user.candidate.id
+            event = Event.objects.for_candidate(candidate_id).get(pk=pk)
 
-            # filter by the logged in candidate
-            if event.job.candidate.id == candidate_id:
+            # an event can only be moved to another job the candidate owns
+            if str(event.job_id) != str(request.data["job_id"]):
+                Job.objects.for_candidate(candidate_id).get(pk=request.data["job_id"])
 
-                # update event data
-                event.details = request.data["details"]
-                event.start_time = request.data["start_time"]
-                event.end_time = request.data["end_time"]
-                event.job_id = request.data["job_id"]
+            start_time, end_time = event_times(request.data)
+            conflict = self.conflict_response(
+                request, candidate_id, start_time, end_time, event_id=event.id
+            )
+            if conflict is not None:
+                return conflict
 
-                event.save()
+            # update event data
+            event.details = request.data["details"]
+            event.start_time = start_time
+            event.end_time = end_time
+            event.job_id = request.data["job_id"]
 
-                return Response({}, status=status.HTTP_204_NO_CONTENT)
+            event.save()
+
+            return Response({}, status=status.HTTP_204_NO_CONTENT)
+
+        except Event.DoesNotExist as ex:
+            return Response(
+                {'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        except Job.DoesNotExist as ex:
+            return Response(
+                {'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        except ValidationError as ex:
+            return Response(
+                {'message': ' '.join(ex.messages)}, status=status.HTTP_400_BAD_REQUEST
+            )
 
         except Exception as ex:
             return HttpResponseServerError(ex)
@@ -165,22 +389,152 @@ class Events(ViewSet):
             Response -- 204, 404, or 500 status code
         """
         try:
-            event = Event.objects.get(pk=pk)
+            # only find the event if the logged in user owns it
             candidate_id = request.auth.user.candidate.id
+            event = Event.objects.for_candidate(candidate_id).get(pk=pk)
+            event.delete()
 
-            # confirm that logged in user owns event being deleted
-            if event.job.candidate.id == candidate_id:
-                event.delete()
-
-                return Response({}, status=status.HTTP_204_NO_CONTENT)
+            return Response({}, status=status.HTTP_204_NO_CONTENT)
 
         except Event.DoesNotExist as ex:
             return Response(
-                {'message': ex.arg[0]}, status=status.HTTP_404_NOT_FOUND
+                {'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND
             )
 
         except Exception as ex:
-            return Response({'message': ex.arg[0]},
+            return Response({'message': ex.args[0]},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+
+    # Handles GET events/conflicts
+    @action(detail=False)
+    def conflicts(self, request):
+        """Handle GET requests for the candidate's events that overlap each other
+
+        Fetch call to get every pair of overlapping events:
+            http://localhost:8000/events/conflicts
+
+        Returns:
+            Response -- JSON serialized pairs of events, earlier start first
+        """
+
+        candidate_id = request.auth.user.candidate.id
+        rows = {
+            row['id']: row
+            for row in event_projection.values(Event.objects.for_candidate(candidate_id))
+        }
+
+        pairs = overlapping_pairs(
+            (row['start_time'], row['end_time'], event_id) for event_id, row in rows.items()
+        )
+
+        serialize = event_projection.serializer(request)
+        return Response([[serialize(rows[first]), serialize(rows[second])] for first, second in pairs])
+
+
+    # Handles GET events/calendar
+    @action(
+        detail=False,
+        authentication_classes=[CachedTokenAuthentication, QueryTokenAuthentication],
+        permission_classes=[IsAuthenticated]
+    )
+    def calendar(self, request):
+        """Handle GET requests for the iCalendar feed of the candidate's events
+
+        Fetch call to get the feed, with the token in the header:
+            http://localhost:8000/events/calendar
+
+        URL to subscribe to the feed from a calendar client:
+            http://localhost:8000/events/calendar?token=${token}
+
+        Returns:
+            HttpResponse -- text/calendar feed with an ETag header, or 304 status code
+        """
+
+        etag, content = calendar_feed(request.auth.user.candidate.id)
+
+        if not_modified(request, etag):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(content, content_type='text/calendar; charset=utf-8')
+
+        response['ETag'] = etag
+        return response
+
+
+    # Handles POST and PUT of many events at once
+    @action(detail=False, methods=['post', 'put'])
+    def bulk(self, request):
+        """Handle POST and PUT requests for many events in one transaction
+
+        Fetch call to post many events:
+            http://localhost:8000/events/bulk
+
+        Fetch call to PUT many events by event id:
+            http://localhost:8000/events/bulk
+
+        An event that overlaps another of the candidate's events, or an
+        earlier event of the same request, is not saved unless the request
+        has ?force=true:
+            http://localhost:8000/events/bulk?force=true
+
+        Returns:
+            Response -- JSON serialized Event instance, or error, for each event
+        """
+
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {'message': 'Expected a list of events'}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        candidate_id = request.auth.user.candidate.id
+
+        # check that the candidate owns every job the events use, in one query
+        job_ids = existing_ids(Job.objects.for_candidate(candidate_id), items, 'job_id')
+
+        # PUT only updates events owned by the logged in candidate
+        owned_events = {}
+        if request.method == 'PUT':
+            owned_events = Event.objects.for_candidate(candidate_id).in_bulk(
+                item_ids(items, 'id')
+            )
+
+        def build(item):
+            if request.method == 'PUT':
+                event = owned_events.get(item_id(item, 'id'))
+                if event is None:
+                    raise BulkItemError(f'event {item.get("id")} does not exist')
+            else:
+                event = Event()
+
+            event.details = to_python(Event, 'details', item["details"])
+            event.start_time, event.end_time = clean_event_times(
+                to_python(Event, 'start_time', item["start_time"]),
+                to_python(Event, 'end_time', item["end_time"])
+            )
+            event.job_id = require_id(item, 'job_id', job_ids)
+
+            return event
+
+        events, errors = build_instances(items, build)
+
+        if request.query_params.get('force') != 'true':
+            conflicts = bulk_conflicts(candidate_id, events)
+            for index in conflicts:
+                del events[index]
+            errors.update(conflicts)
+        save_in_bulk(
+            Event,
+            events.values(),
+            ['details', 'start_time', 'end_time', 'job']
+        )
+
+        serializer = EventSerializer(
+            list(events.values()),
+            many=True,
+            context={'request': request}
+        )
+
+        return bulk_response(len(items), dict(zip(events, serializer.data)), errors)
@@ -1,11 +1,24 @@
 """View module for handling requests about Jobs"""
-from django.http import HttpResponseServerError
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import Lead
+from django.http import HttpResponseServerError, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.decorators import action
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import serializers, status
-from appstationapp.models import Job
-
-class JobSerializer(serializers.HyperlinkedModelSerializer):
+from appstationapp.bulk import (BulkItemError, build_instances, bulk_response,
+    existing_ids, item_id, item_ids, require_id, save_in_bulk, to_python)
+from appstationapp.export import csv_lines, export_records, ndjson_lines
+from appstationapp.models import Company, Job, Status, StatusTransition
+from appstationapp.fieldsets import SparseFieldsMixin, requested_fields
+from appstationapp.metrics import TimedSerializerMixin
+from appstationapp.pagination import ModelCursorPagination
+from appstationapp.projections import Projection
+
+class JobSerializer(TimedSerializerMixin, SparseFieldsMixin,
+    serializers.HyperlinkedModelSerializer):
     """JSON serializer for Jobs
 
     Arugments:
@@ -20,10 +33,54 @@ class JobSerializer(serializers.HyperlinkedModelSerializer):
             lookup_field='id'
         )
         fields = ('id', 'url', 'title', 'description', 'link', 'candidate_id', 'status', 'company')
+        # fields of ?view=summary, for lists that only show titles
+        summary_fields = ('id', 'title')
 
         depth = 2
 
 
+# Read only projection of JobSerializer, used to list jobs. depth = 2 nests
+# the status and company with their default hyperlinked fields, which leave
+# out the id.
+job_projection = Projection('job-detail', JobSerializer.Meta.fields, nested={
+    'status': Projection('status-detail', ('url', 'status')),
+    'company': Projection('company-detail', ('url', 'name')),
+})
+
+
+def jobs_with_relations():
+    """Queryset of jobs that joins the relations JobSerializer nests
+
+    JobSerializer uses depth = 2, so every job serializes its status and
+    company. Selecting them in the same query keeps the number of queries
+    constant no matter how many jobs are serialized.
+
+    Returns:
+        QuerySet -- Job instances with status and company already loaded
+    """
+
+    return Job.objects.select_related('status', 'company')
+
+
+def status_transitions(jobs, previous_statuses):
+    """Returns a StatusTransition for each job whose status changed
+
+    Arguments:
+        jobs -- saved Job instances
+        previous_statuses -- each job's status id before it was saved, None
+            for new jobs
+    """
+
+    now = timezone.now()
+    return [
+        StatusTransition(
+            job_id=job.id, from_status_id=previous, to_status_id=job.status_id, changed_at=now
+        )
+        for job, previous in zip(jobs, previous_statuses)
+        if previous is None or str(previous) != str(job.status_id)
+    ]
+
+
 class Jobs(ViewSet):
     """Jobs for Application Station API"""
 
@@ -37,14 +94,18 @@ class Jobs(ViewSet):
         Returns:
             Response -- JSON serialized Question instance
         """
-        new_job = Job.objects.create(
-            title=request.data["title"],
-            description=request.data["description"],
-            link=request.data["link"],
-            candidate_id=request.auth.user.candidate.id,
-            status_id=request.data["status_id"],
-            company_id=request.data["company_id"]
-        )  
+
+        # the job and its first status transition are saved together
+        with transaction.atomic():
+            new_job = Job.objects.create(
+                title=request.data["title"],
+                description=request.data["description"],
+                link=request.data["link"],
+                candidate_id=request.auth.user.candidate.id,
+                status_id=request.data["status_id"],
+                company_id=request.data["company_id"]
+            )  
+            StatusTransition.objects.bulk_create(status_transitions([new_job], [None]))
 
         serializer = JobSerializer(
             new_job,
@@ -65,14 +126,23 @@ class Jobs(ViewSet):
             Response -- JSON serialized Job instance
         """
 
+        # the fields asked for with ?fields= or ?view=summary
+        fields = requested_fields(request, JobSerializer)
+
         try:
-            job = Job.objects.get(pk=pk)
+            # only find the job if it belongs to the logged in candidate, and
+            # only load the columns of the requested fields
             candidate_id = request.auth.user.candidate.id
+            jobs = job_projection.subset(fields).only(jobs_with_relations())
+            job = jobs.for_candidate(candidate_id).get(pk=pk)
+
+            serializer = JobSerializer(job, fields=fields, context={'request': request})
+            return Response(serializer.data)
 
-            # filter by the logged in candidate
-            if job.candidate.id == candidate_id:
-                serializer = JobSerializer(job, context={'request': request})
-                return Response(serializer.data)
+        except Job.DoesNotExist as ex:
+            return Response(
+                {'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND
+            )
 
         except Exception as ex:
             return HttpResponseServerError(ex)
@@ -85,26 +155,31 @@ class Jobs(ViewSet):
         Fetch call to get all jobs:
             http://localhost:8000/jobs
 
+        Fetch call to get only some fields of all jobs, or their summary:
+            http://localhost:8000/jobs?fields=id,title,status
+            http://localhost:8000/jobs?view=summary
+
         Returns:
-            Response -- JSON serialized list of jobs
+            Response -- JSON serialized page of jobs
         """
 
-        # list of job instances
-        jobs = Job.objects.all()
+        # list of job instances, joined with their status and company
+        jobs = jobs_with_relations()
 
         # filter by the logged in candidate
         candidate_id = request.auth.user.candidate.id
-        jobs = jobs.filter(candidate__id=candidate_id)
+        jobs = jobs.for_candidate(candidate_id)
 
-        # takes jobs and converts to JSON
-        serializer = JobSerializer(
-            jobs,
-            many=True,
-            context={'request': request}
-        )
+        # only fetch the columns and the page of jobs that were requested
+        projection = job_projection.subset(requested_fields(request, JobSerializer))
+        paginator = ModelCursorPagination()
+        page = paginator.paginate_queryset(projection.values(jobs), request, view=self)
 
-        # Return the JSON response
-        return Response(serializer.data)
+        # converts the page of jobs to JSON
+        data = projection.serialize(page, request)
+
+        # Return the JSON response with links to the next and previous pages
+        return paginator.get_paginated_response(data)
 
     
     # Handles PUT
@@ -115,14 +190,19 @@ class Jobs(ViewSet):
             http://localhost:8000/jobs/${id}
 
         Returns:
-            Response -- Empty body with 204 status code
+            Response -- Empty body with 204 status code, or 404 status code
         """
         try:
-            job = Job.objects.get(pk=pk)
             candidate_id = request.auth.user.candidate.id
 
-            # filter by the logged in candidate
-            if job.candidate.id == candidate_id:
+            # a change of status is logged in the same transaction, from the
+            # status the locked row has, so concurrent updates can't log the
+            # same change twice or miss one
+            with transaction.atomic():
+                # only find the job if it belongs to the logged in candidate
+                job = Job.objects.for_candidate(candidate_id).select_for_update().get(pk=pk)
+
+                previous_status = job.status_id
 
                 # update job data
                 job.title = request.data["title"]
@@ -132,8 +212,16 @@ class Jobs(ViewSet):
                 job.company_id = request.data["company_id"]
 
                 job.save()
+                StatusTransition.objects.bulk_create(
+                    status_transitions([job], [previous_status])
+                )
+
+            return Response({}, status=status.HTTP_204_NO_CONTENT)
 
-                return Response({}, status=status.HTTP_204_NO_CONTENT)
+        except Job.DoesNotExist as ex:
+            return Response(
+                {'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND
+            )
 
         except Exception as ex:
             return HttpResponseServerError(ex)
@@ -150,22 +238,215 @@ class Jobs(ViewSet):
             Response -- 204, 404, or 500 status code
         """
         try:
-            job = Job.objects.get(pk=pk)
+            # only find the job if the logged in user owns it
             candidate_id = request.auth.user.candidate.id
+            job = Job.objects.for_candidate(candidate_id).get(pk=pk)
+            job.delete()
 
-            # confirm that logged in user owns job being deleted
-            if job.candidate.id == candidate_id:
-                job.delete()
-
-                return Response({}, status=status.HTTP_204_NO_CONTENT)
+            return Response({}, status=status.HTTP_204_NO_CONTENT)
 
         except Job.DoesNotExist as ex:
             return Response(
-                {'message': ex.arg[0]}, status=status.HTTP_404_NOT_FOUND
+                {'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND
             )
 
         except Exception as ex:
-            return Response({'message': ex.arg[0]},
+            return Response({'message': ex.args[0]},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+
+    # Handles POST and PUT of many jobs at once
+    @action(detail=False, methods=['post', 'put'])
+    def bulk(self, request):
+        """Handle POST and PUT requests for many jobs in one transaction
+
+        Fetch call to post many jobs:
+            http://localhost:8000/jobs/bulk
+
+        Fetch call to PUT many jobs by job id:
+            http://localhost:8000/jobs/bulk
+
+        Returns:
+            Response -- JSON serialized Job instance, or error, for each job
+        """
+
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {'message': 'Expected a list of jobs'}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        candidate_id = request.auth.user.candidate.id
+
+        # look up every status and company the jobs use, one query each
+        status_ids = existing_ids(Status.objects, items, 'status_id')
+        company_ids = existing_ids(Company.objects, items, 'company_id')
+
+        # PUT only updates jobs owned by the logged in candidate
+        owned_jobs = {}
+        if request.method == 'PUT':
+            owned_jobs = Job.objects.for_candidate(candidate_id).in_bulk(
+                item_ids(items, 'id')
+            )
+
+        def build(item):
+            if request.method == 'PUT':
+                job = owned_jobs.get(item_id(item, 'id'))
+                if job is None:
+                    raise BulkItemError(f'job {item.get("id")} does not exist')
+            else:
+                job = Job(candidate_id=candidate_id)
+
+            job.title = to_python(Job, 'title', item["title"])
+            job.description = to_python(Job, 'description', item["description"])
+            job.link = to_python(Job, 'link', item["link"])
+            job.status_id = require_id(item, 'status_id', status_ids)
+            job.company_id = require_id(item, 'company_id', company_ids)
+
+            return job
+
+        jobs, errors = build_instances(items, build)
+        created = [job.pk is None for job in jobs.values()]
+
+        # the jobs and their status transitions are saved together
+        with transaction.atomic():
+            save_in_bulk(
+                Job,
+                jobs.values(),
+                ['title', 'description', 'link', 'status', 'company']
+            )
+
+            # the status each job had before the save, from the row
+            # save_in_bulk read again and locked. None for new jobs
+            previous_statuses = [
+                None if new else job._loaded_values.get('status_id')
+                for job, new in zip(jobs.values(), created)
+            ]
+            StatusTransition.objects.bulk_create(
+                status_transitions(jobs.values(), previous_statuses)
+            )
+
+        # reload the saved jobs with their status and company in one query
+        saved = jobs_with_relations().in_bulk([job.id for job in jobs.values()])
+        serializer = JobSerializer(
+            [saved[job.id] for job in jobs.values()],
+            many=True,
+            context={'request': request}
+        )
+
+        return bulk_response(len(items), dict(zip(jobs, serializer.data)), errors)
+
+
+    # Handles GET of one job's status transitions ( example: jobs/3/history )
+    @action(detail=True)
+    def history(self, request, pk=None):
+        """Handle GET requests for the status transitions of a job
+
+        Fetch call to get every status a job has moved to, oldest first:
+            http://localhost:8000/jobs/${id}/history
+
+        Returns:
+            Response -- JSON serialized transitions, or 404 status code
+        """
+
+        candidate_id = request.auth.user.candidate.id
+        if not Job.objects.for_candidate(candidate_id).filter(pk=pk).exists():
+            return Response(
+                {'message': 'Job matching query does not exist.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        transitions = StatusTransition.objects.filter(job_id=pk).values(
+            'from_status_id', 'to_status_id', 'changed_at'
+        )
+        changed_at = serializers.DateTimeField()
+
+        return Response([
+            {
+                'from_status_id': transition['from_status_id'],
+                'to_status_id': transition['to_status_id'],
+                'changed_at': changed_at.to_representation(transition['changed_at'])
+            }
+            for transition in transitions
+        ])
+
+
+    # Handles GET of the time spent in each status ( example: jobs/stages )
+    @action(detail=False)
+    def stages(self, request):
+        """Handle GET requests for the time the candidate's jobs spent in each status
+
+        Fetch call to get, for each status, how many times a job entered it
+        and the average number of seconds it stayed:
+            http://localhost:8000/jobs/stages
+
+        Returns:
+            Response -- JSON serialized time in stage for each status
+        """
+
+        candidate_id = request.auth.user.candidate.id
+        now = timezone.now()
+
+        # one query: each transition with the time of the job's next one,
+        # when the job left the status it moved to
+        transitions = (
+            StatusTransition.objects.filter(job__candidate_id=candidate_id)
+            .annotate(left_at=Window(
+                expression=Lead('changed_at'),
+                partition_by=[F('job_id')],
+                order_by=F('changed_at').asc()
+            ))
+            .values_list('to_status_id', 'changed_at', 'left_at')
+        )
+
+        stages = {}
+        for status_id, changed_at, left_at in transitions:
+            stage = stages.setdefault(status_id, {'entered': 0, 'current': 0, 'seconds': 0.0})
+            stage['entered'] += 1
+            stage['current'] += left_at is None
+            stage['seconds'] += ((left_at or now) - changed_at).total_seconds()
+
+        names = Status.objects.in_bulk(list(stages))
+
+        return Response([
+            {
+                'status_id': status_id,
+                'status': names[status_id].status if status_id in names else None,
+                'entered': stage['entered'],
+                'current': stage['current'],
+                'average_seconds': stage['seconds'] / stage['entered']
+            }
+            for status_id, stage in sorted(stages.items())
+        ])
+
+
+    # Handles GET of the whole application history ( example: jobs/export )
+    @action(detail=False)
+    def export(self, request):
+        """Handle GET requests to export every job, event and question
+
+        Fetch call to export as newline delimited JSON:
+            http://localhost:8000/jobs/export
+
+        Fetch call to export as CSV:
+            http://localhost:8000/jobs/export?output=csv
+
+        Returns:
+            StreamingHttpResponse -- one line per job, with its events, and per question
+        """
+
+        candidate_id = request.auth.user.candidate.id
+        records = export_records(candidate_id)
+
+        # the export is streamed while it is read from the database
+        if request.query_params.get('output') == 'csv':
+            response = StreamingHttpResponse(csv_lines(records), content_type='text/csv')
+            response['Content-Disposition'] = 'attachment; filename="applications.csv"'
+        else:
+            response = StreamingHttpResponse(
+                ndjson_lines(records), content_type='application/x-ndjson'
+            )
+            response['Content-Disposition'] = 'attachment; filename="applications.ndjson"'
+
+        return response
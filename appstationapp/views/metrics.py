@@ -0,0 +1,45 @@
+"""View module for serving the performance metrics of the API"""
+from django.http import HttpResponse, HttpResponseNotFound
+from rest_framework.exceptions import AuthenticationFailed
+from appstationapp.authentication import CachedTokenAuthentication
+from appstationapp.hashing import hashing_pool
+from appstationapp.metrics import metrics, metrics_settings
+from appstationapp.renderers import json_dumps
+
+
+def metrics_view(request):
+    '''Handles GET requests for the metrics collected by MetricsMiddleware
+
+    Only answers staff users, from an address in METRICS['ALLOWED_IPS'],
+    the local machine by default, and only while metrics are enabled.
+    Everyone else gets a 404.
+
+    Fetch call to get the metrics of every route, with a staff user's
+    token in the header (GET)
+        http://localhost:8000/metrics
+
+    Arguments:
+        Request -- the full HTTP request object
+
+    Returns:
+        HttpResponse -- JSON of each route's metrics and the hashing pool's stats
+    '''
+
+    allowed_ips = metrics_settings.get('ALLOWED_IPS', ['127.0.0.1', '::1'])
+    if not metrics_settings.get('ENABLED', False) or request.META.get('REMOTE_ADDR') not in allowed_ips:
+        return HttpResponseNotFound()
+
+    try:
+        credentials = CachedTokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        credentials = None
+
+    if credentials is None or not credentials[0].is_staff:
+        return HttpResponseNotFound()
+
+    data = json_dumps({
+        'since': metrics.started,
+        'routes': metrics.snapshot(),
+        'hashing_pool': hashing_pool.stats(),
+    })
+    return HttpResponse(data, content_type='application/json')
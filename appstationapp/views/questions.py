@@ -1,11 +1,19 @@
 """View module for handling requests about Questions"""
 from django.http import HttpResponseServerError
+from rest_framework.decorators import action
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import serializers, status
+from appstationapp.bulk import (BulkItemError, build_instances, bulk_response,
+    item_id, item_ids, save_in_bulk, to_python)
 from appstationapp.models import Question
+from appstationapp.fieldsets import SparseFieldsMixin, requested_fields
+from appstationapp.metrics import TimedSerializerMixin
+from appstationapp.pagination import ModelCursorPagination
+from appstationapp.projections import Projection
 
-class QuestionSerializer(serializers.HyperlinkedModelSerializer):
+class QuestionSerializer(TimedSerializerMixin, SparseFieldsMixin,
+    serializers.HyperlinkedModelSerializer):
     """JSON serializer for questions
 
     Arugments:
@@ -20,6 +28,12 @@ class QuestionSerializer(serializers.HyperlinkedModelSerializer):
             lookup_field='id'
         )
         fields = ('id', 'url', 'question', 'is_from_interviewer', 'answer', 'candidate_id')
+        # fields of ?view=summary, the questions without their answers
+        summary_fields = ('id', 'question', 'is_from_interviewer')
+
+
+# Read only projection of QuestionSerializer, used to list questions
+question_projection = Projection('question-detail', QuestionSerializer.Meta.fields)
 
 
 class Questions(ViewSet):
@@ -60,14 +74,23 @@ class Questions(ViewSet):
             Response -- JSON serialized Question instance
         """
 
+        # the fields asked for with ?fields= or ?view=summary
+        fields = requested_fields(request, QuestionSerializer)
+
         try:
-            question = Question.objects.get(pk=pk)
+            # only find the question if it belongs to the logged in candidate,
+            # and only load the columns of the requested fields
             candidate_id = request.auth.user.candidate.id
+            questions = question_projection.subset(fields).only(Question.objects.all())
+            question = questions.for_candidate(candidate_id).get(pk=pk)
 
-            # filter by the logged in candidate
-            if question.candidate.id == candidate_id:
-                serializer = QuestionSerializer(question, context={'request': request})
-                return Response(serializer.data)
+            serializer = QuestionSerializer(question, fields=fields, context={'request': request})
+            return Response(serializer.data)
+
+        except Question.DoesNotExist as ex:
+            return Response(
+                {'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND
+            )
 
         except Exception as ex:
             return HttpResponseServerError(ex)
@@ -80,8 +103,12 @@ class Questions(ViewSet):
         Fetch call to get all questions:
             http://localhost:8000/questions
 
+        Fetch call to get only some fields of all questions, or their summary:
+            http://localhost:8000/questions?fields=id,question
+            http://localhost:8000/questions?view=summary
+
         Returns:
-            Response -- JSON serialized list of questions
+            Response -- JSON serialized page of questions
         """
 
         # list of question instances
@@ -89,17 +116,18 @@ class Questions(ViewSet):
 
         # filter by the logged in candidate
         candidate_id = request.auth.user.candidate.id
-        questions = questions.filter(candidate__id=candidate_id)
+        questions = questions.for_candidate(candidate_id)
 
-        # takes questions and converts to JSON
-        serializer = QuestionSerializer(
-            questions,
-            many=True,
-            context={'request': request}
-        )
+        # only fetch the columns and the page of questions that were requested
+        projection = question_projection.subset(requested_fields(request, QuestionSerializer))
+        paginator = ModelCursorPagination()
+        page = paginator.paginate_queryset(projection.values(questions), request, view=self)
 
-        # Return the JSON response
-        return Response(serializer.data)
+        # converts the page of questions to JSON
+        data = projection.serialize(page, request)
+
+        # Return the JSON response with links to the next and previous pages
+        return paginator.get_paginated_response(data)
 
     
     # Handles PUT
@@ -113,28 +141,31 @@ class Questions(ViewSet):
             http://localhost:8000/questions/${id}?answer=true
 
         Returns:
-            Response -- Empty body with 204 status code
+            Response -- Empty body with 204 status code, or 404 status code
         """
         try:
-            question = Question.objects.get(pk=pk)
+            # only find the question if it belongs to the logged in candidate
             candidate_id = request.auth.user.candidate.id
+            question = Question.objects.for_candidate(candidate_id).get(pk=pk)
 
-            # filter by the logged in candidate
-            if question.candidate.id == candidate_id:
+            # check to see if this is an update on an answer to a question
+            is_answer = request.query_params.get('answer', False)
 
-                # check to see if this is an update on an answer to a question
-                is_answer = request.query_params.get('answer', False)
+            if is_answer:
+                question.answer = request.data["answer"]
+            else:
+                # need to update question, need to update is from interviewer
+                question.question = request.data["question"]
+                question.is_from_interviewer = request.data["is_from_interviewer"]
 
-                if is_answer:
-                    question.answer = request.data["answer"]
-                else:
-                    # need to update question, need to update is from interviewer
-                    question.question = request.data["question"]
-                    question.is_from_interviewer = request.data["is_from_interviewer"]
+            question.save()
 
-                question.save()
+            return Response({}, status=status.HTTP_204_NO_CONTENT)
 
-                return Response({}, status=status.HTTP_204_NO_CONTENT)
+        except Question.DoesNotExist as ex:
+            return Response(
+                {'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND
+            )
 
         except Exception as ex:
             return HttpResponseServerError(ex)
@@ -151,22 +182,81 @@ class Questions(ViewSet):
             Response -- 204, 404, or 500 status code
         """
         try:
-            question = Question.objects.get(pk=pk)
+            # only find the question if the logged in user owns it
             candidate_id = request.auth.user.candidate.id
+            question = Question.objects.for_candidate(candidate_id).get(pk=pk)
+            question.delete()
 
-            # confirm logged in user owns the question being deleted
-            if question.candidate.id == candidate_id:
-                question.delete()
-
-                return Response({}, status=status.HTTP_204_NO_CONTENT)
+            return Response({}, status=status.HTTP_204_NO_CONTENT)
 
         except Question.DoesNotExist as ex:
             return Response(
-                {'message': ex.arg[0]}, status=status.HTTP_404_NOT_FOUND
+                {'message': ex.args[0]}, status=status.HTTP_404_NOT_FOUND
             )
 
         except Exception as ex:
-            return Response({'message': ex.arg[0]},
+            return Response({'message': ex.args[0]},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+
+    # Handles POST and PUT of many questions at once
+    @action(detail=False, methods=['post', 'put'])
+    def bulk(self, request):
+        """Handle POST and PUT requests for many questions in one transaction
+
+        Fetch call to post many questions:
+            http://localhost:8000/questions/bulk
+
+        Fetch call to PUT many questions, and their answers, by question id:
+            http://localhost:8000/questions/bulk
+
+        Returns:
+            Response -- JSON serialized Question instance, or error, for each question
+        """
+
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {'message': 'Expected a list of questions'}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        candidate_id = request.auth.user.candidate.id
+
+        # PUT only updates questions owned by the logged in candidate
+        owned_questions = {}
+        if request.method == 'PUT':
+            owned_questions = Question.objects.for_candidate(candidate_id).in_bulk(
+                item_ids(items, 'id')
+            )
+
+        def build(item):
+            if request.method == 'PUT':
+                question = owned_questions.get(item_id(item, 'id'))
+                if question is None:
+                    raise BulkItemError(f'question {item.get("id")} does not exist')
+            else:
+                question = Question(candidate_id=candidate_id)
+
+            question.question = to_python(Question, 'question', item["question"])
+            question.is_from_interviewer = to_python(
+                Question, 'is_from_interviewer', item["is_from_interviewer"]
+            )
+            question.answer = to_python(Question, 'answer', item.get("answer", question.answer))
+
+            return question
+
+        questions, errors = build_instances(items, build)
+        save_in_bulk(
+            Question,
+            questions.values(),
+            ['question', 'is_from_interviewer', 'answer']
+        )
+
+        serializer = QuestionSerializer(
+            list(questions.values()),
+            many=True,
+            context={'request': request}
+        )
+
+        return bulk_response(len(items), dict(zip(questions, serializer.data)), errors)
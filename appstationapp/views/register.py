@@ -1,11 +1,41 @@
 """View module for handling Login and Register"""
-import json
 from django.http import HttpResponse, HttpResponseServerError
 from django.contrib.auth import login, authenticate
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
 from django.views.decorators.csrf import csrf_exempt
-from appstationapp.models import Candidate
+from django.views.decorators.http import require_POST
+from appstationapp.authentication import CachedTokenAuthentication
+from appstationapp.hashing import PoolSaturated, hashing_pool
+from appstationapp.registration import new_user, register
+from appstationapp.renderers import json_dumps, json_loads
+
+
+def busy_response():
+    """Returns the 503 response for a login or registration the hashing pool has no room for"""
+
+    data = json_dumps({'valid': False, 'message': 'Too many logins at once, try again shortly'})
+    response = HttpResponse(data, content_type='application/json', status=503)
+    response['Retry-After'] = '1'
+    return response
+
+
+def authenticate_user(request, username, password):
+    """Returns the active user with username and password, or None
+
+    Runs Django's authenticate, with the configured AUTHENTICATION_BACKENDS
+    and the user_login_failed signal, on hashing_pool. ModelBackend hashes
+    the password of an unknown username too, so it takes as long as a
+    wrong password.
+
+    Raises:
+        PoolSaturated -- if the hashing pool has no room for the password
+    """
+
+    return hashing_pool.run(authenticate, request, username=username, password=password)
 
 
 @csrf_exempt
@@ -20,25 +50,28 @@ def login_user(request):
     '''
 
     # Load the JSON string of the request body into a dictionary
-    req_body = json.loads(request.body.decode())
+    req_body = json_loads(request.body)
 
     # If the request is HTTP POST, try to pull out the relevent information
     if request.method == 'POST':
 
-        # Use the built-in authenticate method to verify
+        # Verify the password, with the hashing on the hashing pool
         username = req_body['username']
         password = req_body['password']
-        authenticated_user = authenticate(username=username, password=password)
+        try:
+            authenticated_user = authenticate_user(request, username, password)
+        except PoolSaturated:
+            return busy_response()
 
         # If authentication was successful, respond with their token
         if authenticated_user is not None:
             token = Token.objects.get(user=authenticated_user)
-            data = json.dumps({"valid": True, "token": token.key})
+            data = json_dumps({"valid": True, "token": token.key})
             return HttpResponse(data, content_type='application/json')
 
         else:
             # Bad login details were provided, so we can't log in the user
-            data = json.dumps({'valid': False})
+            data = json_dumps({'valid': False})
             return HttpResponse(data, content_type="application/json")
 
 
@@ -57,37 +90,56 @@ def register_user(request):
     '''
 
     # Load the JSON string of the request body into a dictionary
-    req_body = json.loads(request.body.decode())
+    req_body = json_loads(request.body)
 
     try:
-        # Create a new user by invoking the 'create_user' helper method
-        # 'create_user' is built in to Django's User model
-        new_user = User.objects.create_user(
-            username=req_body['email'],
-            email=req_body['email'],
-            password=req_body['password'],
-            first_name=req_body['first_name'],
-            last_name=req_body['last_name'],
-            is_active=True
+        # Hash the password on the hashing pool, then save the new user,
+        # their Candidate and their Token in one transaction
+        password = hashing_pool.run(make_password, req_body['password'])
+        user = new_user(
+            req_body['email'], password, req_body['first_name'], req_body['last_name']
         )
+        token = register(user)
 
-        # Now, create a Candidate where the user = new_user created above
-        new_candidate = Candidate.objects.create(
-            user=new_user
-        )
+        # Return the token to the client
+        data = json_dumps({"token": token.key})
+        return HttpResponse(data, content_type='application/json')
 
-        # Use the REST Framework's token generator on the new user account
-        token = Token.objects.create(user=new_user)
+    except PoolSaturated:
+        return busy_response()
 
+    except (KeyError, IntegrityError):
+        # A field is missing or the email is already registered
+        data = json_dumps({'valid': False})
+        return HttpResponse(data, content_type="application/json")
 
-        # Return the token to the client
-        data = json.dumps({"token": token.key})
-        return HttpResponse(data, content_type='application/json')
-    
-    except Exception:
-            data = json.dumps({'valid': False})
-            return HttpResponse(data, content_type="application/json")
 
+@csrf_exempt
+@require_POST
+def logout_user(request):
+    '''Handles logging out a user by rotating their token
+
+    Fetch call to logout the user whose token is in the header (POST)
+        http://localhost:8000/logout
 
+    Arguments:
+        Request -- the full HTTP request object
+    '''
 
-    
\ No newline at end of file
+    try:
+        credentials = CachedTokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        credentials = None
+
+    if credentials is None:
+        data = json_dumps({'valid': False})
+        return HttpResponse(data, content_type='application/json', status=401)
+
+    # Replace the token, so the old one stops working
+    user, token = credentials
+    with transaction.atomic():
+        token.delete()
+        Token.objects.create(user=user)
+
+    data = json_dumps({'valid': True})
+    return HttpResponse(data, content_type='application/json')
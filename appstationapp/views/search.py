@@ -0,0 +1,51 @@
+"""View module for handling full-text searches of a candidate's jobs and questions"""
+from django.urls import reverse
+from rest_framework.viewsets import ViewSet
+from rest_framework.response import Response
+from appstationapp.search import search_index
+
+# view name of the detail endpoint of each kind of result
+DETAIL_VIEWS = {'job': 'job-detail', 'question': 'question-detail'}
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class Search(ViewSet):
+    """Search for Application Station API"""
+
+    # Handles GET all
+    def list(self, request):
+        """Handle GET requests to Search
+
+        Fetch call to search the logged in candidate's jobs (title and
+        description) and questions (question and answer):
+            http://localhost:8000/search?q=${words}
+            http://localhost:8000/search?q=${words}&limit=${number}
+
+        Returns:
+            Response -- JSON serialized results, best match first
+        """
+
+        try:
+            limit = min(int(request.query_params.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            limit = DEFAULT_LIMIT
+
+        candidate_id = request.auth.user.candidate.id
+        results = search_index.search(
+            candidate_id, request.query_params.get('q', ''), max(limit, 1)
+        )
+
+        return Response([
+            {
+                'kind': kind,
+                'id': object_id,
+                'url': request.build_absolute_uri(
+                    reverse(DETAIL_VIEWS[kind], kwargs={'pk': object_id})
+                ),
+                'title': title,
+                'snippet': snippet
+            }
+            for kind, object_id, title, snippet in results
+        ])
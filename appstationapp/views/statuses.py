@@ -8,9 +8,15 @@ from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import serializers, status
 from appstationapp.models import Status
+from appstationapp.fieldsets import SparseFieldsMixin, requested_fields
+from appstationapp.metrics import TimedSerializerMixin
+from appstationapp.caching import cached_response
+from appstationapp.pagination import ModelCursorPagination
+from appstationapp.projections import Projection
 
 
-class StatusSerializer(serializers.HyperlinkedModelSerializer):
+class StatusSerializer(TimedSerializerMixin, SparseFieldsMixin,
+    serializers.HyperlinkedModelSerializer):
     """JSON serializer for statuses
 
     Arugments:
@@ -25,6 +31,12 @@ class StatusSerializer(serializers.HyperlinkedModelSerializer):
             lookup_field='id'
         )
         fields = ('id', 'url', 'status')
+        # fields of ?view=summary
+        summary_fields = ('id', 'status')
+
+
+# Read only projection of StatusSerializer, used to list statuses
+status_projection = Projection('status-detail', StatusSerializer.Meta.fields)
 
 
 class Statuses(ViewSet):
@@ -41,9 +53,13 @@ class Statuses(ViewSet):
             Response -- JSON serialized Status instance
         """
 
+        # the fields asked for with ?fields= or ?view=summary
+        fields = requested_fields(request, StatusSerializer)
+
         try:
-            status = Status.objects.get(pk=pk)
-            serializer = StatusSerializer(status, context={'request': request})
+            statuses = status_projection.subset(fields).only(Status.objects.all())
+            status = statuses.get(pk=pk)
+            serializer = StatusSerializer(status, fields=fields, context={'request': request})
             return Response(serializer.data)
 
         except Exception as ex:
@@ -57,20 +73,36 @@ class Statuses(ViewSet):
         Fetch call to get all statuses:
             http://localhost:8000/statuses
 
+        Fetch call to get only some fields of all statuses, or their summary:
+            http://localhost:8000/statuses?fields=id,status
+            http://localhost:8000/statuses?view=summary
+
+        Returns:
+            Response -- JSON serialized page of statuses, or 304 status code
+        """
+
+        # serve the page from the cache until the statuses change
+        return cached_response(request, 'statuses', lambda: self.page_of_statuses(request))
+
+
+    def page_of_statuses(self, request):
+        """Builds the response to a GET all request that isn't cached yet
+
         Returns:
-            Response -- JSON serialized list of statuses
+            Response -- JSON serialized page of statuses
         """
 
         # list of status instances
         statuses = Status.objects.all()
 
-        # takes statuses and converts to JSON
-        serializer = StatusSerializer(
-            statuses,
-            many=True,
-            context={'request': request}
-        )
+        # only fetch the columns and the page of statuses that were requested
+        projection = status_projection.subset(requested_fields(request, StatusSerializer))
+        paginator = ModelCursorPagination()
+        page = paginator.paginate_queryset(projection.values(statuses), request, view=self)
+
+        # converts the page of statuses to JSON
+        data = projection.serialize(page, request)
 
-        # Return the JSON response
-        return Response(serializer.data)
+        # Return the JSON response with links to the next and previous pages
+        return paginator.get_paginated_response(data)
 